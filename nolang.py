@@ -1,46 +1,78 @@
+import os
 import sys
+import time
 
 from nolang.lexer.lexer import Lexer
+from nolang.lexer.regexlexer import RegexLexer
 from nolang.parser.parser import Parser
+from nolang.parser.incremental import IncrementalParser
 
 from nolang.astvisitors.astvisitor import ASTVisitor
 from nolang.astvisitors.interpreter import Interpreter
+from nolang.astvisitors.closurecompiler import ClosureInterpreter
+from nolang.astvisitors.pythontranspiler import PythonInterpreter
+from nolang.astvisitors.tieredinterpreter import TieredInterpreter, HOT_THRESHOLD
 from nolang.astvisitors.astprinter import ASTPrinter
+from nolang.astvisitors.resolver import Resolver
+
+from nolang.bytecode.vm import VirtualMachine
+from nolang.bytecode.disassembler import Disassembler
+
+from nolang import cache
 
 from nolang.exception import NolangException
 
 from bruhcolor import bruhcolored as colored
 
-from nolang.types import NOL
 
 lex = Lexer()
 parser = Parser()
 
 __VERSION__ = '0.1.2'
 
+# Engines that can run programs, picked with --backend=NAME
+BACKENDS = { 'tree': Interpreter, 'closure': ClosureInterpreter, 'vm': VirtualMachine, 'py': PythonInterpreter, 'tiered': TieredInterpreter }
+
+# Seconds between checking whether a watched file changed
+WATCH_INTERVAL = 0.5
+
 # Usage: nolang [FILE] [OPTIONS]
 def main():
-    if '--ast' in sys.argv:
-        visitor = ASTPrinter(sys.stdout)
+    global lex, parser
 
-    else:
-        visitor = Interpreter()
+    # Use the regex driven lexer, it generates the same tokens but faster
+    if '--regex-lexer' in sys.argv:
+        lex = RegexLexer()
 
-    if len(sys.argv) >= 2 and sys.argv[1] != '--ast':
-        file(sys.argv[1], visitor)
+    # Only parse function bodies once they are called, the AST printer needs everything parsed
+    if '--lazy' in sys.argv and '--ast' not in sys.argv:
+        parser = Parser(lazy=True)
 
-    else:
-        # The Nolang REPL should print out expression statment values, so long as they aren't NOL
-        previous_exprstmt = visitor.visit_exprstmt
+    if option('--backend=', 'tree') not in BACKENDS:
+        print(f'Unknown backend \'{option("--backend=", "tree")}\', expected one of: {", ".join(BACKENDS)}', file=sys.stderr)
+        return
+
+    if not option('--tier-threshold=', str(HOT_THRESHOLD)).isdecimal():
+        print(f'Invalid tier threshold \'{option("--tier-threshold=", str(HOT_THRESHOLD))}\', expected a number of calls and loop iterations of 0 or more', file=sys.stderr)
+        return
 
-        # This function assumes that the visitor returns a value on expression statements
-        def print_wrapper(expr):
-            val = previous_exprstmt(expr)
-            if val is not NOL:
-                print(val)
+    files = [ arg for arg in sys.argv[1:] if not arg.startswith('--') ]
 
-        # Set this new wrapper
-        visitor.visit_exprstmt = print_wrapper
+    if len(files) > 0 and '--watch' in sys.argv:
+        watch(files[0])
+
+    elif len(files) > 0:
+        visitor = create_visitor()
+        file(files[0], visitor)
+
+        if '--call-stats' in sys.argv and isinstance(visitor, Interpreter):
+            print(f'[calls] {visitor.call_hits} inline cache hits, {visitor.call_misses} misses', file=sys.stderr)
+
+    else:
+        visitor = create_visitor()
+
+        # The Nolang REPL should print out expression statment values, so long as they aren't NOL
+        visitor.echo = True
 
         try:
             interactive(visitor)
@@ -75,16 +107,91 @@ def interactive(visitor: ASTVisitor):
 
         process(visitor, line, sys.stdin.name)
 
+def create_visitor() -> ASTVisitor:
+    if '--ast' in sys.argv:
+        return ASTPrinter(sys.stdout)
+
+    if '--dis' in sys.argv:
+        return Disassembler(sys.stdout, fold='--no-fold' not in sys.argv)
+
+    if '--dump-py' in sys.argv:
+        return PythonInterpreter(fold='--no-fold' not in sys.argv, dump=sys.stdout)
+
+    visitor = BACKENDS[option('--backend=', 'tree')](fold='--no-fold' not in sys.argv)
+
+    if isinstance(visitor, TieredInterpreter):
+        visitor.threshold = int(option('--tier-threshold=', HOT_THRESHOLD))
+        visitor.report = sys.stderr if '--tier-report' in sys.argv else None
+
+    return visitor
+
+def option(prefix: str, default) -> str:
+    """Value of the last option given as prefix followed by the value, like --backend=vm"""
+    values = [ arg.removeprefix(prefix) for arg in sys.argv[1:] if arg.startswith(prefix) ]
+
+    return values[-1] if values else default
+
 def file(file_name: str, visitor: ASTVisitor):
     with open(file_name, 'r') as f:
         source: str = f.read()
 
-    process(visitor, source, file_name)
+    # Only the interpreter can make use of an already resolved program
+    if '--no-cache' not in sys.argv and isinstance(visitor, Interpreter):
+        cached(visitor, source, file_name)
+
+    else:
+        process(visitor, source, file_name)
+
+def cached(visitor: Interpreter, source: str, file_name: str):
+    """Runs the file from its cached, already resolved program, which is created if missing or stale"""
+    try:
+        program = cache.load(source, file_name, __VERSION__)
+
+        if program is None:
+            stmts = parser.parse(lex.stream(source, file_name), file_name)
+            bindings = Resolver().explore(stmts)
+
+            program = (stmts, bindings)
+
+            # Lazy parsing never sees the syntax errors of functions that aren't called, programs
+            # with syntax errors must not be cached
+            if not parser.lazy:
+                cache.store(source, file_name, __VERSION__, stmts, bindings)
+
+        visitor.explore(*program)
+
+    except* NolangException as eg:
+        for e in eg.exceptions:
+            print(f'{e}', file=sys.stderr)
+
+def watch(file_name: str):
+    """Runs the file again every time it is saved, only the edited statements are parsed again"""
+    front_end = IncrementalParser(lex, parser)
+    last_modified = None
+
+    while True:
+        modified = os.stat(file_name).st_mtime_ns
+
+        if modified != last_modified:
+            last_modified = modified
 
-def process(visitor: ASTVisitor, source: str, file_name: str):
+            with open(file_name, 'r') as f:
+                source: str = f.read()
+
+            process(create_visitor(), source, file_name, front_end)
+
+        time.sleep(WATCH_INTERVAL)
+
+def process(visitor: ASTVisitor, source: str, file_name: str, front_end: IncrementalParser = None):
     try:
-        tokens = lex.scan(source, file_name)
-        stmts = parser.parse(tokens, file_name)
+        if front_end is not None:
+            stmts = front_end.parse(source, file_name)
+
+        else:
+            # Tokens are streamed from the lexer straight into the parser
+            tokens = lex.stream(source, file_name)
+            stmts = parser.parse(tokens, file_name)
+
         visitor.explore(stmts)
 
     except* NolangException as eg:
@@ -185,7 +185,7 @@ class ASTPrinter(ASTVisitor):
 
     def visit_literal(self, expr: Literal):
         val: NolangType = expr.value()
-        typ = val.type_name()
+        typ = val.type_name
         val = str(val)
 
         # Make escape sequences literal
@@ -218,6 +218,24 @@ class ASTPrinter(ASTVisitor):
         self._make_edge(array_node, self._make_node(r'\"]\"'))
         return array_node
 
+    def visit_map_init(self, expr: MapInitializer):
+        map_node = self._make_node('<map_initializer>')
+        self._make_edge(map_node, self._make_node(r'\"{\"'))
+
+        for i, (key, value) in enumerate(expr.entries):
+            # Entries are separated by commas
+            if i > 0:
+                self._make_edge(map_node, self._make_node(r'\",\"'))
+
+            entry_node = self._make_node('<entry>')
+            self._make_edge(entry_node, key.visit(self))
+            self._make_edge(entry_node, self._make_node(r'\":\"'))
+            self._make_edge(entry_node, value.visit(self))
+            self._make_edge(map_node, entry_node)
+
+        self._make_edge(map_node, self._make_node(r'\"}\"'))
+        return map_node
+
     ### Utilities ###
 
     def _create_body(self, body: Body):
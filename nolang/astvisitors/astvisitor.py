@@ -56,4 +56,7 @@ class ASTVisitor:
     def visit_array_init(self, expr: ArrayInitializer):
         raise NotImplementedError()
 
+    def visit_map_init(self, expr: MapInitializer):
+        raise NotImplementedError()
+
 
@@ -0,0 +1,284 @@
+from .astvisitor import ASTVisitor
+
+from ..parser.expressions import *
+from ..parser.statements import *
+from ..lexer.token import Token
+from ..lexer.token import Tokens
+from ..types import NOL
+from ..bytecode.code import *
+
+# Opcodes of the binary operators, 'and' and 'or' are compiled to jumps instead
+BINARY_OPCODES = {
+    Tokens.PLUS: Opcode.ADD,
+    Tokens.MINUS: Opcode.SUBTRACT,
+    Tokens.STAR: Opcode.MULTIPLY,
+    Tokens.SLASH: Opcode.DIVIDE,
+    Tokens.PERCENT: Opcode.MODULO,
+    Tokens.EXP: Opcode.POWER,
+    Tokens.LESS_THAN: Opcode.LESS,
+    Tokens.GREATER_THAN: Opcode.GREATER,
+    Tokens.LESS_THAN_EQ: Opcode.LESS_EQUAL,
+    Tokens.GREATER_THAN_EQ: Opcode.GREATER_EQUAL,
+    Tokens.EQUAL: Opcode.EQUAL,
+    Tokens.NEQUAL: Opcode.NOT_EQUAL,
+}
+
+class BytecodeCompiler(ASTVisitor):
+    """
+    Compiles resolved statements into the linear bytecode run by the virtual machine.
+    Every body gets its own environment at runtime just like in the interpreter, so local
+    variables are loaded from the slot and distance the resolver gave them.
+
+    Function bodies are compiled separately, into their own code, when they are called.
+    """
+
+    def __init__(self, bindings: dict, echo: bool = False) -> None:
+        self.bindings = bindings
+
+        # Print the value of every expression statement that isn't nol, used by the REPL
+        self.echo = echo
+
+    def compile(self, stmts: list[Statement], name: str) -> Code:
+        self.code = Code(name)
+        self.line = 0
+
+        # Constants are shared by identity, equal values of different types must stay apart
+        self.constant_indices: dict[int, int] = {}
+
+        for stmt in stmts:
+            stmt.visit(self)
+
+        code, self.code = self.code, None
+        return code
+
+    def visit_vardecl(self, stmt: VarDeclaration):
+        self._line(stmt.id)
+
+        if stmt.has_initializer():
+            stmt.init.visit(self)
+        else:
+            self._emit(Opcode.LOAD_CONST, self._constant(NOL))
+
+        self._declare(stmt)
+
+    def visit_fundecl(self, stmt: FunDeclaration):
+        self._line(stmt.id)
+
+        # The body is compiled by the virtual machine on the first call, it might still be lazy
+        self._emit(Opcode.FUNCTION, self._constant(stmt))
+        self._declare(stmt)
+
+    def visit_ifstmt(self, stmt: IfStatement):
+        ends = []
+        branches = [ (stmt.cond, stmt.if_body) ] + stmt.erm_bodies
+
+        for i, (cond, body) in enumerate(branches):
+            cond.visit(self)
+            skip = self._emit(Opcode.POP_JUMP_IF_FALSE)
+
+            self._body(body)
+
+            # The last branch falls through to the end on its own
+            if i < len(branches) - 1 or stmt.has_hermph():
+                ends.append(self._emit(Opcode.JUMP))
+
+            self._patch(skip)
+
+        if stmt.has_hermph():
+            self._body(stmt.hermph_body)
+
+        for end in ends:
+            self._patch(end)
+
+    def visit_whileloop(self, stmt: WhileStatement):
+        start = len(self.code.instructions)
+
+        stmt.cond.visit(self)
+        exit = self._emit(Opcode.POP_JUMP_IF_FALSE)
+
+        self._body(stmt.while_body)
+        self._emit(Opcode.JUMP, start)
+        self._patch(exit)
+
+        if stmt.has_hermph():
+            self._body(stmt.hermph_body)
+
+    def visit_bounceloop(self, stmt: BounceStatement):
+        start = len(self.code.instructions)
+
+        self._body(stmt.bounce_body)
+        stmt.cond.visit(self)
+        self._emit(Opcode.POP_JUMP_IF_TRUE, start)
+
+    def visit_exprstmt(self, stmt: ExprStatement):
+        stmt.expr.visit(self)
+        self._emit(Opcode.PRINT_EXPR if self.echo else Opcode.POP)
+
+    def visit_return(self, stmt: ReturnStatement):
+        self._line(stmt.token)
+
+        # Calls in tail position replace the function paying them instead of returning to it
+        if isinstance(stmt.value, CallExpression):
+            self._call(stmt.value, Opcode.TAIL_CALL)
+            return
+
+        if stmt.has_value():
+            stmt.value.visit(self)
+        else:
+            self._emit(Opcode.LOAD_CONST, self._constant(NOL))
+
+        self._emit(Opcode.RETURN)
+
+    def visit_identifier_assign(self, expr: IDAssignExpression):
+        expr.assign.visit(self)
+        self._line(expr.id)
+
+        binding = self.bindings.get(expr)
+
+        # We know which environment and slot local variables are in
+        if binding is None:
+            self._emit(Opcode.STORE_GLOBAL, self._constant(expr.id))
+        elif binding[0] == 0:
+            self._emit(Opcode.STORE_LOCAL, binding[1])
+        else:
+            self._emit(Opcode.STORE_DEREF, self._deref(*binding))
+
+    def visit_identifier_access(self, expr: IDAccessorExpression):
+        self._line(expr.id)
+
+        binding = self.bindings.get(expr)
+
+        # We know which environment and slot local variables are in
+        if binding is None:
+            self._emit(Opcode.LOAD_GLOBAL, self._constant(expr.id))
+        elif binding[0] == 0:
+            self._emit(Opcode.LOAD_LOCAL, binding[1])
+        else:
+            self._emit(Opcode.LOAD_DEREF, self._deref(*binding))
+
+    def visit_index_access(self, expr: IndexAccessorExpression):
+        self._indexable(expr)
+        expr.index.visit(self)
+        self._emit(Opcode.LOAD_INDEX, self._constant(expr))
+
+    def visit_index_assign(self, expr: IndexAssignExpression):
+        # The index is checked before the assigned value is evaluated
+        self._indexable(expr.accessor)
+        expr.accessor.index.visit(self)
+        self._emit(Opcode.CHECK_INDEX, self._constant(expr.accessor))
+
+        expr.assign.visit(self)
+        self._emit(Opcode.STORE_INDEX)
+
+    def visit_call(self, expr: CallExpression):
+        self._call(expr, Opcode.CALL)
+
+    def visit_binexpr(self, expr: BinaryExpression):
+        expr.left.visit(self)
+
+        # Make OR and AND operators short-circuited, we DO NOT evaluate RHS unless we have to
+        match expr.op.type_id:
+            case Tokens.OR | Tokens.AND:
+                self._emit(Opcode.TO_BOOL)
+                jump = Opcode.JUMP_IF_TRUE_OR_POP if expr.op.type_id == Tokens.OR else Opcode.JUMP_IF_FALSE_OR_POP
+                end = self._emit(jump)
+
+                expr.right.visit(self)
+                self._emit(Opcode.TO_BOOL)
+                self._patch(end)
+                return
+
+        expr.right.visit(self)
+        self._line(expr.op)
+        self._emit(BINARY_OPCODES[expr.op.type_id], self._constant(expr.op))
+
+    def visit_unexpr(self, expr: UnaryExpression):
+        expr.operand.visit(self)
+        self._line(expr.op)
+
+        match expr.op.type_id:
+            case Tokens.NOT: self._emit(Opcode.NOT)
+            case Tokens.MINUS: self._emit(Opcode.NEGATE, self._constant(expr.op))
+            case _: self._emit(Opcode.UNARY, self._constant(expr.op))
+
+    def visit_literal(self, expr: Literal):
+        self._emit(Opcode.LOAD_CONST, self._constant(expr.value()))
+
+    def visit_array_init(self, expr: ArrayInitializer):
+        for element in expr.values:
+            element.visit(self)
+
+        self._emit(Opcode.BUILD_ARRAY, len(expr.values))
+
+    def visit_map_init(self, expr: MapInitializer):
+        for key, value in expr.entries:
+            key.visit(self)
+            value.visit(self)
+
+        # Keys are checked once the whole map is evaluated
+        self._line(expr.brace)
+        self._emit(Opcode.BUILD_MAP, self._constant(expr))
+
+    ### Utilities ###
+
+    def _emit(self, op: Opcode, arg: int = 0) -> int:
+        """Appends an instruction and returns its offset"""
+        offset = len(self.code.instructions)
+
+        self.code.instructions += (op.value, arg)
+        self.code.lines.append(self.line)
+
+        return offset
+
+    def _patch(self, offset: int):
+        """Makes the jump at offset go to the next instruction"""
+        self.code.instructions[offset + 1] = len(self.code.instructions)
+
+    def _line(self, token: Token):
+        self.line = token.line
+
+    def _constant(self, value) -> int:
+        index = self.constant_indices.get(id(value))
+
+        if index is None:
+            index = self.constant_indices[id(value)] = len(self.code.constants)
+            self.code.constants.append(value)
+
+        return index
+
+    def _declare(self, stmt: VarDeclaration | FunDeclaration):
+        binding = self.bindings.get(stmt)
+
+        # Locals go in the slot the resolver gave them, globals are defined by name
+        if binding is not None:
+            self._emit(Opcode.DECLARE_LOCAL, binding[1])
+        else:
+            self._emit(Opcode.DECLARE_GLOBAL, self._constant(stmt.id))
+
+    def _body(self, body: Body):
+        """Compiles a body which runs in a new environment every time"""
+        self._emit(Opcode.PUSH_ENV, body.size)
+
+        for stmt in body.stmts:
+            stmt.visit(self)
+
+        self._emit(Opcode.POP_ENV)
+
+    def _call(self, expr: CallExpression, op: Opcode):
+        expr.callee.visit(self)
+
+        for arg in expr.args:
+            arg.visit(self)
+
+        self._line(expr.paren)
+        self._emit(op, self._constant(expr))
+
+    def _indexable(self, expr: IndexAccessorExpression):
+        # The indexable is checked before the index is evaluated
+        expr.indexable.visit(self)
+        self._line(expr.bracket)
+        self._emit(Opcode.CHECK_INDEXABLE, self._constant(expr))
+
+    @staticmethod
+    def _deref(distance: int, slot: int) -> int:
+        return distance << DEREF_SHIFT | slot
@@ -0,0 +1,582 @@
+from collections.abc import Callable
+
+from .astvisitor import ASTVisitor
+
+from ..parser.expressions import *
+from ..parser.statements import *
+from ..lexer.token import Tokens
+from ..types import *
+from ..exception import *
+from ..operators import ARITHMETIC, COMPARISONS
+
+# Imported last, the types module forward declares its own Interpreter
+from .interpreter import Environment, Interpreter
+
+# Compiled statements and expressions take the environment they run in. Expressions
+# return their value, statements return the value paid in them or None if they complete
+# normally (expression statements return the value of their expression, which blocks ignore)
+Closure = Callable[[Environment], NolangType]
+
+class ClosureCompiler(ASTVisitor):
+    """
+    Compiles resolved statements and expressions into trees of python closures. All the
+    decisions the interpreter makes every time a node runs (which visitor to call, which
+    operator to apply, whether a variable is local and in which slot) are made once here,
+    so running the program is just a matter of calling the closures.
+    """
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        # Gives the bindings of the resolver and the runtime the closures call into
+        self.interpreter = interpreter
+
+    def compile(self, stmts: list[Statement]) -> Closure:
+        compiled = [ stmt.visit(self) for stmt in stmts ]
+
+        if len(compiled) == 1 and not isinstance(stmts[0], ExprStatement):
+            return compiled[0]
+
+        # Only statements that can pay need their result checked
+        if not contains(stmts, ReturnStatement):
+            def block(env):
+                for stmt in compiled:
+                    stmt(env)
+
+            return block
+
+        steps = [ (stmt, contains([ original ], ReturnStatement)) for stmt, original in zip(compiled, stmts) ]
+
+        def paying_block(env):
+            for stmt, pays in steps:
+                paid = stmt(env)
+
+                if pays and paid is not None:
+                    return paid
+
+        return paying_block
+
+    def visit_vardecl(self, stmt: VarDeclaration):
+        init = stmt.init.visit(self) if stmt.has_initializer() else None
+        binding = self.interpreter.bindings.get(stmt)
+
+        # Locals go in the slot the resolver gave them, globals are defined by name
+        if binding is not None:
+            slot = binding[1]
+
+            if init is None:
+                def declare(env):
+                    env.values[slot] = NOL
+
+            else:
+                def declare(env):
+                    env.values[slot] = init(env)
+
+        else:
+            name = stmt.id.lexeme
+
+            def declare(env):
+                env.values[name] = NOL if init is None else init(env)
+
+        return declare
+
+    def visit_fundecl(self, stmt: FunDeclaration):
+        binding = self.interpreter.bindings.get(stmt)
+        key = stmt.id.lexeme if binding is None else binding[1]
+
+        # The body is compiled by the interpreter on the first call, it might still be lazy
+        def declare(env):
+            env.values[key] = NolangFunction(stmt, env)
+
+        return declare
+
+    def visit_ifstmt(self, stmt: IfStatement):
+        cond = self._condition(stmt.cond)
+        if_body = self._body(stmt.if_body)
+        erm_bodies = [ (self._condition(erm_cond), self._body(erm)) for erm_cond, erm in stmt.erm_bodies ]
+        hermph_body = self._body(stmt.hermph_body) if stmt.has_hermph() else None
+
+        def if_stmt(env):
+            if cond(env):
+                return if_body(env)
+
+            for erm_cond, erm_body in erm_bodies:
+                if erm_cond(env):
+                    return erm_body(env)
+
+            if hermph_body is not None:
+                return hermph_body(env)
+
+        return if_stmt
+
+    def visit_whileloop(self, stmt: WhileStatement):
+        cond = self._condition(stmt.cond)
+        while_body = self._body(stmt.while_body)
+        hermph_body = self._body(stmt.hermph_body) if stmt.has_hermph() else None
+
+        if contains(stmt.while_body.stmts, ReturnStatement):
+            def while_loop(env):
+                while cond(env):
+                    paid = while_body(env)
+
+                    if paid is not None:
+                        return paid
+
+                if hermph_body is not None:
+                    return hermph_body(env)
+
+        else:
+            def while_loop(env):
+                while cond(env):
+                    while_body(env)
+
+                if hermph_body is not None:
+                    return hermph_body(env)
+
+        return while_loop
+
+    def visit_bounceloop(self, stmt: BounceStatement):
+        cond = self._condition(stmt.cond)
+        bounce_body = self._body(stmt.bounce_body)
+
+        if contains(stmt.bounce_body.stmts, ReturnStatement):
+            def bounce_loop(env):
+                paid = bounce_body(env)
+
+                while paid is None and cond(env):
+                    paid = bounce_body(env)
+
+                return paid
+
+        else:
+            def bounce_loop(env):
+                bounce_body(env)
+                while cond(env):
+                    bounce_body(env)
+
+        return bounce_loop
+
+    def visit_exprstmt(self, stmt: ExprStatement):
+        expr = stmt.expr.visit(self)
+
+        if not self.interpreter.echo:
+            return expr
+
+        def echo(env):
+            value = expr(env)
+
+            if value is not NOL:
+                print(value)
+
+        return echo
+
+    def visit_return(self, stmt: ReturnStatement):
+        if not stmt.has_value():
+            def pay_nol(env):
+                return NOL
+
+            return pay_nol
+
+        # Calls in tail position are made by the function call this pays to, see NolangFunction
+        if isinstance(stmt.value, CallExpression):
+            expr = stmt.value
+            callee = expr.callee.visit(self)
+            args = [ arg.visit(self) for arg in expr.args ]
+
+            def tail_call(env):
+                function = callee(env)
+                return TailCall(expr, function, [ arg(env) for arg in args ])
+
+            return tail_call
+
+        # The value paid makes its way out of every statement it is in, up to the call
+        return stmt.value.visit(self)
+
+    def visit_identifier_assign(self, expr: IDAssignExpression):
+        assign = expr.assign.visit(self)
+        binding = self.interpreter.bindings.get(expr)
+
+        # We know which environment and slot local variables are in
+        if binding is not None:
+            distance, slot = binding
+
+            if distance == 0:
+                def assign_local(env):
+                    value = env.values[slot] = assign(env)
+                    return value
+
+            else:
+                def assign_local(env):
+                    value = assign(env)
+                    env.assign_at(distance, slot, value)
+                    return value
+
+            return assign_local
+
+        # Distance is None, this might be a global variable
+        id = expr.id
+        name = id.lexeme
+        values = self.interpreter.globals.values
+
+        def assign_global(env):
+            value = assign(env)
+
+            if name not in values:
+                raise VariableNotDefinedException(name, id.line, id.file_name)
+
+            values[name] = value
+            return value
+
+        return assign_global
+
+    def visit_identifier_access(self, expr: IDAccessorExpression):
+        binding = self.interpreter.bindings.get(expr)
+
+        # We know which environment and slot local variables are in
+        if binding is not None:
+            distance, slot = binding
+
+            if distance == 0:
+                def access_local(env):
+                    return env.values[slot]
+
+            elif distance == 1:
+                def access_local(env):
+                    return env.enclosing.values[slot]
+
+            else:
+                def access_local(env):
+                    return env.get_at(distance, slot)
+
+            return access_local
+
+        # Distance is None, this might be a global variable
+        id = expr.id
+        name = id.lexeme
+        values = self.interpreter.globals.values
+
+        def access_global(env):
+            try:
+                return values[name]
+
+            except KeyError:
+                raise VariableNotDefinedException(name, id.line, id.file_name)
+
+        return access_global
+
+    def visit_index_access(self, expr: IndexAccessorExpression):
+        locate = self._locate(expr)
+        indexable, bracket = expr.indexable, expr.bracket
+
+        def index_access(env):
+            array, index = locate(env)
+            values = array.value
+
+            if values.__class__ is list:
+                return values[index]
+
+            # Maps hold their values under the python value of the key
+            if values.__class__ is dict:
+                value = values.get(index)
+
+                if value is None:
+                    raise KeyNotFoundException(indexable, index, bracket.line, bracket.file_name)
+
+                return value
+
+            # Packed arrays hold raw values, which are boxed on the way out
+            return nolang_int(values[index]) if values.typecode == INT64 else nolang_float(values[index])
+
+        return index_access
+
+    def visit_index_assign(self, expr: IndexAssignExpression):
+        locate = self._locate(expr.accessor)
+        assign = expr.assign.visit(self)
+
+        def index_assign(env):
+            array, index = locate(env)
+            value = assign(env)
+            values = array.value
+
+            # Packed arrays store the raw value, or unpack themselves when it doesn't fit, maps store any key
+            if values.__class__ is list:
+                values[index] = value
+            else:
+                array[index] = value
+
+            return value
+
+        return index_assign
+
+    def visit_call(self, expr: CallExpression):
+        callee = expr.callee.visit(self)
+        args = [ arg.visit(self) for arg in expr.args ]
+        interpreter = self.interpreter
+        line, file_name = expr.paren.line, expr.paren.file_name
+        given = len(args)
+
+        def call(env):
+            function = callee(env)
+
+            # Static initialization of arguments
+            values = [ arg(env) for arg in args ]
+
+            if not isinstance(function, NolangCallable):
+                raise NotCallableException(expr.callee, line, file_name)
+
+            arity = function.arity()
+            if arity != given:
+                raise InvalidArgumentsException(expr.callee, arity, given, line, file_name)
+
+            result = function(interpreter, values, line, file_name)
+            return NOL if result is None else result
+
+        return call
+
+    def visit_binexpr(self, expr: BinaryExpression):
+        left = expr.left.visit(self)
+        right = expr.right.visit(self)
+        op = expr.op
+        binary = Interpreter._binary_operation
+
+        # Make OR and AND operators short-circuited, we DO NOT evaluate RHS unless we have to
+        match op.type_id:
+            case Tokens.OR:
+                left, right = self._condition(expr.left), self._condition(expr.right)
+
+                def or_expr(env):
+                    return TRUE if left(env) or right(env) else FALSE
+
+                return or_expr
+
+            case Tokens.AND:
+                left, right = self._condition(expr.left), self._condition(expr.right)
+
+                def and_expr(env):
+                    return TRUE if left(env) and right(env) else FALSE
+
+                return and_expr
+
+            case Tokens.EQUAL:
+                def equal_expr(env):
+                    val1, val2 = left(env), right(env)
+
+                    if val1.__class__ in CONTAINER_TYPES:
+                        return TRUE if equal(val1, val2) else FALSE
+
+                    return TRUE if val1.value == val2.value else FALSE
+
+                return equal_expr
+
+            case Tokens.NEQUAL:
+                def not_equal_expr(env):
+                    val1, val2 = left(env), right(env)
+
+                    if val1.__class__ in CONTAINER_TYPES:
+                        return FALSE if equal(val1, val2) else TRUE
+
+                    return TRUE if val1.value != val2.value else FALSE
+
+                return not_equal_expr
+
+            case Tokens.SLASH:
+                def divide(env):
+                    val1, val2 = left(env), right(env)
+                    typ1, typ2 = val1.__class__, val2.__class__
+
+                    if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat) and val2.value != 0:
+                        return nolang_int(int(val1.value / val2.value)) if typ1 is typ2 is NolangInt else nolang_float(val1.value / val2.value)
+
+                    return binary(op, val1, val2)
+
+                return divide
+
+            case Tokens.EXP:
+                # Exponents can come out as another python type than their operands, the
+                # operation coerces them
+                def power(env):
+                    return binary(op, left(env), right(env))
+
+                return power
+
+            case Tokens.PERCENT:
+                def modulo(env):
+                    val1, val2 = left(env), right(env)
+
+                    if val1.__class__ is NolangInt and val2.__class__ is NolangInt:
+                        return nolang_int(val1.value % val2.value)
+
+                    return binary(op, val1, val2)
+
+                return modulo
+
+        if op.type_id in ARITHMETIC:
+            apply = ARITHMETIC[op.type_id]
+
+            def arithmetic(env):
+                val1, val2 = left(env), right(env)
+                typ1, typ2 = val1.__class__, val2.__class__
+
+                if typ1 is NolangInt and typ2 is NolangInt:
+                    return nolang_int(apply(val1.value, val2.value))
+
+                if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat):
+                    return nolang_float(apply(val1.value, val2.value))
+
+                return binary(op, val1, val2)
+
+            return arithmetic
+
+        if op.type_id in COMPARISONS:
+            apply = COMPARISONS[op.type_id]
+
+            def compare(env):
+                val1, val2 = left(env), right(env)
+                typ1, typ2 = val1.__class__, val2.__class__
+
+                if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat):
+                    return TRUE if apply(val1.value, val2.value) else FALSE
+
+                return binary(op, val1, val2)
+
+            return compare
+
+        # This should never happen in a completed implementation, do it for debugging purposes
+        raise Exception(f'Failed to compile operator: {op}')
+
+    def visit_unexpr(self, expr: UnaryExpression):
+        operand = expr.operand.visit(self)
+        op = expr.op
+        unary = Interpreter._unary_operation
+
+        match op.type_id:
+            case Tokens.NOT:
+                operand = self._condition(expr.operand)
+
+                def negate(env):
+                    return FALSE if operand(env) else TRUE
+
+                return negate
+
+            case Tokens.MINUS:
+                def minus(env):
+                    value = operand(env)
+                    typ = value.__class__
+
+                    if typ is NolangInt:
+                        return nolang_int(-value.value)
+
+                    if typ is NolangFloat:
+                        return nolang_float(-value.value)
+
+                    return unary(op, value)
+
+                return minus
+
+        def unary_expr(env):
+            return unary(op, operand(env))
+
+        return unary_expr
+
+    def visit_literal(self, expr: Literal):
+        value = expr.value()
+
+        def literal(env):
+            return value
+
+        return literal
+
+    def visit_array_init(self, expr: ArrayInitializer):
+        elements = [ element.visit(self) for element in expr.values ]
+
+        def array_init(env):
+            return nolang_array([ element(env) for element in elements ])
+
+        return array_init
+
+    def visit_map_init(self, expr: MapInitializer):
+        parts = [ part.visit(self) for entry in expr.entries for part in entry ]
+        brace = expr.brace
+        build_map = Interpreter._build_map
+
+        def map_init(env):
+            return build_map([ part(env) for part in parts ], brace)
+
+        return map_init
+
+    ### Utilities ###
+
+    def _body(self, body: Body) -> Closure:
+        """Compiles a body which runs in a new environment every time"""
+        run = self.compile(body.stmts)
+        size = body.size
+
+        def execute_body(env):
+            return run(Environment(env, [ None ] * size))
+
+        return execute_body
+
+    def _condition(self, expr: Expression) -> Closure:
+        """Compiles an expression whose value is only used for its truthiness"""
+        value = expr.visit(self)
+        to_truthy = Interpreter._to_truthy
+
+        def condition(env):
+            result = value(env)
+            return result.value if result.__class__ is NolangBool else to_truthy(result)
+
+        return condition
+
+    def _locate(self, expr: IndexAccessorExpression) -> Closure:
+        """Compiles the indexable and the index, giving back the array and the checked index, or the map and the key"""
+        indexable = expr.indexable.visit(self)
+        index = expr.index.visit(self)
+        bracket = expr.bracket
+        check_key = Interpreter._check_key
+
+        def locate(env):
+            array = indexable(env)
+
+            if not isinstance(array, NolangArray):
+                # Any key can be assigned to, only reading checks it's in the map
+                if array.__class__ is NolangMap:
+                    return array, check_key(index(env), bracket)
+
+                raise NotIndexableException(expr.indexable, bracket.line, bracket.file_name)
+
+            position = index(env)
+
+            if not isinstance(position, NolangInt):
+                raise InvalidTypeException(bracket, position)
+
+            values, i = array.value, position.value
+
+            if i < 0 or i > len(values) - 1:
+                raise OutOfBoundsException(expr.indexable, i, len(values), bracket.line, bracket.file_name)
+
+            return array, i
+
+        return locate
+
+class ClosureInterpreter(Interpreter):
+    """
+    Interpreter that compiles the program into closures before running it. Function
+    bodies are compiled on their first call, after lazy bodies are parsed and resolved.
+    """
+
+    def __init__(self, fold: bool = True):
+        super().__init__(fold)
+
+        self.compiler = ClosureCompiler(self)
+
+        # Compiled function bodies
+        self.bodies: dict[Body, Closure] = {}
+
+    def _run(self, program: list[Statement]):
+        self.compiler.compile(program)(self.globals)
+
+    def _execute_body(self, body: Body, new_env: Environment = None) -> NolangType:
+        run = self.bodies.get(body)
+
+        if run is None:
+            run = self.bodies[body] = self.compiler.compile(body.stmts)
+
+        return run(Environment(self.environment, [ None ] * body.size) if new_env is None else new_env)
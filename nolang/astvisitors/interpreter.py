@@ -1,6 +1,10 @@
+from collections.abc import Callable
 
 from .astvisitor import ASTVisitor
 from .resolver import Resolver
+from .optimizer import ConstantFolder
+
+from ..parser.parser import Parser
 
 from ..parser.expressions import *
 from ..parser.statements import *
@@ -8,6 +12,7 @@ from ..lexer.token import Tokens
 from ..types import *
 
 from ..runtime import RUNTIME_GLOBALS
+from ..operators import BINARY_OPERATIONS, UNARY_OPERATIONS
 from ..exception import *
 
 from ..util import *
@@ -24,18 +29,28 @@ class Environment:
 
     Or we could have the environment directly map to the values using a
     hashmap structure.
+
+    The global environment maps names to values, since globals are only known at
+    runtime. Local environments are lists, the resolver assigns every local variable
+    a slot in the environment of its scope so it is accessed by index instead.
     """
 
-    def __init__(self, enclosing: Environment = None) -> None:
+    __slots__ = ('enclosing', 'values')
+
+    def __init__(self, enclosing: Environment = None, values: list[NolangType] = None) -> None:
         self.enclosing: Environment = enclosing
-        self.values: dict[str, NolangType] = {}
+        self.values: dict[str, NolangType] | list[NolangType] = {} if values is None else values
 
     def define(self, id: Token, value: NolangType):
         # Insert new entry in the dictionary in the most recent scope always!
         self.values[id.lexeme] = value
 
-    def get_at(self, id: Token, distance: int) -> NolangType:
-        return self._env_at(distance).values[id.lexeme]
+    def get_at(self, distance: int, slot: int) -> NolangType:
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+
+        return environment.values[slot]
 
     def get(self, id: Token) -> NolangType:
         name = id.lexeme
@@ -45,8 +60,12 @@ class Environment:
 
         return self.values[name]
 
-    def assign_at(self, id: Token, new_value: NolangType, distance: int) -> None:
-        self._env_at(distance).values[id.lexeme] = new_value
+    def assign_at(self, distance: int, slot: int, new_value: NolangType) -> None:
+        environment = self
+        for _ in range(distance):
+            environment = environment.enclosing
+
+        environment.values[slot] = new_value
 
     def assign(self, id: Token, new_value) -> None:
         name = id.lexeme
@@ -56,31 +75,39 @@ class Environment:
 
         self.values[name] = new_value
 
-    ### Utilities ###
-
-    def _env_at(self, distance: int) -> Environment:
-        environment = self
-        for _ in range(distance):
-            environment = environment.enclosing
-
-        return environment
-
 class Interpreter(ASTVisitor):
-    def __init__(self):
+    def __init__(self, fold: bool = True):
         self.globals = Environment()
         self.resolver = Resolver()
 
+        # Folds constant expressions before running anything
+        self.folder = ConstantFolder(self) if fold else None
+
         # Initialize globals with runtime library
         self.globals.values.update(RUNTIME_GLOBALS)
 
         self.environment = self.globals
 
-    def explore(self, program: list[Statement]):
+        # Print the value of every expression statement that isn't nol, used by the REPL
+        self.echo = False
+
+        # Inline cache of every call site, the last callee called there and how to call it. Kept
+        # by the interpreter instead of the tree, watch mode reuses trees across runs
+        self.call_cache: dict[CallExpression, tuple[NolangCallable, Callable]] = {}
+
+        # Calls that found their callee in the inline cache of the call site, and those that didn't
+        self.call_hits = 0
+        self.call_misses = 0
+
+    def explore(self, program: list[Statement], bindings: dict[Expression, int] = None):
+        """Runs the program, the resolver pass is skipped if its bindings are already known"""
         try:
-            self.bindings = self.resolver.explore(program)
+            if self.folder is not None:
+                self.folder.explore(program)
+
+            self.bindings = bindings if bindings is not None else self.resolver.explore(program)
 
-            for stmt in program:
-                stmt.visit(self)
+            self._run(program)
 
         except (RuntimeException, SemanticError) as e:
             raise e
@@ -90,59 +117,81 @@ class Interpreter(ASTVisitor):
         if stmt.has_initializer():
             value = stmt.init.visit(self)
 
-        self.environment.define(stmt.id, value)
+        self._declare(stmt, value)
 
     def visit_fundecl(self, stmt: FunDeclaration):
         # We give the function the current environment when DECLARED.
         # That way it can use variables outside of its scope
         fun = NolangFunction(stmt, self.environment)
 
-        self.environment.define(stmt.id, fun)
+        self._declare(stmt, fun)
+
+    # Statements give back the value paid in them, so it makes its way out to the function
+    # call, or None if they complete normally
 
     def visit_ifstmt(self, stmt: IfStatement):
         cond = stmt.cond.visit(self)
         if self._to_truthy(cond):
-            self._execute_body(stmt.if_body)
-            return
+            return self._execute_body(stmt.if_body)
 
         for cond, body in stmt.erm_bodies:
             if self._to_truthy(cond.visit(self)):
-                self._execute_body(body)
-                return
+                return self._execute_body(body)
 
         if stmt.has_hermph():
-            self._execute_body(stmt.hermph_body)
+            return self._execute_body(stmt.hermph_body)
 
     def visit_whileloop(self, stmt: WhileStatement):
         while self._to_truthy(stmt.cond.visit(self)):
-            self._execute_body(stmt.while_body)
+            paid = self._execute_body(stmt.while_body)
+
+            if paid is not None:
+                return paid
 
         else:
             if stmt.has_hermph():
-                self._execute_body(stmt.hermph_body)
+                return self._execute_body(stmt.hermph_body)
 
     def visit_bounceloop(self, stmt: BounceStatement):
-        self._execute_body(stmt.bounce_body)
-        while self._to_truthy(stmt.cond.visit(self)):
-            self._execute_body(stmt.bounce_body)
+        paid = self._execute_body(stmt.bounce_body)
+
+        while paid is None and self._to_truthy(stmt.cond.visit(self)):
+            paid = self._execute_body(stmt.bounce_body)
+
+        return paid
 
     def visit_exprstmt(self, stmt: ExprStatement):
-        return stmt.expr.visit(self)
+        value = stmt.expr.visit(self)
+
+        if self.echo and value is not NOL:
+            print(value)
 
     def visit_return(self, stmt: ReturnStatement):
+        # Calls in tail position are made by the function call this pays to, see NolangFunction
+        if isinstance(stmt.value, CallExpression):
+            expr: CallExpression = stmt.value
+            callee = expr.callee.visit(self)
+
+            return TailCall(expr, callee, [ arg.visit(self) for arg in expr.args ])
+
         value = NOL # NOTE: Return NOL if there is no value!
         if stmt.has_value():
             value = stmt.value.visit(self)
 
-        raise Return(value)
+        return value
 
     def visit_identifier_assign(self, expr: IDAssignExpression):
         value = expr.assign.visit(self)
-        distance = self.bindings.get(expr)
+        binding = self.bindings.get(expr)
 
-        # We know which environment local variables are in
-        if distance is not None:
-            self.environment.assign_at(expr.id, value, distance)
+        # We know which environment and slot local variables are in
+        if binding is not None:
+            distance, slot = binding
+
+            if distance == 0:
+                self.environment.values[slot] = value
+            else:
+                self.environment.assign_at(distance, slot, value)
 
         # Distance is None, this might be a global variable
         else:
@@ -151,11 +200,16 @@ class Interpreter(ASTVisitor):
         return value
 
     def visit_identifier_access(self, expr: IDAccessorExpression):
-        distance = self.bindings.get(expr)
+        binding = self.bindings.get(expr)
+
+        # We know which environment and slot local variables are in
+        if binding is not None:
+            distance, slot = binding
+
+            if distance == 0:
+                return self.environment.values[slot]
 
-        # We know which environment local variables are in
-        if distance is not None:
-            return self.environment.get_at(expr.id, distance)
+            return self.environment.get_at(distance, slot)
 
         # Distance is None, this might be a global variable
         else:
@@ -163,15 +217,35 @@ class Interpreter(ASTVisitor):
 
     def visit_index_access(self, expr: IndexAccessorExpression):
         indexable, index = self._try_get_indexable_and_index(expr)
+        values = indexable.value
 
-        return indexable[index]
+        if values.__class__ is list:
+            return values[index]
+
+        # Maps hold their values under the python value of the key
+        if values.__class__ is dict:
+            value = values.get(index)
+
+            if value is None:
+                raise KeyNotFoundException(expr.indexable, index, expr.bracket.line, expr.bracket.file_name)
+
+            return value
+
+        # Packed arrays hold raw values, which are boxed on the way out
+        return nolang_int(values[index]) if values.typecode == INT64 else nolang_float(values[index])
 
     def visit_index_assign(self, expr: IndexAssignExpression):
         indexable, index = self._try_get_indexable_and_index(expr.accessor)
+        value = expr.assign.visit(self)
+        values = indexable.value
 
-        indexable[index] = expr.assign.visit(self)
+        # Packed arrays store the raw value, or unpack themselves when it doesn't fit, maps store any key
+        if values.__class__ is list:
+            values[index] = value
+        else:
+            indexable[index] = value
 
-        return indexable[index]
+        return value
 
     def visit_call(self, expr: CallExpression):
         callee = expr.callee.visit(self)
@@ -179,6 +253,17 @@ class Interpreter(ASTVisitor):
         # Static initialization of arguments
         args = [ arg.visit(self) for arg in expr.args ]
 
+        # The same callee as last time has already been checked, callables never change their arity.
+        # Rebinding the name or creating a new closure gives a different callee, which misses
+        cached = self.call_cache.get(expr)
+
+        if cached is not None and callee is cached[0]:
+            self.call_hits += 1
+            result = cached[1](self, args, expr.paren.line, expr.paren.file_name)
+            return NOL if result is None else result
+
+        self.call_misses += 1
+
         if not is_type(callee, NolangCallable):
             raise NotCallableException(expr.callee, expr.paren.line, expr.paren.file_name)
 
@@ -189,8 +274,10 @@ class Interpreter(ASTVisitor):
         if arity != given:
             raise InvalidArgumentsException(expr.callee, arity, given, expr.paren.line, expr.paren.file_name)
 
+        self.call_cache[expr] = (callee, callee.__call__)
+
         result = callee(self, args, expr.paren.line, expr.paren.file_name)
-        return result if result else NOL
+        return NOL if result is None else result
 
     def visit_binexpr(self, expr: BinaryExpression):
         val1: NolangType = expr.left.visit(self)
@@ -198,34 +285,69 @@ class Interpreter(ASTVisitor):
         # Make OR and AND operators short-circuited, we DO NOT evaluate RHS unless we have to
         match expr.op.type_id:
             case Tokens.OR:
-                return NolangBool(Interpreter._to_truthy(val1) \
+                return nolang_bool(Interpreter._to_truthy(val1) \
                     or Interpreter._to_truthy(expr.right.visit(self)))
 
             case Tokens.AND:
-                return NolangBool(Interpreter._to_truthy(val1) \
+                return nolang_bool(Interpreter._to_truthy(val1) \
                    and Interpreter._to_truthy(expr.right.visit(self)))
 
         # All other operators will need RHS evaluated to work
         val2: NolangType = expr.right.visit(self)
 
-        match expr.op.type_id:
-            case Tokens.EQUAL: return NolangBool(val1.value == val2.value)
-            case Tokens.NEQUAL: return NolangBool(val1.value != val2.value)
+        return Interpreter._binary_operation(expr.op, val1, val2)
+
+    def visit_unexpr(self, expr: UnaryExpression):
+        value: NolangType = expr.operand.visit(self)
+
+        return Interpreter._unary_operation(expr.op, value)
+
+    def visit_literal(self, expr: Literal):
+        return expr.value()
+
+    def visit_array_init(self, expr: ArrayInitializer):
+        return nolang_array([ element.visit(self) for element in expr.values ])
+
+    def visit_map_init(self, expr: MapInitializer):
+        return Interpreter._build_map([ part.visit(self) for entry in expr.entries for part in entry ], expr.brace)
+
+    ### Utilities ###
+
+    def _run(self, program: list[Statement]):
+        for stmt in program:
+            stmt.visit(self)
+
+    @staticmethod
+    def _binary_operation(op: Token, val1: NolangType, val2: NolangType) -> NolangType:
+        """Applies any binary operator but 'and' and 'or' to already evaluated operands"""
+        operation = BINARY_OPERATIONS[op.type_id].get((val1.__class__, val2.__class__))
+
+        if operation is not None:
+            return operation(op, val1, val2)
+
+        return Interpreter._checked_binary_operation(op, val1, val2)
+
+    @staticmethod
+    def _checked_binary_operation(op: Token, val1: NolangType, val2: NolangType) -> NolangType:
+        """Applies a binary operator to operands of any type, raising the error for unsupported ones"""
+        match op.type_id:
+            case Tokens.EQUAL: return nolang_bool(equal(val1, val2))
+            case Tokens.NEQUAL: return nolang_bool(not equal(val1, val2))
             case Tokens.LESS_THAN:
-                Interpreter._check_ordering(val1, val2, expr.op)
-                return NolangBool(val1.value < val2.value)
+                Interpreter._check_ordering(val1, val2, op)
+                return nolang_bool(val1.value < val2.value)
 
             case Tokens.GREATER_THAN:
-                Interpreter._check_ordering(val1, val2, expr.op)
-                return NolangBool(val1.value > val2.value)
+                Interpreter._check_ordering(val1, val2, op)
+                return nolang_bool(val1.value > val2.value)
 
             case Tokens.LESS_THAN_EQ:
-                Interpreter._check_ordering(val1, val2, expr.op)
-                return NolangBool(val1.value <= val2.value)
+                Interpreter._check_ordering(val1, val2, op)
+                return nolang_bool(val1.value <= val2.value)
 
             case Tokens.GREATER_THAN_EQ:
-                Interpreter._check_ordering(val1, val2, expr.op)
-                return NolangBool(val1.value >= val2.value)
+                Interpreter._check_ordering(val1, val2, op)
+                return nolang_bool(val1.value >= val2.value)
 
             case Tokens.PLUS:
                 if is_type(val1, NolangColoredText):
@@ -239,82 +361,118 @@ class Interpreter(ASTVisitor):
                 # NOTE: We use the 'safe' to-string functions which will catch any python exceptions that may be thrown
                 if is_type(val1, NolangString) \
                 or is_type(val2, NolangString):
-                    return NolangString(str(val1) + str(val2))
+                    return concatenated(val1, val2)
 
-                typ = Interpreter._check_numerics(val1, val2, expr.op)
+                typ = Interpreter._check_numerics(val1, val2, op)
                 return typ(val1.value + val2.value)
 
             case Tokens.MINUS:
-                typ = Interpreter._check_numerics(val1, val2, expr.op)
+                typ = Interpreter._check_numerics(val1, val2, op)
                 return typ(val1.value - val2.value)
 
             case Tokens.STAR:
-                typ = Interpreter._check_numerics(val1, val2, expr.op)
+                typ = Interpreter._check_numerics(val1, val2, op)
                 return typ(val1.value * val2.value)
 
             case Tokens.SLASH:
-                typ = Interpreter._check_numerics(val1, val2, expr.op)
+                typ = Interpreter._check_numerics(val1, val2, op)
                 if val2.value == 0:
-                    raise DivideByZeroException(expr.op.line, expr.op.file_name)
+                    raise DivideByZeroException(op.line, op.file_name)
                 return typ(val1.value / val2.value)
 
             case Tokens.PERCENT:
-                Interpreter._check_types(val1, val2, expr.op, NolangInt)
-                return NolangInt(val1.value % val2.value)
+                Interpreter._check_types(val1, val2, op, NolangInt)
+                return nolang_int(val1.value % val2.value)
 
             case Tokens.EXP:
-                typ = Interpreter._check_numerics(val1, val2, expr.op)
+                typ = Interpreter._check_numerics(val1, val2, op)
                 return typ(val1.value ** val2.value)
 
         # This should never happen in a completed implementation, do it for debugging purposes
-        raise Exception(f'Failed to interpret expression: {expr}')
+        raise Exception(f'Failed to interpret operator: {op}')
 
-    def visit_unexpr(self, expr: UnaryExpression):
-        value: NolangType = expr.operand.visit(self)
+    @staticmethod
+    def _unary_operation(op: Token, value: NolangType) -> NolangType:
+        """Applies a unary operator to an already evaluated operand"""
+        operation = UNARY_OPERATIONS.get(op.type_id, {}).get(value.__class__)
 
-        match expr.op.type_id:
+        if operation is not None:
+            return operation(op, value)
+
+        return Interpreter._checked_unary_operation(op, value)
+
+    @staticmethod
+    def _checked_unary_operation(op: Token, value: NolangType) -> NolangType:
+        """Applies a unary operator to an operand of any type, raising the error for unsupported ones"""
+        match op.type_id:
             case Tokens.NOT:
-                return NolangBool(not Interpreter._to_truthy(value))
+                return nolang_bool(not Interpreter._to_truthy(value))
             case Tokens.MINUS:
-                typ = self._check_numeric(value, expr.op)
+                typ = Interpreter._check_numeric(value, op)
                 return typ(-value.value)
             case Tokens.PLUS:
-                typ = self._check_numeric(value, expr.op)
+                typ = Interpreter._check_numeric(value, op)
                 return typ(+value.value)
             case Tokens.SQUIRT:
-                typ = self._check_numeric(value, expr.op)
+                typ = Interpreter._check_numeric(value, op)
                 return typ(value.value ** (1/2))
 
         # This should never happen in a completed implementation, do it for debugging purposes
-        raise Exception(f'Failed to interpret expression: {expr}')
+        raise Exception(f'Failed to interpret operator: {op}')
 
-    def visit_literal(self, expr: Literal):
-        return expr.value()
+    def _materialize(self, fun: FunDeclaration):
+        """Fully parses and resolves the body of a lazily parsed function"""
+        lazy: LazyBody = fun.body
 
-    def visit_array_init(self, expr: ArrayInitializer):
-        return NolangArray([ element.visit(self) for element in expr.values ])
+        # Functions declared in the body are parsed lazily as well
+        body = Parser(lazy=True).parse_body(lazy)
 
-    ### Utilities ###
+        if self.folder is not None:
+            self.folder.explore(body.stmts)
+
+        self.bindings.update(Resolver().explore_function(fun.params, body, lazy.scopes))
 
-    def _execute_body(self, body: Body, new_env: Environment = None):
+        fun.body = body
+
+    def _declare(self, stmt: VarDeclaration | FunDeclaration, value: NolangType):
+        binding = self.bindings.get(stmt)
+
+        # Locals go in the slot the resolver gave them, globals are defined by name
+        if binding is not None:
+            self.environment.values[binding[1]] = value
+        else:
+            self.environment.define(stmt.id, value)
+
+    def _execute_body(self, body: Body, new_env: Environment = None) -> NolangType:
         previous_env = self.environment
 
         # Create a new environment
-        self.environment = Environment(previous_env) if new_env is None else new_env
+        self.environment = Environment(previous_env, [ None ] * body.size) if new_env is None else new_env
 
         try:
-            # Execute all the statements
+            # Execute all the statements, up to the first one that pays
             for stmt in body.stmts:
-                stmt.visit(self)
+                paid = stmt.visit(self)
+
+                if paid is not None:
+                    return paid
 
         finally:
             # Always restore the previous environment
             self.environment = previous_env
 
+    def _execute_function(self, fun: FunDeclaration, env: Environment) -> NolangType:
+        """Runs the body of a function in the environment holding its arguments, giving back what it pays"""
+        return self._execute_body(fun.body, env)
+
     def _try_get_indexable_and_index(self, expr: IndexAccessorExpression):
         indexable = expr.indexable.visit(self)
 
         if not is_type(indexable, NolangArray):
+            # Any key can be assigned to, only reading checks it's in the map
+            if indexable.__class__ is NolangMap:
+                return (indexable, Interpreter._check_key(expr.index.visit(self), expr.bracket))
+
             raise NotIndexableException(expr.indexable, expr.bracket.line, expr.bracket.file_name)
 
         indexable: NolangArray
@@ -326,7 +484,7 @@ class Interpreter(ASTVisitor):
         if index.value < 0 or index.value > len(indexable.value) - 1:
             raise OutOfBoundsException(expr.indexable, index.value, len(indexable.value), expr.bracket.line, expr.bracket.file_name)
 
-        return (indexable.value, index.value)
+        return (indexable, index.value)
 
     @staticmethod
     def _to_truthy(val: NolangType):
@@ -373,6 +531,23 @@ class Interpreter(ASTVisitor):
 
         return typ
 
+    @staticmethod
+    def _check_key(key, op: Token):
+        """Checks if the value can be a key of a map and returns the python value it's stored under"""
+        value = key.value
+
+        # Only the keys that can be hashed have a python value of one of these types
+        if value.__class__ not in KEY_TYPES:
+            raise InvalidTypeException(op, key)
+
+        return value
+
+    @staticmethod
+    def _build_map(entries: list[NolangType], brace: Token) -> NolangMap:
+        """Makes the map of a map initializer, out of its evaluated keys and values taking turns"""
+        check_key = Interpreter._check_key
+        return nolang_map({ check_key(entries[i], brace): entries[i + 1] for i in range(0, len(entries), 2) })
+
     @staticmethod
     def _check_types(val1, val2, op, *types: type):
         """Checks if both values are any of the provided types"""
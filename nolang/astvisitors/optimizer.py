@@ -0,0 +1,171 @@
+from .astvisitor import ASTVisitor
+from ..parser.expressions import *
+from ..parser.statements import *
+from ..lexer.token import Token
+from ..lexer.token import Tokens
+from ..types import *
+
+# Integers raised to a power are only folded when the result stays below this many bits,
+# so a huge power that might never run doesn't stall (or blow up) the program on startup
+MAX_FOLDED_BITS = 4096
+
+class ConstantFolder(ASTVisitor):
+    """
+    Optimization pass that runs between the parser and the interpreter. Every unary and
+    binary expression whose operands are all literals is evaluated once, ahead of time,
+    and replaced by a literal holding the result. 'and' and 'or' are also folded when their
+    left operand is a literal which decides the result on its own.
+
+    Expressions are evaluated by the interpreter itself so the folded result is exactly
+    what running them would have given. Expressions that fail to evaluate are left alone,
+    the error is then raised when (and if) the expression actually runs, at its own line.
+    """
+
+    def __init__(self, evaluator: ASTVisitor) -> None:
+        # Evaluates expressions made of literals only, which never touches any environment
+        self.evaluator = evaluator
+
+    def explore(self, program: list[Statement]):
+        for stmt in program:
+            stmt.visit(self)
+
+    def visit_vardecl(self, stmt: VarDeclaration):
+        if stmt.has_initializer():
+            stmt.init = stmt.init.visit(self)
+
+    def visit_fundecl(self, stmt: FunDeclaration):
+        # Lazy bodies are folded when they are parsed
+        if not stmt.is_lazy():
+            self._visit_body(stmt.body)
+
+    def visit_ifstmt(self, stmt: IfStatement):
+        stmt.cond = stmt.cond.visit(self)
+        self._visit_body(stmt.if_body)
+
+        stmt.erm_bodies = [ (cond.visit(self), erm) for cond, erm in stmt.erm_bodies ]
+        for _, erm in stmt.erm_bodies:
+            self._visit_body(erm)
+
+        if stmt.has_hermph():
+            self._visit_body(stmt.hermph_body)
+
+    def visit_whileloop(self, stmt: WhileStatement):
+        stmt.cond = stmt.cond.visit(self)
+        self._visit_body(stmt.while_body)
+
+        if stmt.has_hermph():
+            self._visit_body(stmt.hermph_body)
+
+    def visit_bounceloop(self, stmt: BounceStatement):
+        stmt.cond = stmt.cond.visit(self)
+        self._visit_body(stmt.bounce_body)
+
+    def visit_exprstmt(self, stmt: ExprStatement):
+        stmt.expr = stmt.expr.visit(self)
+
+    def visit_return(self, stmt: ReturnStatement):
+        if stmt.has_value():
+            stmt.value = stmt.value.visit(self)
+
+    def visit_identifier_access(self, expr: IDAccessorExpression):
+        return expr
+
+    def visit_identifier_assign(self, expr: IDAssignExpression):
+        expr.assign = expr.assign.visit(self)
+        return expr
+
+    def visit_index_access(self, expr: IndexAccessorExpression):
+        expr.indexable = expr.indexable.visit(self)
+        expr.index = expr.index.visit(self)
+        return expr
+
+    def visit_index_assign(self, expr: IndexAssignExpression):
+        expr.accessor = expr.accessor.visit(self)
+        expr.assign = expr.assign.visit(self)
+        return expr
+
+    def visit_call(self, expr: CallExpression):
+        expr.callee = expr.callee.visit(self)
+        expr.args = [ arg.visit(self) for arg in expr.args ]
+        return expr
+
+    def visit_binexpr(self, expr: BinaryExpression):
+        expr.left = expr.left.visit(self)
+        expr.right = expr.right.visit(self)
+
+        if not isinstance(expr.left, Literal):
+            return expr
+
+        # The right operand of 'and'/'or' is never evaluated if the left one decides the result
+        match expr.op.type_id:
+            case Tokens.AND | Tokens.OR:
+                decides = self.evaluator._to_truthy(expr.left.value()) == (expr.op.type_id == Tokens.OR)
+
+                if decides or isinstance(expr.right, Literal):
+                    return self._fold(expr)
+
+                return expr
+
+        if not isinstance(expr.right, Literal) or self._too_big(expr):
+            return expr
+
+        return self._fold(expr)
+
+    def visit_unexpr(self, expr: UnaryExpression):
+        expr.operand = expr.operand.visit(self)
+
+        if not isinstance(expr.operand, Literal):
+            return expr
+
+        return self._fold(expr)
+
+    def visit_literal(self, expr: Literal):
+        return expr
+
+    def visit_array_init(self, expr: ArrayInitializer):
+        # Arrays are mutable so the initializer itself must create a new array every time
+        expr.values = [ element.visit(self) for element in expr.values ]
+        return expr
+
+    def visit_map_init(self, expr: MapInitializer):
+        # Maps are mutable as well
+        expr.entries = [ (key.visit(self), value.visit(self)) for key, value in expr.entries ]
+        return expr
+
+    ### Utilities ###
+
+    def _visit_body(self, body: Body):
+        for stmt in body.stmts:
+            stmt.visit(self)
+
+    def _fold(self, expr: BinaryExpression | UnaryExpression) -> Expression:
+        """Evaluates the expression and returns a literal of the result, or the expression itself if that fails"""
+        try:
+            value = expr.visit(self.evaluator)
+
+        # Any error is raised again when the expression runs
+        except Exception:
+            return expr
+
+        match value:
+            case NolangBool(): type_id = Tokens.TRUE if value.value else Tokens.FALSE
+            case NolangInt(): type_id = Tokens.INT_LITERAL
+            case NolangFloat(): type_id = Tokens.FLOAT_LITERAL
+            case NolangString(): type_id = Tokens.STR_LITERAL
+            case NolangNol(): type_id = Tokens.NOL
+            case _: return expr
+
+        return Literal(Token(type_id, repr(value), expr.op.line, expr.op.file_name, value))
+
+    @staticmethod
+    def _too_big(expr: BinaryExpression) -> bool:
+        """Checks if the expression is an integer power with a result too big to fold"""
+        if expr.op.type_id != Tokens.EXP:
+            return False
+
+        base, exponent = expr.left.value(), expr.right.value()
+
+        if not isinstance(base, NolangInt) or not isinstance(exponent, NolangInt):
+            return False
+
+        return exponent.value * max(abs(base.value).bit_length(), 1) > MAX_FOLDED_BITS
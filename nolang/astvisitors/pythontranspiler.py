@@ -0,0 +1,598 @@
+from .astvisitor import ASTVisitor
+
+from ..parser.expressions import *
+from ..parser.statements import *
+from ..lexer.token import Token
+from ..lexer.token import Tokens
+from ..types import *
+from ..exception import *
+
+from io import FileIO
+import builtins
+
+# Imported last, the types module forward declares its own Interpreter
+from .interpreter import Interpreter
+
+# Python operators of the binary operators that get an inlined fast path when both
+# operands are ints, anything else goes through the interpreter
+INLINED_ARITHMETIC = {
+    Tokens.PLUS: '+',
+    Tokens.MINUS: '-',
+    Tokens.STAR: '*',
+    Tokens.PERCENT: '%',
+}
+
+INLINED_COMPARISONS = {
+    Tokens.LESS_THAN: '<',
+    Tokens.GREATER_THAN: '>',
+    Tokens.LESS_THAN_EQ: '<=',
+    Tokens.GREATER_THAN_EQ: '>=',
+}
+
+class Function:
+    """Python function being generated, which is a nolang function, the program or a loop body"""
+
+    __slots__ = ('lines', 'nonlocals')
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+        # Variables of enclosing functions assigned in this one
+        self.nonlocals: set[str] = set()
+
+class PythonTranspiler(ASTVisitor):
+    """
+    Translates resolved statements into the source of a python module, which CPython
+    then compiles to its own bytecode. The program becomes a function and so does every
+    nolang function, local variables become python locals named after the variable and
+    a number that is unique in the module. Globals stay in the dictionary of the global
+    environment, since they are only known at runtime.
+
+    Operators are inlined for ints, every other case calls into the interpreter so
+    errors are raised exactly like it does, with the same messages and line numbers.
+    Loop bodies which declare functions are turned into functions themselves, so their
+    variables are created again on every iteration like nolang environments are.
+    """
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        # Gives the bindings of the resolver and parses lazy function bodies
+        self.interpreter = interpreter
+
+    def transpile(self, program: list[Statement]) -> tuple[str, dict[str, object]]:
+        """Returns the source of the module and the constants it expects to find in its globals"""
+        self.bindings = self.interpreter.bindings
+        self.echo = self.interpreter.echo
+
+        self.constants: dict[str, object] = {}
+        self.constant_names: dict[int, str] = {}
+        self.counter = 0
+
+        # Python names of the local variable slots of every environment, and the function each lives in
+        self.scopes: list[dict[int, str]] = []
+        self.owners: list[Function] = []
+
+        self.function = Function()
+        self.indent = 0
+
+        for stmt in program:
+            stmt.visit(self)
+
+        # Constants are put in the globals of the module, the values of literals are listed here
+        lines = [ f'# {name} = {value!r}'.replace('\r', '\\r').replace('\n', '\\n') for name, value in self.constants.items() if isinstance(value, NolangType) ]
+        lines += [ '', 'def __program__():' ] + self._body_of(self.function)
+
+        return '\n'.join(lines) + '\n', self.constants
+
+    def visit_vardecl(self, stmt: VarDeclaration):
+        value = stmt.init.visit(self) if stmt.has_initializer() else 'NOL'
+        self._declare(stmt, value, stmt.id.line)
+
+    def visit_fundecl(self, stmt: FunDeclaration):
+        # Python has to know every variable a function uses when it's compiled
+        if stmt.is_lazy():
+            self.interpreter._materialize(stmt)
+
+        binding = self.bindings.get(stmt)
+
+        # The function can call itself, so its name is bound before the body is translated
+        if binding is not None:
+            self._bind(binding[1], stmt.id.lexeme)
+
+        code = self._unique(f'_{stmt.id.lexeme}')
+        params = [ self._unique(param.lexeme) for param in stmt.params ]
+
+        caller = self._enter(dict(enumerate(params)))
+        self._statements(stmt.body.stmts)
+
+        # Functions that don't pay give back nol
+        if not isinstance(stmt.body.stmts[-1], ReturnStatement):
+            self._emit('return NOL')
+        self._leave(caller, f'def {code}({", ".join(params)}):', stmt.id.line)
+
+        self._declare(stmt, f'CompiledFunction({self._constant(stmt)}, {code})', stmt.id.line)
+
+    def visit_ifstmt(self, stmt: IfStatement):
+        keyword = 'if'
+
+        for cond, body in [ (stmt.cond, stmt.if_body) ] + stmt.erm_bodies:
+            self._emit(f'{keyword} {self._condition(cond)}:', self._line_of(cond))
+            self._indented(lambda: self._block(body))
+            keyword = 'elif'
+
+        if stmt.has_hermph():
+            self._emit('else:')
+            self._indented(lambda: self._block(stmt.hermph_body))
+
+    def visit_whileloop(self, stmt: WhileStatement):
+        run = self._loop_body(stmt.while_body)
+
+        self._emit(f'while {self._condition(stmt.cond)}:', self._line_of(stmt.cond))
+        self._indented(run)
+
+        # There is no 'break' in nolang, so the hermph body always runs after the loop
+        if stmt.has_hermph():
+            self._block(stmt.hermph_body)
+
+    def visit_bounceloop(self, stmt: BounceStatement):
+        run = self._loop_body(stmt.bounce_body)
+
+        self._emit('while True:')
+        self._indented(run)
+        self._indented(lambda: self._emit(f'if not {self._condition(stmt.cond)}: break', self._line_of(stmt.cond)))
+
+    def visit_exprstmt(self, stmt: ExprStatement):
+        line = self._line_of(stmt.expr)
+
+        # Assignments to locals read better as statements
+        if not self.echo and isinstance(stmt.expr, IDAssignExpression) and self.bindings.get(stmt.expr) is not None:
+            name = self._assigned(self.bindings[stmt.expr])
+            self._emit(f'{name} = {stmt.expr.assign.visit(self)}', line)
+            return
+
+        value = stmt.expr.visit(self)
+        self._emit(f'echo({value})' if self.echo else value, line)
+
+    def visit_return(self, stmt: ReturnStatement):
+        if not stmt.has_value():
+            self._emit('return NOL', stmt.token.line)
+            return
+
+        # Calls in tail position are made by the call this pays to, so recursion doesn't grow the stack
+        if isinstance(stmt.value, CallExpression):
+            expr: CallExpression = stmt.value
+            callee = expr.callee.visit(self)
+            args = ', '.join([ arg.visit(self) for arg in expr.args ])
+
+            self._emit(f'return TailCall({self._constant(expr)}, {callee}, [{args}])', stmt.token.line)
+            return
+
+        self._emit(f'return {stmt.value.visit(self)}', stmt.token.line)
+
+    def visit_identifier_assign(self, expr: IDAssignExpression):
+        value = expr.assign.visit(self)
+        binding = self.bindings.get(expr)
+
+        # We know which variable locals are
+        if binding is not None:
+            return f'({self._assigned(binding)} := {value})'
+
+        # Distance is None, this might be a global variable
+        return f'store_global({value}, {self._constant(expr.id)})'
+
+    def visit_identifier_access(self, expr: IDAccessorExpression):
+        binding = self.bindings.get(expr)
+
+        # We know which variable locals are
+        if binding is not None:
+            distance, slot = binding
+            return self.scopes[-1 - distance][slot]
+
+        # Distance is None, this might be a global variable
+        name = repr(expr.id.lexeme)
+        return f'(G[{name}] if {name} in G else undefined({self._constant(expr.id)}))'
+
+    def visit_index_access(self, expr: IndexAccessorExpression):
+        array, values, index, info = self._temp(), self._temp(), self._temp(), self._constant(expr)
+
+        # The indexable is checked before the index is evaluated, it can be a grid or a map as well. Values of
+        # packed arrays and maps are read by the runtime checks, which look up any key of a map
+        element = f'({values}[{index}.value] if ({values} := {array}.value).__class__ is list else element({array}, {index}, {info}))'
+        load = f'({element} if ({index} := {expr.index.visit(self)}).__class__ is NolangInt and 0 <= {index}.value < len({array}.value) else bad_index({array}, {index}, {info}))'
+        return f'({load} if isinstance({array} := {expr.indexable.visit(self)}, INDEXABLE_TYPES) else not_indexable({info}))'
+
+    def visit_index_assign(self, expr: IndexAssignExpression):
+        accessor, info = expr.accessor, self._constant(expr.accessor)
+
+        # The index is checked before the assigned value is evaluated
+        array = f'indexable({accessor.indexable.visit(self)}, {info})'
+        return f'store_index(*locate({array}, {accessor.index.visit(self)}, {info}), {expr.assign.visit(self)})'
+
+    def visit_call(self, expr: CallExpression):
+        function = self._temp()
+        evaluated = [ f'({function} := {expr.callee.visit(self)})' ]
+
+        # Arguments are evaluated once, before the callee is checked, both branches use them
+        args = []
+        for arg in expr.args:
+            args.append(self._temp())
+            evaluated.append(f'({args[-1]} := {arg.visit(self)})')
+
+        args = ', '.join(args)
+        evaluated = evaluated[0] if len(evaluated) == 1 else f'({", ".join(evaluated)})[0]'
+
+        # Compiled functions are called directly, everything else goes through the checks of the interpreter.
+        # The calls compiled functions pay in tail position are made once they returned
+        result = self._temp()
+        direct = f'({result} if ({result} := {function}.code({args})).__class__ is not TailCall else tail_call({result}))'
+        return f'({direct} if {evaluated}.__class__ is CompiledFunction and {function}.param_count == {len(expr.args)} else call({function}, [{args}], {self._constant(expr)}))'
+
+    def visit_binexpr(self, expr: BinaryExpression):
+        op = expr.op.type_id
+
+        if op == Tokens.OR or op == Tokens.AND or op == Tokens.EQUAL or op == Tokens.NEQUAL or op in INLINED_COMPARISONS:
+            return f'(TRUE if {self._condition(expr)} else FALSE)'
+
+        left, right = expr.left.visit(self), expr.right.visit(self)
+
+        if op not in INLINED_ARITHMETIC:
+            return f'binary({self._constant(expr.op)}, {left}, {right})'
+
+        val1, val2 = self._temp(), self._temp()
+        return f'(nolang_int({val1}.value {INLINED_ARITHMETIC[op]} {val2}.value) if ({val1} := {left}).__class__ is ({val2} := {right}).__class__ is NolangInt else binary({self._constant(expr.op)}, {val1}, {val2}))'
+
+    def visit_unexpr(self, expr: UnaryExpression):
+        match expr.op.type_id:
+            case Tokens.NOT:
+                return f'(FALSE if {self._condition(expr.operand)} else TRUE)'
+
+            case Tokens.MINUS:
+                value = self._temp()
+                return f'(nolang_int(-{value}.value) if ({value} := {expr.operand.visit(self)}).__class__ is NolangInt else unary({self._constant(expr.op)}, {value}))'
+
+        return f'unary({self._constant(expr.op)}, {expr.operand.visit(self)})'
+
+    def visit_literal(self, expr: Literal):
+        return self._constant(expr.value())
+
+    def visit_array_init(self, expr: ArrayInitializer):
+        return f'nolang_array([{", ".join(element.visit(self) for element in expr.values)}])'
+
+    def visit_map_init(self, expr: MapInitializer):
+        return f'build_map([{", ".join(part.visit(self) for entry in expr.entries for part in entry)}], {self._constant(expr.brace)})'
+
+    ### Utilities ###
+
+    def _equal(self, expr: BinaryExpression) -> str:
+        """Translates == into a python bool, containers are compared by the values they hold"""
+        val1, val2 = self._temp(), self._temp()
+
+        # The | evaluates both operands before the type of the left one picks the comparison
+        return f'(equal({val1}, {val2}) if (({val1} := {expr.left.visit(self)}).__class__ in CONTAINER_TYPES) | (({val2} := {expr.right.visit(self)}) is None) else {val1}.value == {val2}.value)'
+
+    def _condition(self, expr: Expression) -> str:
+        """Translates an expression whose value is only used for its truthiness into a python bool"""
+        match expr:
+            case Literal():
+                return repr(Interpreter._to_truthy(expr.value()))
+
+            case UnaryExpression() if expr.op.type_id == Tokens.NOT:
+                return f'(not {self._condition(expr.operand)})'
+
+            case BinaryExpression() if expr.op.type_id == Tokens.OR:
+                return f'({self._condition(expr.left)} or {self._condition(expr.right)})'
+
+            case BinaryExpression() if expr.op.type_id == Tokens.AND:
+                return f'({self._condition(expr.left)} and {self._condition(expr.right)})'
+
+            case BinaryExpression() if expr.op.type_id == Tokens.EQUAL:
+                return self._equal(expr)
+
+            case BinaryExpression() if expr.op.type_id == Tokens.NEQUAL:
+                return f'(not {self._equal(expr)})'
+
+            case BinaryExpression() if expr.op.type_id in INLINED_COMPARISONS:
+                val1, val2 = self._temp(), self._temp()
+                compare = INLINED_COMPARISONS[expr.op.type_id]
+                return f'({val1}.value {compare} {val2}.value if ({val1} := {expr.left.visit(self)}).__class__ is ({val2} := {expr.right.visit(self)}).__class__ is NolangInt else binary({self._constant(expr.op)}, {val1}, {val2}).value)'
+
+        value = self._temp()
+        return f'({value}.value if ({value} := {expr.visit(self)}).__class__ is NolangBool else to_truthy({value}))'
+
+    def _statements(self, stmts: list[Statement]):
+        for stmt in stmts:
+            stmt.visit(self)
+
+    def _block(self, body: Body):
+        """Translates a body that runs in the python function it appears in"""
+        self.scopes.append({})
+        self.owners.append(self.function)
+        self._statements(body.stmts)
+        self.scopes.pop()
+        self.owners.pop()
+
+    def _loop_body(self, body: Body):
+        """Translates the body of a loop, returning what emits it inside of the loop"""
+        if not contains(body.stmts, FunDeclaration):
+            return lambda: self._block(body)
+
+        # Functions declared in the body capture the variables of that one iteration
+        code = self._unique('_body')
+        caller = self._enter({})
+        self._statements(body.stmts)
+        self._leave(caller, f'def {code}():')
+
+        if not contains(body.stmts, ReturnStatement):
+            return lambda: self._emit(f'{code}()')
+
+        result = self._temp()
+        return lambda: self._emit(f'if ({result} := {code}()) is not None: return {result}')
+
+    def _enter(self, scope: dict[int, str]) -> tuple[Function, int]:
+        """Starts a new python function whose body is a new scope, returning where the caller was"""
+        caller = (self.function, self.indent)
+        self.function, self.indent = Function(), 0
+
+        self.scopes.append(scope)
+        self.owners.append(self.function)
+
+        return caller
+
+    def _leave(self, caller: tuple[Function, int], header: str, line: int = None):
+        """Finishes the current python function and defines it where the caller was"""
+        body = self._body_of(self.function)
+
+        self.scopes.pop()
+        self.owners.pop()
+        self.function, self.indent = caller
+
+        self._emit(header, line)
+        self.function.lines += [ '    ' * self.indent + code for code in body ]
+
+    def _body_of(self, function: Function) -> list[str]:
+        lines = [ f'    nonlocal {", ".join(sorted(function.nonlocals))}' ] if function.nonlocals else []
+        lines += [ f'    {line}' for line in function.lines ]
+
+        # Bodies that only declare functions which are never used still need a statement
+        return lines if lines else [ '    pass' ]
+
+    def _emit(self, line: str, source_line: int = None):
+        comment = f'  # line {source_line}' if source_line is not None else ''
+        self.function.lines.append('    ' * self.indent + line + comment)
+
+    def _indented(self, emit):
+        self.indent += 1
+        emit()
+        self.indent -= 1
+
+    def _declare(self, stmt: VarDeclaration | FunDeclaration, value: str, line: int):
+        binding = self.bindings.get(stmt)
+
+        # Locals get a python variable of their own, globals are defined by name
+        if binding is not None:
+            name = self._bind(binding[1], stmt.id.lexeme)
+            self._emit(f'{name} = {value}', line)
+        else:
+            self._emit(f'G[{stmt.id.lexeme!r}] = {value}', line)
+
+    def _bind(self, slot: int, name: str) -> str:
+        """Gives the slot of the current scope its python variable, a variable declared again keeps it"""
+        scope = self.scopes[-1]
+
+        if slot not in scope:
+            scope[slot] = self._unique(name)
+
+        return scope[slot]
+
+    def _assigned(self, binding: tuple[int, int]) -> str:
+        """Returns the python variable of the binding, which is about to be assigned"""
+        distance, slot = binding
+        name = self.scopes[-1 - distance][slot]
+
+        if self.owners[-1 - distance] is not self.function:
+            self.function.nonlocals.add(name)
+
+        return name
+
+    def _unique(self, name: str) -> str:
+        self.counter += 1
+        return f'{name}_{self.counter}'
+
+    def _temp(self) -> str:
+        self.counter += 1
+        return f'_t{self.counter}'
+
+    def _constant(self, value) -> str:
+        name = self.constant_names.get(id(value))
+
+        if name is None:
+            name = self.constant_names[id(value)] = f'_c{len(self.constants)}'
+            self.constants[name] = value
+
+        return name
+
+    @staticmethod
+    def _line_of(expr: Expression) -> int:
+        match expr:
+            case IDAccessorExpression() | IDAssignExpression(): return expr.id.line
+            case BinaryExpression() | UnaryExpression(): return expr.op.line
+            case CallExpression(): return expr.paren.line
+            case IndexAccessorExpression(): return expr.bracket.line
+            case IndexAssignExpression(): return expr.accessor.bracket.line
+            case Literal(): return expr.token.line
+            case ArrayInitializer() if expr.values: return PythonTranspiler._line_of(expr.values[0])
+
+        return None
+
+class CompiledFunction(NolangFunction):
+    """Nolang function whose body was translated to a python function"""
+
+    def __init__(self, fun: FunDeclaration, code) -> None:
+        super().__init__(fun, None)
+        self.code = code
+        self.param_count = len(fun.params)
+
+    def __call__(self, interpreter: Interpreter, args: list[NolangType], *_):
+        paid = self.code(*args)
+        return paid if paid.__class__ is not TailCall else interpreter._tail_call(paid)
+
+### Runtime checks of the generated code ###
+
+# Values that can be indexed, arrays (and grids) by position and maps by key
+INDEXABLE_TYPES = (NolangArray, NolangMap)
+
+def undefined(id: Token):
+    raise VariableNotDefinedException(id.lexeme, id.line, id.file_name)
+
+def not_indexable(expr: IndexAccessorExpression):
+    raise NotIndexableException(expr.indexable, expr.bracket.line, expr.bracket.file_name)
+
+def element(array: NolangArray | NolangMap, index: NolangType, expr: IndexAccessorExpression) -> NolangType:
+    values = array.value
+
+    # Ints in the range of the map's size are looked up like any other key
+    if values.__class__ is dict:
+        return lookup(array, index, expr)
+
+    # Packed arrays hold raw values, which are boxed on the way out
+    return nolang_int(values[index.value]) if values.typecode == INT64 else nolang_float(values[index.value])
+
+def lookup(map: NolangMap, key: NolangType, expr: IndexAccessorExpression) -> NolangType:
+    key = Interpreter._check_key(key, expr.bracket)
+    value = map.value.get(key)
+
+    if value is None:
+        raise KeyNotFoundException(expr.indexable, key, expr.bracket.line, expr.bracket.file_name)
+
+    return value
+
+def bad_index(array: NolangArray | NolangMap, index: NolangType, expr: IndexAccessorExpression):
+    # Keys of maps don't have to be ints in the range of their size
+    if array.__class__ is NolangMap:
+        return lookup(array, index, expr)
+
+    if not isinstance(index, NolangInt):
+        raise InvalidTypeException(expr.bracket, index)
+
+    raise OutOfBoundsException(expr.indexable, index.value, len(array.value), expr.bracket.line, expr.bracket.file_name)
+
+def indexable(array: NolangType, expr: IndexAccessorExpression) -> NolangArray | NolangMap:
+    if not isinstance(array, INDEXABLE_TYPES):
+        not_indexable(expr)
+
+    return array
+
+def locate(array: NolangArray | NolangMap, index: NolangType, expr: IndexAccessorExpression) -> tuple[NolangArray, int] | tuple[NolangMap, object]:
+    # Any key can be assigned to, only reading checks it's in the map
+    if array.__class__ is NolangMap:
+        return array, Interpreter._check_key(index, expr.bracket)
+
+    if not isinstance(index, NolangInt) or index.value < 0 or index.value > len(array.value) - 1:
+        bad_index(array, index, expr)
+
+    return array, index.value
+
+def store_index(array: NolangArray | NolangMap, i, value: NolangType) -> NolangType:
+    values = array.value
+
+    # Packed arrays store the raw value, or unpack themselves when it doesn't fit, maps store any key
+    if values.__class__ is list:
+        values[i] = value
+    else:
+        array[i] = value
+
+    return value
+
+RUNTIME_CHECKS = {
+    'NOL': NOL,
+    'TRUE': TRUE,
+    'FALSE': FALSE,
+    'nolang_int': nolang_int,
+    'nolang_array': nolang_array,
+    'NolangInt': NolangInt,
+    'NolangBool': NolangBool,
+    'NolangArray': NolangArray,
+    'INDEXABLE_TYPES': INDEXABLE_TYPES,
+    'CONTAINER_TYPES': CONTAINER_TYPES,
+    'equal': equal,
+    'CompiledFunction': CompiledFunction,
+    'TailCall': TailCall,
+    'binary': Interpreter._binary_operation,
+    'unary': Interpreter._unary_operation,
+    'to_truthy': Interpreter._to_truthy,
+    'undefined': undefined,
+    'not_indexable': not_indexable,
+    'element': element,
+    'bad_index': bad_index,
+    'indexable': indexable,
+    'locate': locate,
+    'store_index': store_index,
+    'build_map': Interpreter._build_map,
+}
+
+class PythonInterpreter(Interpreter):
+    """
+    Interpreter that translates the program to python and has CPython run it. The module
+    is written to dump instead, when given, so it can be inspected.
+    """
+
+    def __init__(self, fold: bool = True, dump: FileIO = None):
+        super().__init__(fold)
+
+        self.transpiler = PythonTranspiler(self)
+        self.dump = dump
+
+    def _run(self, program: list[Statement]):
+        source, constants = self.transpiler.transpile(program)
+
+        if self.dump is not None:
+            self.dump.write(source)
+            return
+
+        # CPython refuses expressions nested too deep, like long operator chains, which the
+        # interpreter runs instead. Nothing has run yet, so the whole program falls back. Our
+        # SyntaxError shadows the builtin one compile raises
+        try:
+            code = compile(source, '<nolang>', 'exec')
+
+        except (builtins.SyntaxError, RecursionError, MemoryError):
+            return super()._run(program)
+
+        module = { **RUNTIME_CHECKS, **constants, 'G': self.globals.values, 'call': self._call, 'tail_call': self._tail_call, 'store_global': self._store_global, 'echo': self._echo }
+        exec(code, module)
+
+        module['__program__']()
+
+    def _call(self, callee: NolangType, args: list[NolangType], expr: CallExpression) -> NolangType:
+        if not isinstance(callee, NolangCallable):
+            raise NotCallableException(expr.callee, expr.paren.line, expr.paren.file_name)
+
+        arity = callee.arity()
+        given = len(args)
+
+        if arity != given:
+            raise InvalidArgumentsException(expr.callee, arity, given, expr.paren.line, expr.paren.file_name)
+
+        result = callee(self, args, expr.paren.line, expr.paren.file_name)
+        return NOL if result is None else result
+
+    def _tail_call(self, paid: TailCall) -> NolangType:
+        """Makes the calls compiled functions pay in tail position one after the other, see TailCall"""
+        while paid.__class__ is TailCall:
+            callee, args = paid.callee, paid.args
+
+            # Anything but a compiled function is called the regular way
+            if callee.__class__ is not CompiledFunction or callee.param_count != len(args):
+                return self._call(callee, args, paid.expr)
+
+            paid = callee.code(*args)
+
+        return paid
+
+    def _store_global(self, value: NolangType, id: Token) -> NolangType:
+        self.globals.assign(id, value)
+        return value
+
+    def _echo(self, value: NolangType):
+        if value is not NOL:
+            print(value)
+
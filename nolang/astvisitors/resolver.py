@@ -4,23 +4,42 @@ from ..parser.expressions import *
 from ..parser.statements import *
 from ..exception import *
 
+class Scope: pass
+class Scope(dict[str, bool]):
+    """
+    Names declared in a scope mapped to whether they are initialized yet. Every name also
+    gets a slot, the index its value is stored at in the environment created for the scope.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.slots: dict[str, int] = {}
+
+    def copy(self) -> Scope:
+        scope = Scope()
+        scope.update(self)
+        scope.slots.update(self.slots)
+        return scope
+
 class Resolver(ASTVisitor):
     """
     The variable resolver pass bakes the number of hops in the environment stack
-    needed for any variable usage. This allows for a mutable environment that
-    still respects static scoping.
+    needed for any variable usage, together with the slot the variable is stored at
+    in that environment. This allows for a mutable environment that still respects
+    static scoping.
     """
 
     def __init__(self):
         # Extend all variable expression nodes with an extra property indicating the distance
         # from the current environment in which it appears to the enclosing environment
-        # referencing the variable.
+        # referencing the variable, and the slot of the variable in that environment.
+        # Declarations of local variables get the slot they define (at distance 0).
         #
         # This applies only to local variables since globals are treated differently. This
         # allows global-level functions to have cyclic dependencies. Unfortunately this means
         # we can't check for undefined variables at compile time. :(
         #
-        self.locals: dict[Expression, int] = dict()
+        self.locals: dict[Expression | Statement, tuple[int, int]] = dict()
 
         # A scope acts like a quasi-environment which indicates only whether variables
         # are initialized or not, we do not care about the actual values of these variables
@@ -29,9 +48,9 @@ class Resolver(ASTVisitor):
         # Keep a stack of all the scopes that is pushed when entering a scope and popped
         # when exiting, local variables are declared/defined in the current stack.
         #
-        self.scopes: list[dict[str, bool]] = [{}]
+        self.scopes: list[Scope] = [Scope()]
 
-    def explore(self, program: list[Statement]) -> dict[Expression, int]:
+    def explore(self, program: list[Statement]) -> dict[Expression | Statement, tuple[int, int]]:
 
         # We keep track of function and loop nesting to ensure some statements are used correctly!
         self.function_counter = 0
@@ -56,25 +75,30 @@ class Resolver(ASTVisitor):
 
         # Mark the variable as ready to use
         self._define(stmt.id)
+        self._bind(stmt, stmt.id)
+
+    def explore_function(self, params: list[Token], body: Body, scopes: list[Scope]) -> dict[Expression | Statement, tuple[int, int]]:
+        """Resolves the freshly parsed body of a lazy function in the scopes it was declared in"""
+        self.function_counter = 0
+        self.loop_counter = 0
+        self.scopes = scopes
+
+        self._visit_function(params, body)
+
+        return self.locals
 
     def visit_fundecl(self, stmt: FunDeclaration):
         # We eagerly define a function to allow recursion
         self._define(stmt.id)
+        self._bind(stmt, stmt.id)
 
-        # Parameters appear in the same scope as the body
-        self.scopes.append({})
-
-        # Parameters are not initialized by the user, so they're safe to eagerly define too
-        for param in stmt.params:
-            self._define(param)
-
-        # We are entering a function body, increment the counter
-        self.function_counter += 1
-        for stmt in stmt.body.stmts:
-            stmt.visit(self)
-        self.function_counter -= 1
+        # Lazy bodies are resolved once they are parsed, which happens on the first call. The
+        # global scope is left out of the copy, since globals are found at runtime either way.
+        if stmt.is_lazy():
+            stmt.body.scopes = [ Scope() ] + [ scope.copy() for scope in self.scopes[1:] ]
+            return
 
-        self.scopes.pop()
+        self._visit_function(stmt.params, stmt.body)
 
     def visit_ifstmt(self, stmt: IfStatement):
         stmt.cond.visit(self)
@@ -149,13 +173,34 @@ class Resolver(ASTVisitor):
         for element in expr.values:
             element.visit(self)
 
+    def visit_map_init(self, expr: MapInitializer):
+        for key, value in expr.entries:
+            key.visit(self)
+            value.visit(self)
+
     ### Utilities ###
 
+    def _visit_function(self, params: list[Token], body: Body):
+        # Parameters appear in the same scope as the body, they take up the first slots
+        self.scopes.append(Scope())
+
+        # Parameters are not initialized by the user, so they're safe to eagerly define too
+        for param in params:
+            self._define(param)
+
+        # We are entering a function body, increment the counter
+        self.function_counter += 1
+        for stmt in body.stmts:
+            stmt.visit(self)
+        self.function_counter -= 1
+
+        body.size = len(self.scopes.pop().slots)
+
     def _visit_body(self, body: Body):
-        self.scopes.append({})
+        self.scopes.append(Scope())
         for stmt in body.stmts:
             stmt.visit(self)
-        self.scopes.pop()
+        body.size = len(self.scopes.pop().slots)
 
     def _declare(self, name: Token):
         if len(self.scopes) == 0:
@@ -163,6 +208,7 @@ class Resolver(ASTVisitor):
 
         scope = self.scopes[-1]
         scope[name.lexeme] = False
+        scope.slots.setdefault(name.lexeme, len(scope.slots))
 
     def _define(self, name: Token):
         if len(self.scopes) == 0:
@@ -173,9 +219,16 @@ class Resolver(ASTVisitor):
             raise VariableRedefinitionException(name.lexeme, name.line, name.file_name)
 
         scope[name.lexeme] = True
+        scope.slots.setdefault(name.lexeme, len(scope.slots))
+
+    def _bind(self, stmt: Statement, name: Token):
+        """Binds a declaration to the slot it defines, globals are looked up by name instead"""
+        if len(self.scopes) > 1:
+            self.locals[stmt] = (0, self.scopes[-1].slots[name.lexeme])
 
     def _resolve(self, expr: Expression, name: Token):
-        for i in range(len(self.scopes) - 1, -1, -1):
+        # The global scope is skipped, globals are looked up by name
+        for i in range(len(self.scopes) - 1, 0, -1):
             if name.lexeme in self.scopes[i]:
-                self.locals[expr] = len(self.scopes) - 1 - i
+                self.locals[expr] = (len(self.scopes) - 1 - i, self.scopes[i].slots[name.lexeme])
                 return
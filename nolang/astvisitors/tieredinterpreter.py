@@ -0,0 +1,120 @@
+from ..parser.expressions import *
+from ..parser.statements import *
+from ..types import *
+
+from io import FileIO
+
+# Imported last, the types module forward declares its own Interpreter
+from .interpreter import Environment, Interpreter
+from .closurecompiler import Closure, ClosureCompiler
+
+# Calls plus loop iterations after which code is considered hot and gets compiled
+HOT_THRESHOLD = 500
+
+class TieredInterpreter(Interpreter):
+    """
+    Interpreter that starts out walking the tree and compiles code into closures once it
+    turns out to be hot, so short scripts don't pay for compiling code that runs once.
+
+    Every function keeps a hotness counter, which goes up by one for every call and every
+    loop iteration in its body. The function is compiled once the counter passes the
+    threshold, later calls run the compiled body. The loop that pushed it over the threshold
+    is compiled on its own and runs compiled from its next iteration on, so a long loop
+    doesn't have to wait for the next call. Loops at the top level of the program are
+    compiled the same way.
+
+    Tier-ups and compiled loops are written to report, when given.
+    """
+
+    def __init__(self, fold: bool = True, threshold: int = HOT_THRESHOLD, report: FileIO = None):
+        super().__init__(fold)
+
+        self.compiler = ClosureCompiler(self)
+        self.threshold = threshold
+        self.report = report
+
+        # Hotness of every function called so far
+        self.hotness: dict[FunDeclaration, int] = {}
+
+        # Compiled function bodies and loops
+        self.compiled: dict[FunDeclaration | Statement, Closure] = {}
+
+        # Function running right now (None at the top level) and its hotness
+        self.function: FunDeclaration = None
+        self.heat = 0
+
+    def visit_whileloop(self, stmt: WhileStatement):
+        while self._to_truthy(stmt.cond.visit(self)):
+            paid = self._execute_body(stmt.while_body)
+
+            if paid is not None:
+                return paid
+
+            self.heat += 1
+            if self.heat > self.threshold:
+                return self._compile_loop(stmt)(self.environment)
+
+        else:
+            if stmt.has_hermph():
+                return self._execute_body(stmt.hermph_body)
+
+    def visit_bounceloop(self, stmt: BounceStatement):
+        paid = self._execute_body(stmt.bounce_body)
+
+        while paid is None and self._to_truthy(stmt.cond.visit(self)):
+            paid = self._execute_body(stmt.bounce_body)
+
+            self.heat += 1
+            if paid is None and self.heat > self.threshold:
+                return self._compile_loop(stmt)(self.environment)
+
+        return paid
+
+    ### Utilities ###
+
+    def _execute_function(self, fun: FunDeclaration, env: Environment) -> NolangType:
+        run = self.compiled.get(fun)
+
+        if run is not None:
+            return run(env)
+
+        # Loops in the body heat up the function being called
+        caller, caller_heat = self.function, self.heat
+        self.function, self.heat = fun, self.hotness.get(fun, 0) + 1
+
+        try:
+            if self.heat > self.threshold:
+                return self._compile_function(fun)(env)
+
+            return self._execute_body(fun.body, env)
+
+        finally:
+            self.hotness[fun] = self.heat
+            self.function, self.heat = caller, caller_heat
+
+    def _compile_function(self, fun: FunDeclaration) -> Closure:
+        run = self.compiled[fun] = self.compiler.compile(fun.body.stmts)
+        self._report(f'greg {fun.id.lexeme}')
+
+        return run
+
+    def _compile_loop(self, stmt: WhileStatement | BounceStatement) -> Closure:
+        """Compiles the loop, which runs compiled from its next iteration on"""
+        # The rest of the function is compiled for the next call as well
+        if self.function is not None and self.function not in self.compiled:
+            self._compile_function(self.function)
+
+        run = self.compiled.get(stmt)
+
+        if run is None:
+            # After its first iteration a bounce loop is a plain while loop
+            loop = stmt if isinstance(stmt, WhileStatement) else WhileStatement(stmt.cond, stmt.bounce_body, None)
+
+            run = self.compiled[stmt] = loop.visit(self.compiler)
+            self._report(f'loop in {f"greg {self.function.id.lexeme}" if self.function is not None else "the program"}')
+
+        return run
+
+    def _report(self, code: str):
+        if self.report is not None:
+            self.report.write(f'[tier] compiled {code}, its hotness of {self.heat} passed the threshold of {self.threshold}\n')
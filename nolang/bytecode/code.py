@@ -0,0 +1,90 @@
+from enum import IntEnum
+from enum import auto
+
+class Opcode(IntEnum):
+    """
+    Instructions of the virtual machine. Every instruction is two ints long, the opcode
+    and its argument (0 when it takes none), so the code can be stored in a flat list.
+    """
+
+    LOAD_CONST      = 0
+    LOAD_LOCAL      = auto()
+    LOAD_DEREF      = auto()
+    LOAD_GLOBAL     = auto()
+    STORE_LOCAL     = auto()
+    STORE_DEREF     = auto()
+    STORE_GLOBAL    = auto()
+    DECLARE_LOCAL   = auto()
+    DECLARE_GLOBAL  = auto()
+    POP             = auto()
+    PRINT_EXPR      = auto()
+    ADD             = auto()
+    SUBTRACT        = auto()
+    MULTIPLY        = auto()
+    DIVIDE          = auto()
+    MODULO          = auto()
+    POWER           = auto()
+    LESS            = auto()
+    GREATER         = auto()
+    LESS_EQUAL      = auto()
+    GREATER_EQUAL   = auto()
+    EQUAL           = auto()
+    NOT_EQUAL       = auto()
+    NEGATE          = auto()
+    NOT             = auto()
+    UNARY           = auto()
+    TO_BOOL         = auto()
+    JUMP            = auto()
+    POP_JUMP_IF_FALSE = auto()
+    POP_JUMP_IF_TRUE  = auto()
+    JUMP_IF_FALSE_OR_POP = auto()
+    JUMP_IF_TRUE_OR_POP  = auto()
+    PUSH_ENV        = auto()
+    POP_ENV         = auto()
+    CHECK_INDEXABLE = auto()
+    CHECK_INDEX     = auto()
+    LOAD_INDEX      = auto()
+    STORE_INDEX     = auto()
+    BUILD_ARRAY     = auto()
+    BUILD_MAP       = auto()
+    FUNCTION        = auto()
+    CALL            = auto()
+    RETURN          = auto()
+    TAIL_CALL       = auto()
+
+# Arguments of these instructions are indices in the constant pool
+CONSTANT_ARGUMENTS = frozenset({
+    Opcode.LOAD_CONST, Opcode.LOAD_GLOBAL, Opcode.STORE_GLOBAL, Opcode.DECLARE_GLOBAL,
+    Opcode.ADD, Opcode.SUBTRACT, Opcode.MULTIPLY, Opcode.DIVIDE, Opcode.MODULO, Opcode.POWER,
+    Opcode.LESS, Opcode.GREATER, Opcode.LESS_EQUAL, Opcode.GREATER_EQUAL, Opcode.NEGATE, Opcode.UNARY,
+    Opcode.CHECK_INDEXABLE, Opcode.CHECK_INDEX, Opcode.LOAD_INDEX, Opcode.BUILD_MAP, Opcode.FUNCTION, Opcode.CALL, Opcode.TAIL_CALL,
+})
+
+# Arguments of these instructions are offsets in the code
+JUMP_ARGUMENTS = frozenset({
+    Opcode.JUMP, Opcode.POP_JUMP_IF_FALSE, Opcode.POP_JUMP_IF_TRUE,
+    Opcode.JUMP_IF_FALSE_OR_POP, Opcode.JUMP_IF_TRUE_OR_POP,
+})
+
+# Arguments of LOAD_DEREF and STORE_DEREF pack the distance of the environment above its slot
+DEREF_SHIFT = 16
+DEREF_MASK = (1 << DEREF_SHIFT) - 1
+
+class Code:
+    """
+    Compiled program or function body. The constant pool holds the literal values the
+    code loads as well as the tokens and nodes instructions need to report errors.
+    """
+
+    __slots__ = ('name', 'instructions', 'constants', 'lines')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.instructions: list[int] = []
+        self.constants: list = []
+
+        # Source line of every instruction, for the disassembler
+        self.lines: list[int] = []
+
+    def __repr__(self) -> str:
+        return f'<code {self.name}>'
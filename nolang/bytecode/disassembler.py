@@ -0,0 +1,71 @@
+from .code import *
+from .vm import VirtualMachine
+
+from ..parser.expressions import *
+from ..parser.statements import *
+
+from io import FileIO
+
+def disassemble(code: Code) -> str:
+    """Lists the instructions of the code, one per line, with their arguments explained"""
+    lines = [ f'Disassembly of {code.name}:' ]
+    previous_line = None
+
+    for offset in range(0, len(code.instructions), 2):
+        op, arg = Opcode(code.instructions[offset]), code.instructions[offset + 1]
+        line = code.lines[offset // 2]
+
+        # Source lines are only shown when they change, like python's dis module does
+        source_line = f'{line:>4}' if line != previous_line else ''
+        previous_line = line
+
+        lines.append(f'{source_line:>4} {offset:>6} {op.name:<20} {arg:>5}  {describe(code, op, arg)}'.rstrip())
+
+    return '\n'.join(lines)
+
+def describe(code: Code, op: Opcode, arg: int) -> str:
+    if op in JUMP_ARGUMENTS:
+        return f'(to {arg})'
+
+    if op in (Opcode.LOAD_DEREF, Opcode.STORE_DEREF):
+        return f'(distance {arg >> DEREF_SHIFT}, slot {arg & DEREF_MASK})'
+
+    if op not in CONSTANT_ARGUMENTS:
+        return ''
+
+    constant = code.constants[arg]
+
+    match constant:
+        case Token(): return f'({constant.lexeme})'
+        case FunDeclaration(): return f'({constant.id.lexeme})'
+        case CallExpression(): return f'({constant.callee}, {len(constant.args)} args)'
+        case IndexAccessorExpression(): return f'({constant.indexable}[])'
+        case MapInitializer(): return f'({len(constant.entries)} entries)'
+        case _: return f'({constant!r})'
+
+class Disassembler(VirtualMachine):
+    """
+    Prints the bytecode of the program instead of running it, followed by the bytecode
+    of every function declared in it.
+    """
+
+    def __init__(self, out: FileIO, fold: bool = True):
+        super().__init__(fold)
+        self.out = out
+
+    def _run(self, program: list[Statement]):
+        pending = [ self._compile(program, '<program>') ]
+
+        while pending:
+            code = pending.pop(0)
+            self.out.write(disassemble(code) + '\n\n')
+
+            for constant in code.constants:
+                if isinstance(constant, FunDeclaration):
+                    pending.append(self._compile_function(constant))
+
+    def _compile_function(self, fun: FunDeclaration) -> Code:
+        if fun.is_lazy():
+            self._materialize(fun)
+
+        return self._compile(fun.body.stmts, f'{fun.id.lexeme}({", ".join(param.lexeme for param in fun.params)})')
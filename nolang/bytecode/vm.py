@@ -0,0 +1,469 @@
+from .code import *
+
+from ..parser.statements import *
+from ..types import *
+from ..exception import *
+
+# Imported last, the types module forward declares its own Interpreter
+from ..astvisitors.interpreter import Environment, Interpreter
+from ..astvisitors.bytecodecompiler import BytecodeCompiler
+
+# Opcodes are compared as plain ints in the dispatch loop, which is a lot faster than enum members
+LOAD_CONST = Opcode.LOAD_CONST.value
+LOAD_LOCAL = Opcode.LOAD_LOCAL.value
+LOAD_DEREF = Opcode.LOAD_DEREF.value
+LOAD_GLOBAL = Opcode.LOAD_GLOBAL.value
+STORE_LOCAL = Opcode.STORE_LOCAL.value
+STORE_DEREF = Opcode.STORE_DEREF.value
+STORE_GLOBAL = Opcode.STORE_GLOBAL.value
+DECLARE_LOCAL = Opcode.DECLARE_LOCAL.value
+DECLARE_GLOBAL = Opcode.DECLARE_GLOBAL.value
+POP = Opcode.POP.value
+PRINT_EXPR = Opcode.PRINT_EXPR.value
+ADD = Opcode.ADD.value
+SUBTRACT = Opcode.SUBTRACT.value
+MULTIPLY = Opcode.MULTIPLY.value
+DIVIDE = Opcode.DIVIDE.value
+MODULO = Opcode.MODULO.value
+POWER = Opcode.POWER.value
+LESS = Opcode.LESS.value
+GREATER = Opcode.GREATER.value
+LESS_EQUAL = Opcode.LESS_EQUAL.value
+GREATER_EQUAL = Opcode.GREATER_EQUAL.value
+EQUAL = Opcode.EQUAL.value
+NOT_EQUAL = Opcode.NOT_EQUAL.value
+NEGATE = Opcode.NEGATE.value
+NOT = Opcode.NOT.value
+UNARY = Opcode.UNARY.value
+TO_BOOL = Opcode.TO_BOOL.value
+JUMP = Opcode.JUMP.value
+POP_JUMP_IF_FALSE = Opcode.POP_JUMP_IF_FALSE.value
+POP_JUMP_IF_TRUE = Opcode.POP_JUMP_IF_TRUE.value
+JUMP_IF_FALSE_OR_POP = Opcode.JUMP_IF_FALSE_OR_POP.value
+JUMP_IF_TRUE_OR_POP = Opcode.JUMP_IF_TRUE_OR_POP.value
+PUSH_ENV = Opcode.PUSH_ENV.value
+POP_ENV = Opcode.POP_ENV.value
+CHECK_INDEXABLE = Opcode.CHECK_INDEXABLE.value
+CHECK_INDEX = Opcode.CHECK_INDEX.value
+LOAD_INDEX = Opcode.LOAD_INDEX.value
+STORE_INDEX = Opcode.STORE_INDEX.value
+BUILD_ARRAY = Opcode.BUILD_ARRAY.value
+BUILD_MAP = Opcode.BUILD_MAP.value
+FUNCTION = Opcode.FUNCTION.value
+CALL = Opcode.CALL.value
+RETURN = Opcode.RETURN.value
+TAIL_CALL = Opcode.TAIL_CALL.value
+
+# Nolang calls the virtual machine keeps frames for before giving up on a runaway recursion
+MAX_CALL_DEPTH = 200_000
+
+class VirtualMachine(Interpreter):
+    """
+    Stack based virtual machine running the bytecode of the program. Operands and results
+    of instructions go on a stack, local variables stay in the same environments as in
+    the interpreter, so functions capture their environment the exact same way.
+
+    Calling a nolang function doesn't recurse in python, the frame of the caller is kept on
+    a stack of frames instead, so recursion can go as deep as MAX_CALL_DEPTH. Calls in tail
+    position replace the frame of the function paying them and don't grow that stack at all.
+
+    Function bodies are compiled on their first call, after lazy bodies are parsed and resolved.
+    """
+
+    def __init__(self, fold: bool = True):
+        super().__init__(fold)
+
+        # Compiled function bodies
+        self.codes: dict[Body, Code] = {}
+
+    def _run(self, program: list[Statement]):
+        self.run(self._compile(program, '<program>'), self.globals)
+
+    def _execute_body(self, body: Body, new_env: Environment = None) -> NolangType:
+        return self.run(self._code(body), Environment(self.environment, [ None ] * body.size) if new_env is None else new_env)
+
+    def _compile(self, stmts: list[Statement], name: str) -> Code:
+        return BytecodeCompiler(self.bindings, self.echo).compile(stmts, name)
+
+    def _code(self, body: Body) -> Code:
+        code = self.codes.get(body)
+
+        if code is None:
+            code = self.codes[body] = self._compile(body.stmts, '<body>')
+
+        return code
+
+    def _enter(self, function: NolangFunction, args: list[NolangType]) -> tuple[Code, Environment]:
+        """Gives back the code of the function called and the environment holding its arguments"""
+        fun = function.fun
+
+        # The body of a lazily parsed function is only parsed on its first call
+        if fun.is_lazy():
+            self._materialize(fun)
+
+        # Parameters take up the first slots of the environment, in order
+        return self._code(fun.body), Environment(function.env, args + [ None ] * (fun.body.size - len(args)))
+
+    def run(self, code: Code, env: Environment) -> NolangType:
+        """Runs the code in the environment, returning what it pays or None if it doesn't"""
+        instructions = code.instructions
+        constants = code.constants
+        end = len(instructions)
+
+        globals = self.globals.values
+        binary = Interpreter._binary_operation
+        unary = Interpreter._unary_operation
+        to_truthy = Interpreter._to_truthy
+        check_key = Interpreter._check_key
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+
+        # Code, resume offset, environment and stack of every caller of the function running
+        frames = []
+
+        while True:
+            # The most common instructions are checked first
+            while pc < end:
+                op = instructions[pc]
+                arg = instructions[pc + 1]
+                pc += 2
+
+                if op == LOAD_LOCAL:
+                    push(env.values[arg])
+
+                elif op == LOAD_CONST:
+                    push(constants[arg])
+
+                elif op == STORE_LOCAL:
+                    env.values[arg] = stack[-1]
+
+                elif op == ADD or op == SUBTRACT or op == MULTIPLY:
+                    val2 = pop()
+                    val1 = stack[-1]
+                    typ1, typ2 = val1.__class__, val2.__class__
+
+                    if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat):
+                        result = nolang_int if typ1 is typ2 is NolangInt else nolang_float
+
+                        if op == ADD:
+                            stack[-1] = result(val1.value + val2.value)
+                        elif op == SUBTRACT:
+                            stack[-1] = result(val1.value - val2.value)
+                        else:
+                            stack[-1] = result(val1.value * val2.value)
+
+                    else:
+                        stack[-1] = binary(constants[arg], val1, val2)
+
+                elif op == LESS or op == GREATER or op == LESS_EQUAL or op == GREATER_EQUAL:
+                    val2 = pop()
+                    val1 = stack[-1]
+                    typ1, typ2 = val1.__class__, val2.__class__
+
+                    if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat):
+                        if op == LESS:
+                            stack[-1] = TRUE if val1.value < val2.value else FALSE
+                        elif op == GREATER:
+                            stack[-1] = TRUE if val1.value > val2.value else FALSE
+                        elif op == LESS_EQUAL:
+                            stack[-1] = TRUE if val1.value <= val2.value else FALSE
+                        else:
+                            stack[-1] = TRUE if val1.value >= val2.value else FALSE
+
+                    else:
+                        stack[-1] = binary(constants[arg], val1, val2)
+
+                elif op == POP_JUMP_IF_FALSE:
+                    value = pop()
+                    if not (value.value if value.__class__ is NolangBool else to_truthy(value)):
+                        pc = arg
+
+                elif op == JUMP:
+                    pc = arg
+
+                elif op == PUSH_ENV:
+                    env = Environment(env, [ None ] * arg)
+
+                elif op == POP_ENV:
+                    env = env.enclosing
+
+                elif op == POP:
+                    pop()
+
+                elif op == LOAD_DEREF:
+                    environment = env
+                    for _ in range(arg >> DEREF_SHIFT):
+                        environment = environment.enclosing
+
+                    push(environment.values[arg & DEREF_MASK])
+
+                elif op == LOAD_GLOBAL:
+                    id = constants[arg]
+
+                    try:
+                        push(globals[id.lexeme])
+
+                    except KeyError:
+                        raise VariableNotDefinedException(id.lexeme, id.line, id.file_name)
+
+                elif op == CALL or op == TAIL_CALL:
+                    expr = constants[arg]
+                    given = len(expr.args)
+
+                    args = stack[len(stack) - given:]
+                    del stack[len(stack) - given:]
+                    callee = stack[-1]
+
+                    if not isinstance(callee, NolangCallable):
+                        raise NotCallableException(expr.callee, expr.paren.line, expr.paren.file_name)
+
+                    arity = callee.arity()
+                    if arity != given:
+                        raise InvalidArgumentsException(expr.callee, arity, given, expr.paren.line, expr.paren.file_name)
+
+                    # Nolang functions run right here, a tail call takes over the frame of the function paying it
+                    if callee.__class__ is NolangFunction:
+                        if op == CALL:
+                            if len(frames) == MAX_CALL_DEPTH:
+                                raise CallDepthException(MAX_CALL_DEPTH, expr.paren.line, expr.paren.file_name)
+
+                            frames.append((code, pc, env, stack))
+
+                        code, env = self._enter(callee, args)
+                        instructions, constants, end = code.instructions, code.constants, len(code.instructions)
+
+                        stack = []
+                        push, pop = stack.append, stack.pop
+                        pc = 0
+                        continue
+
+                    result = callee(self, args, expr.paren.line, expr.paren.file_name)
+
+                    if op == CALL:
+                        stack[-1] = NOL if result is None else result
+                        continue
+
+                    # Anything else called in tail position pays its result right away
+                    if not frames:
+                        return result
+
+                    code, pc, env, stack = frames.pop()
+                    instructions, constants, end = code.instructions, code.constants, len(code.instructions)
+                    push, pop = stack.append, stack.pop
+
+                    stack[-1] = NOL if result is None else result
+
+                elif op == RETURN:
+                    value = pop()
+
+                    if not frames:
+                        return value
+
+                    # The caller gets the value paid in place of the function it called
+                    code, pc, env, stack = frames.pop()
+                    instructions, constants, end = code.instructions, code.constants, len(code.instructions)
+                    push, pop = stack.append, stack.pop
+
+                    stack[-1] = value
+
+                elif op == CHECK_INDEXABLE:
+                    if not isinstance(stack[-1], NolangArray) and stack[-1].__class__ is not NolangMap:
+                        expr = constants[arg]
+                        raise NotIndexableException(expr.indexable, expr.bracket.line, expr.bracket.file_name)
+
+                elif op == LOAD_INDEX or op == CHECK_INDEX:
+                    index = pop()
+                    array = stack[-1]
+                    values = array.value
+
+                    # Maps hold their values under the python value of the key, any key can be assigned to
+                    if values.__class__ is dict:
+                        key = check_key(index, constants[arg].bracket)
+
+                        if op == CHECK_INDEX:
+                            push(key)
+                            continue
+
+                        value = values.get(key)
+
+                        if value is None:
+                            expr = constants[arg]
+                            raise KeyNotFoundException(expr.indexable, key, expr.bracket.line, expr.bracket.file_name)
+
+                        stack[-1] = value
+                        continue
+
+                    if not isinstance(index, NolangInt):
+                        raise InvalidTypeException(constants[arg].bracket, index)
+
+                    i = index.value
+
+                    if i < 0 or i > len(values) - 1:
+                        expr = constants[arg]
+                        raise OutOfBoundsException(expr.indexable, i, len(values), expr.bracket.line, expr.bracket.file_name)
+
+                    # Assignments keep the array and the index around for STORE_INDEX, packed
+                    # arrays hold raw values which are boxed on the way out
+                    if op == CHECK_INDEX:
+                        push(i)
+                    elif values.__class__ is list:
+                        stack[-1] = values[i]
+                    elif values.typecode == INT64:
+                        stack[-1] = nolang_int(values[i])
+                    else:
+                        stack[-1] = nolang_float(values[i])
+
+                elif op == STORE_INDEX:
+                    value = pop()
+                    i = pop()
+                    array = stack[-1]
+                    values = array.value
+
+                    # Packed arrays store the raw value, or unpack themselves when it doesn't fit, maps store any key
+                    if values.__class__ is list:
+                        values[i] = value
+                    else:
+                        array[i] = value
+
+                    stack[-1] = value
+
+                elif op == DIVIDE:
+                    val2 = pop()
+                    val1 = stack[-1]
+                    typ1, typ2 = val1.__class__, val2.__class__
+
+                    if (typ1 is NolangInt or typ1 is NolangFloat) and (typ2 is NolangInt or typ2 is NolangFloat) and val2.value != 0:
+                        quotient = val1.value / val2.value
+                        stack[-1] = nolang_int(int(quotient)) if typ1 is typ2 is NolangInt else nolang_float(quotient)
+                    else:
+                        stack[-1] = binary(constants[arg], val1, val2)
+
+                elif op == MODULO:
+                    val2 = pop()
+                    val1 = stack[-1]
+
+                    if val1.__class__ is NolangInt and val2.__class__ is NolangInt:
+                        stack[-1] = nolang_int(val1.value % val2.value)
+                    else:
+                        stack[-1] = binary(constants[arg], val1, val2)
+
+                elif op == EQUAL:
+                    val2 = pop()
+                    val1 = stack[-1]
+
+                    if val1.__class__ in CONTAINER_TYPES:
+                        stack[-1] = TRUE if equal(val1, val2) else FALSE
+                    else:
+                        stack[-1] = TRUE if val1.value == val2.value else FALSE
+
+                elif op == NOT_EQUAL:
+                    val2 = pop()
+                    val1 = stack[-1]
+
+                    if val1.__class__ in CONTAINER_TYPES:
+                        stack[-1] = FALSE if equal(val1, val2) else TRUE
+                    else:
+                        stack[-1] = TRUE if val1.value != val2.value else FALSE
+
+                elif op == STORE_DEREF:
+                    environment = env
+                    for _ in range(arg >> DEREF_SHIFT):
+                        environment = environment.enclosing
+
+                    environment.values[arg & DEREF_MASK] = stack[-1]
+
+                elif op == STORE_GLOBAL:
+                    id = constants[arg]
+
+                    if id.lexeme not in globals:
+                        raise VariableNotDefinedException(id.lexeme, id.line, id.file_name)
+
+                    globals[id.lexeme] = stack[-1]
+
+                elif op == DECLARE_LOCAL:
+                    env.values[arg] = pop()
+
+                elif op == DECLARE_GLOBAL:
+                    env.values[constants[arg].lexeme] = pop()
+
+                elif op == POP_JUMP_IF_TRUE:
+                    value = pop()
+                    if value.value if value.__class__ is NolangBool else to_truthy(value):
+                        pc = arg
+
+                elif op == TO_BOOL:
+                    value = stack[-1]
+                    if value.__class__ is not NolangBool:
+                        stack[-1] = TRUE if to_truthy(value) else FALSE
+
+                elif op == JUMP_IF_FALSE_OR_POP:
+                    if stack[-1].value:
+                        pop()
+                    else:
+                        pc = arg
+
+                elif op == JUMP_IF_TRUE_OR_POP:
+                    if stack[-1].value:
+                        pc = arg
+                    else:
+                        pop()
+
+                elif op == NOT:
+                    value = stack[-1]
+                    stack[-1] = FALSE if (value.value if value.__class__ is NolangBool else to_truthy(value)) else TRUE
+
+                elif op == NEGATE:
+                    value = stack[-1]
+                    typ = value.__class__
+
+                    if typ is NolangInt:
+                        stack[-1] = nolang_int(-value.value)
+                    elif typ is NolangFloat:
+                        stack[-1] = nolang_float(-value.value)
+                    else:
+                        stack[-1] = unary(constants[arg], value)
+
+                elif op == UNARY:
+                    stack[-1] = unary(constants[arg], stack[-1])
+
+                elif op == POWER:
+                    val2 = pop()
+                    stack[-1] = binary(constants[arg], stack[-1], val2)
+
+                elif op == BUILD_ARRAY:
+                    elements = stack[len(stack) - arg:]
+                    del stack[len(stack) - arg:]
+                    push(nolang_array(elements))
+
+                elif op == BUILD_MAP:
+                    count = 2 * len(constants[arg].entries)
+                    entries = stack[len(stack) - count:]
+                    del stack[len(stack) - count:]
+                    push(Interpreter._build_map(entries, constants[arg].brace))
+
+                elif op == FUNCTION:
+                    # We give the function the current environment when DECLARED
+                    push(NolangFunction(constants[arg], env))
+
+                elif op == PRINT_EXPR:
+                    value = pop()
+
+                    if value is not NOL:
+                        print(value)
+
+                else:
+                    # This should never happen in a completed implementation, do it for debugging purposes
+                    raise Exception(f'Failed to run instruction: {op}')
+
+            if not frames:
+                return None
+
+            # Functions that don't pay anything pay nol
+            code, pc, env, stack = frames.pop()
+            instructions, constants, end = code.instructions, code.constants, len(code.instructions)
+            push, pop = stack.append, stack.pop
+
+            stack[-1] = NOL
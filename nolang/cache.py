@@ -0,0 +1,100 @@
+import gc
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+
+from .parser.expressions import Expression
+from .parser.statements import Statement
+
+# Resolved programs are cached in this directory right next to the script, like __pycache__
+CACHE_DIRECTORY = '__nolcache__'
+
+# Identifies cache files, bump whenever the layout of their header or of the pickled AST changes
+MAGIC = b'NOLC\x07'
+
+def cache_path(file_name: str) -> str:
+    """Returns where the cached program for the script file_name is stored"""
+    directory, name = os.path.split(os.path.abspath(file_name))
+    return os.path.join(directory, CACHE_DIRECTORY, f'{name}.nlc')
+
+def cache_key(source: str, file_name: str, version: str) -> bytes:
+    """
+    Hash of everything the cached program depends on. The file name is part of it since
+    every token remembers the file it came from for error messages, and the python version
+    is part of it since the pickled AST classes may change along with it.
+    """
+    key = hashlib.sha256()
+
+    for part in (version, sys.implementation.cache_tag, file_name, source):
+        key.update(part.encode('utf-8', 'surrogatepass'))
+        key.update(b'\0')
+
+    return key.digest()
+
+def load(source: str, file_name: str, version: str) -> tuple[list[Statement], dict[Expression, int]]:
+    """
+    Returns the cached program and resolver bindings for this exact source, or None if there
+    is no such cache entry. Stale, corrupt or unreadable cache files all count as a miss.
+    """
+    try:
+        with open(cache_path(file_name), 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC or f.read(32) != cache_key(source, file_name, version):
+                return None
+
+            program, bindings = _unpickle(f)
+
+    except Exception:
+        return None
+
+    return program, bindings
+
+def store(source: str, file_name: str, version: str, program: list[Statement], bindings: dict[Expression, int]) -> None:
+    """
+    Caches the program and its resolver bindings for this exact source. The cache file is
+    written to a temporary file first and then moved into place, so concurrent runs of the
+    same script never see a partially written cache file. Failing to write is not an error,
+    the script just won't be cached.
+    """
+    path = cache_path(file_name)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(cache_key(source, file_name, version))
+            pickle.dump((program, bindings), f, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary, path)
+
+    # Deeply nested programs can exceed the recursion limit while pickling
+    except (OSError, RecursionError, pickle.PicklingError):
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+
+### Utilities ###
+
+def _unpickle(f):
+    """
+    Unpickles the program with the garbage collector paused. Unpickling allocates a node for
+    every single token without freeing anything, which would otherwise trigger a collection
+    over and over again for nothing (this makes loading about 4 times faster).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        return pickle.load(f)
+
+    finally:
+        if enabled:
+            gc.enable()
@@ -126,7 +126,7 @@ class InvalidTypeException(RuntimeException):
 
     # TODO: Operator/Operands might not always apply for this type of exception
     def __str__(self) -> str:
-        return f'Invalid operand \'{self.operand.type_name()}\' for operator \'{self.op}\' {self._loc_to_str()}'
+        return f'Invalid operand \'{self.operand.type_name}\' for operator \'{self.op}\' {self._loc_to_str()}'
 
 class IncompatibleTypesException(RuntimeException):
     def __init__(self, op: Token, operand1, operand2, *args: object) -> None:
@@ -139,7 +139,7 @@ class IncompatibleTypesException(RuntimeException):
         return f'Operator \'{self.op}\' on incompatible types {self._operands_str()} {self._loc_to_str()}'
 
     def _operands_str(self) -> str:
-        return f'{self.operand1.type_name()} and {self.operand2.type_name()}'
+        return f'{self.operand1.type_name} and {self.operand2.type_name}'
 
 class DivideByZeroException(RuntimeException):
     def __init__(self, *args: object) -> None:
@@ -192,8 +192,19 @@ class OutOfBoundsException(RuntimeException):
     def __str__(self) -> str:
         return f'Index {self.index} out of bounds for {self.indexable} of size {self.size} {self._loc_to_str()}'
 
-# Non-exceptional exceptions
+class KeyNotFoundException(RuntimeException):
+    def __init__(self, map: Expression, key, *args: object) -> None:
+        super().__init__(*args)
+        self.map = map
+        self.key = key
+
+    def __str__(self) -> str:
+        return f'Key {self.key!r} not found in {self.map} {self._loc_to_str()}'
 
-class Return(Exception):
-    def __init__(self, value) -> None:
-        self.value = value
+class CallDepthException(RuntimeException):
+    def __init__(self, depth: int, *args: object) -> None:
+        super().__init__(*args)
+        self.depth = depth
+
+    def __str__(self) -> str:
+        return f'Calls nested more than {self.depth} deep, this recursion might never end {self._loc_to_str()}'
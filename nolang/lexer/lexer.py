@@ -1,7 +1,13 @@
 
+import sys
+
+from collections.abc import Iterator
+
 from .token import Token
 from .token import Tokens
 from .token import RESERVED_IDENTIFIERS
+from .token import LAYOUT_TOKENS
+from .token import LITERAL_TOKENS
 
 from ..types import *
 from ..util import *
@@ -40,8 +46,18 @@ class Lexer:
     NEWLINE state.
     """
 
-    def scan(self, source: str, file_name: str = None) -> list[Tokens]:
-        """Scan source string and generate stream of tokens"""
+    def scan(self, source: str, file_name: str = None, line: int = 1) -> list[Token]:
+        """Scan source string and generate list of tokens"""
+        return list(self.stream(source, file_name, line))
+
+    def stream(self, source: str, file_name: str = None, line: int = 1) -> Iterator[Token]:
+        """
+        Scan source string and lazily generate stream of tokens. Only the tokens of the
+        'line' currently being scanned are buffered, they are handed out before moving on.
+        Any exceptions are raised once the end of the source is reached, before EOF.
+
+        The source may be a fragment of a larger file, 'line' is the line the fragment starts at.
+        """
         self.source = source
         self.file_name = file_name
         self.exceptions = []
@@ -52,10 +68,10 @@ class Lexer:
         # Current character in current lexeme
         self.current: int = 0
 
-        # Current line in the source, we start at 1
-        self.line: int = 1
+        # Current line in the source, we start at 1 unless told otherwise
+        self.line: int = line
 
-        # List of tokens extracted
+        # Tokens extracted from the current line that haven't been handed out yet
         self.tokens: list[Token] = []
 
         # Stack keeping track of indentation levels
@@ -64,6 +80,9 @@ class Lexer:
         while not self._at_end():
             self._scan_nextline()
 
+            yield from self.tokens
+            self.tokens.clear()
+
         # Make sure to reset back to indentation level 0!
         while self.indent_stack[-1] != 0:
             self.indent_stack.pop()
@@ -74,7 +93,8 @@ class Lexer:
         if len(self.exceptions) > 0:
             raise ExceptionGroup('Lexer exceptions', self.exceptions)
 
-        return self.tokens
+        yield from self.tokens
+        self.tokens.clear()
 
     ### Mainstates ###
 
@@ -102,6 +122,17 @@ class Lexer:
 
         # Now we know we are moving to the GENERIC state we may need to generate
         # an indent or a dedent token before proceeding.
+        self._gen_indentation(indentation)
+
+        # Process the actual code
+        while not self._at_end() and self._peek() != '\n':
+            self.start = self.current
+            self._scan_next_token()
+
+        self._gen_token(Tokens.NEWLINE)
+
+    def _gen_indentation(self, indentation: int) -> None:
+        """Generates INDENT or DEDENT tokens moving from the current indentation level to the given one"""
         top = self.indent_stack[-1]
 
         # If we increased indentation level since last time, we generate an indent
@@ -120,13 +151,6 @@ class Lexer:
             if top != indentation:
                 self._error(InconsistentIndentationException(self.line, self.file_name))
 
-        # Process the actual code
-        while not self._at_end() and self._peek() != '\n':
-            self.start = self.current
-            self._scan_next_token()
-
-        self._gen_token(Tokens.NEWLINE)
-
     def _scan_next_token(self) -> None:
 
         match self._advance():
@@ -134,7 +158,10 @@ class Lexer:
             case ')': self._gen_token(Tokens.R_PARENTHESIS)
             case '[': self._gen_token(Tokens.L_BRACKET)
             case ']': self._gen_token(Tokens.R_BRACKET)
+            case '{': self._gen_token(Tokens.L_BRACE)
+            case '}': self._gen_token(Tokens.R_BRACE)
             case ',': self._gen_token(Tokens.COMMA)
+            case ':': self._gen_token(Tokens.COLON)
             case '+': self._gen_token(Tokens.PLUS)
             case '-': self._gen_token(Tokens.MINUS)
             case '/': self._gen_token(Tokens.SQUIRT if self._next_is('/') else Tokens.SLASH)
@@ -206,7 +233,7 @@ class Lexer:
 
         # Consume closing quote
         self._advance()
-        self._gen_token(Tokens.STR_LITERAL, NolangString(''.join(val)))
+        self._gen_token(Tokens.STR_LITERAL, nolang_string(''.join(val)))
 
     def _process_number_literal(self) -> None:
         # Consume all next digits
@@ -220,23 +247,23 @@ class Lexer:
             while is_digit(self._peek()):
                 self._advance()
 
-            self._gen_token(Tokens.FLOAT_LITERAL, NolangFloat(float(self._current_lexeme())))
+            self._gen_token(Tokens.FLOAT_LITERAL, nolang_float(float(self._current_lexeme())))
             return
 
         # Otherwise we have an integer literal
-        self._gen_token(Tokens.INT_LITERAL, NolangInt(int(self._current_lexeme())))
+        self._gen_token(Tokens.INT_LITERAL, nolang_int(int(self._current_lexeme())))
 
     def _process_identifier(self) -> None:
         while is_alpha_numeric(self._peek()) or self._peek() == '_':
             self._advance()
 
-        val = self._current_lexeme()
+        val = sys.intern(self._current_lexeme())
         token_type = RESERVED_IDENTIFIERS.get(val)
 
         if token_type:
             match token_type:
-                case Tokens.TRUE: val = NolangBool(True)
-                case Tokens.FALSE: val = NolangBool(False)
+                case Tokens.TRUE: val = TRUE
+                case Tokens.FALSE: val = FALSE
                 case Tokens.NOL: val = NOL
 
         # If it's not an existing token then it's a user specified identifier
@@ -296,7 +323,21 @@ class Lexer:
 
     def _gen_token(self, type_id, value: NolangType = None) -> None:
         """Generates a token of type_id with optional value at the current lexeme"""
-        self.tokens.append(Token(type_id, '\0' if type_id == Tokens.EOF else self._current_lexeme(), self.line, self.file_name, value))
+        if type_id == Tokens.EOF:
+            lexeme = '\0'
+
+        # Layout tokens do not correspond to any meaningful lexeme
+        elif type_id in LAYOUT_TOKENS:
+            lexeme = ''
+
+        elif type_id in LITERAL_TOKENS:
+            lexeme = self._current_lexeme()
+
+        # Identifiers, keywords and operators repeat a lot, so they share a single string
+        else:
+            lexeme = sys.intern(self._current_lexeme())
+
+        self.tokens.append(Token(type_id, lexeme, self.line, self.file_name, value))
 
     def _current_lexeme(self, start_offset: int = 0, current_offset: int = 0) -> str:
         """Returns the current lexeme given the processing window"""
@@ -0,0 +1,217 @@
+import re
+import sys
+
+from .lexer import Lexer
+from .token import Token
+from .token import Tokens
+from .token import RESERVED_IDENTIFIERS
+
+from ..types import *
+from ..exception import *
+
+# Matches whole lexemes of the GENERIC state in a single step together with any
+# whitespace in front of them, the name of the group that matched tells us which
+# kind of lexeme we are looking at. The 'end' group only matches at the end of a line.
+MASTER_PATTERN = re.compile(r'''
+    [ \t]*
+    (?:
+        (?P<identifier>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<operator>\*\*|//|<=|>=|==|!=|[()\[\]{},:+\-/%*<>=])
+      | (?P<float>[0-9]+\.[0-9]*)
+      | (?P<int>[0-9]+)
+      | (?P<string>["'])
+      | (?P<comment>\#[^\n]*)
+      | (?P<escape>\\[ \t]*\n)
+      | (?P<invalid_escape>\\[ \t]*)
+      | (?P<end>(?=\n)|\Z)
+      | (?P<unexpected>.)
+    )
+''', re.VERBOSE)
+
+# Bodies of string literals without the surrounding quotes, escape sequences are
+# matched as a pair so an escaped quote does not terminate the literal
+STRING_PATTERNS = {
+    '"': re.compile(r'"([^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL),
+    "'": re.compile(r"'([^'\\]*(?:\\.[^'\\]*)*)'", re.DOTALL),
+}
+
+ESCAPE_PATTERN = re.compile(r'\\(.)', re.DOTALL)
+NEWLINES_PATTERN = re.compile(r'\n*')
+INDENTATION_PATTERN = re.compile(r'[ \t]*')
+
+OPERATORS = {
+    '(':  Tokens.L_PARENTHESIS,
+    ')':  Tokens.R_PARENTHESIS,
+    '[':  Tokens.L_BRACKET,
+    ']':  Tokens.R_BRACKET,
+    '{':  Tokens.L_BRACE,
+    '}':  Tokens.R_BRACE,
+    ',':  Tokens.COMMA,
+    ':':  Tokens.COLON,
+    '+':  Tokens.PLUS,
+    '-':  Tokens.MINUS,
+    '/':  Tokens.SLASH,
+    '//': Tokens.SQUIRT,
+    '%':  Tokens.PERCENT,
+    '*':  Tokens.STAR,
+    '**': Tokens.EXP,
+    '<':  Tokens.LESS_THAN,
+    '<=': Tokens.LESS_THAN_EQ,
+    '>':  Tokens.GREATER_THAN,
+    '>=': Tokens.GREATER_THAN_EQ,
+    '=':  Tokens.ASSIGN,
+    '==': Tokens.EQUAL,
+    '!=': Tokens.NEQUAL,
+}
+
+ESCAPE_SEQUENCES = {
+    '\\': '\\',
+    '"':  '"',
+    "'":  "'",
+    'n':  '\n',
+    'r':  '\r',
+    'b':  '\b',
+    'v':  '\v',
+    't':  '\t',
+    'a':  '\a',
+    '0':  '\0',
+}
+
+class RegexLexer(Lexer):
+    """
+    Drop-in replacement for the character-at-a-time Lexer. The NEWLINE and GENERIC
+    states work exactly the same, but instead of advancing one character at a time
+    each state matches entire lexemes with precompiled regular expressions.
+
+    Anything out of the ordinary (unterminated strings, unknown escape sequences) is handed
+    back to the original character based routines so errors and line numbers are reported
+    exactly the same way.
+    """
+
+    def _scan_nextline(self) -> None:
+        source = self.source
+
+        # We first consume as many consecutive newlines as we see
+        newlines = NEWLINES_PATTERN.match(source, self.current)
+        self.line += newlines.end() - newlines.start()
+
+        # Check for indentation level
+        whitespace = INDENTATION_PATTERN.match(source, newlines.end())
+        self.current = whitespace.end()
+        indentation = self._measure_indentation(whitespace.group())
+
+        # This was just an empty line, throw away everything...
+        if self._at_end() or source[self.current] == '\n': return
+
+        # Comments in this state are ignored all the way to the next newline
+        if source[self.current] == '#':
+            newline = source.find('\n', self.current)
+            self.current = len(source) if newline == -1 else newline
+            return
+
+        # Now we know we are moving to the GENERIC state we may need to generate
+        # an indent or a dedent token before proceeding.
+        self._gen_indentation(indentation)
+
+        # Process the actual code
+        self._scan_tokens()
+        self._gen_token(Tokens.NEWLINE)
+
+    def _scan_tokens(self) -> None:
+        """Scans lexemes in the GENERIC state until the next newline or the end of the source"""
+        source = self.source
+        tokens = self.tokens
+        file_name = self.file_name
+        line = self.line
+        match_lexeme = MASTER_PATTERN.match
+
+        while True:
+            lexeme = match_lexeme(source, self.current)
+            kind = lexeme.lastgroup
+            self.current = lexeme.end()
+
+            if kind == 'identifier':
+                text = sys.intern(lexeme.group(kind))
+                token_type = RESERVED_IDENTIFIERS.get(text)
+                value = text
+
+                if token_type:
+                    match token_type:
+                        case Tokens.TRUE: value = TRUE
+                        case Tokens.FALSE: value = FALSE
+                        case Tokens.NOL: value = NOL
+
+                # If it's not an existing token then it's a user specified identifier
+                else:
+                    token_type = Tokens.IDENTIFIER
+
+                tokens.append(Token(token_type, text, line, file_name, value))
+
+            elif kind == 'operator':
+                text = sys.intern(lexeme.group(kind))
+                tokens.append(Token(OPERATORS[text], text, line, file_name))
+
+            elif kind == 'int':
+                text = lexeme.group(kind)
+                tokens.append(Token(Tokens.INT_LITERAL, text, line, file_name, nolang_int(int(text))))
+
+            elif kind == 'float':
+                text = lexeme.group(kind)
+                tokens.append(Token(Tokens.FLOAT_LITERAL, text, line, file_name, nolang_float(float(text))))
+
+            elif kind == 'end':
+                break
+
+            else:
+                self.start = lexeme.start(kind)
+                self.line = line
+
+                # Comments need no handling, they are discarded up to the next newline
+                match kind:
+                    case 'string': self._match_string_literal(lexeme.group(kind))
+                    case 'escape': self.line += 1
+                    case 'invalid_escape': self._error(CharacterUnexpectedException('\\', line, file_name))
+                    case 'unexpected': self._error(CharacterUnexpectedException(lexeme.group(kind), line, file_name))
+
+                line = self.line
+
+        self.line = line
+
+    def _match_string_literal(self, end: str) -> None:
+        literal = STRING_PATTERNS[end].match(self.source, self.start)
+
+        # Unterminated strings are reported by the original lexer
+        if literal is None:
+            self._process_string_literal(end)
+            return
+
+        body = literal.group(1)
+        newlines = body.count('\n')
+
+        if '\\' in body:
+            try:
+                body = ESCAPE_PATTERN.sub(lambda escape: ESCAPE_SEQUENCES[escape.group(1)], body)
+
+            # Unknown escape sequences are reported by the original lexer
+            except KeyError:
+                self._process_string_literal(end)
+                return
+
+        self.current = literal.end()
+        self.line += newlines
+        self._gen_token(Tokens.STR_LITERAL, nolang_string(body))
+
+    @staticmethod
+    def _measure_indentation(whitespace: str) -> int:
+        """Calculates the indentation level of a run of spaces and tabs"""
+        if '\t' not in whitespace:
+            return len(whitespace)
+
+        indentation = 0
+
+        # A space increments indentation level by one
+        # A tab increases the indentation to the next multiple of 4
+        for c in whitespace:
+            indentation += int(c == ' ') + int(c == '\t') * (4 - (indentation % 4))
+
+        return indentation
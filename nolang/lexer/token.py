@@ -8,9 +8,12 @@ class Tokens(Enum):
     DEDENT          = auto()
     L_PARENTHESIS   = auto()
     L_BRACKET       = auto()
+    L_BRACE         = auto()
     R_PARENTHESIS   = auto()
     R_BRACKET       = auto()
+    R_BRACE         = auto()
     COMMA           = auto()
+    COLON           = auto()
     NO              = auto()
     GREG            = auto()
     IF              = auto()
@@ -46,6 +49,13 @@ class Tokens(Enum):
     BOUNCE          = auto()
     SQUIRT          = auto()
 
+    # Members are singletons, so hashing by identity is equivalent to Enum's default of
+    # hashing the name but done in C, which matters for the parser's operator tables
+    __hash__ = object.__hash__
+
+LAYOUT_TOKENS = frozenset({ Tokens.INDENT, Tokens.DEDENT, Tokens.NEWLINE })
+LITERAL_TOKENS = frozenset({ Tokens.STR_LITERAL, Tokens.INT_LITERAL, Tokens.FLOAT_LITERAL })
+
 RESERVED_IDENTIFIERS = {
     'no': Tokens.NO,
     'greg': Tokens.GREG,
@@ -64,16 +74,40 @@ RESERVED_IDENTIFIERS = {
     'bounce': Tokens.BOUNCE
 }
 
+# Side table of every file name seen so far, tokens only keep the index into this table
+FILE_NAMES: list[str] = []
+FILE_IDS: dict[str, int] = {}
+
+def file_id(file_name: str) -> int:
+    """Returns the compact id of file_name, registering it in the side table if necessary"""
+    id = FILE_IDS.get(file_name)
+
+    if id is None:
+        id = FILE_IDS[file_name] = len(FILE_NAMES)
+        FILE_NAMES.append(file_name)
+
+    return id
+
 class Token:
+    # There are a lot of tokens, so they don't get a __dict__
+    __slots__ = ('type_id', 'lexeme', 'line', 'file_id', 'value')
 
     def __init__(self, type_id: Tokens, lexeme: str, line: int, file_name: str, value = None):
         """Initializes a new token with an option value (used for literals)"""
         self.type_id = type_id
         self.line = line
-        self.file_name = file_name
+        self.file_id = file_id(file_name)
         self.value = value
         self.lexeme = lexeme
 
+    @property
+    def file_name(self) -> str:
+        return FILE_NAMES[self.file_id]
+
+    def __reduce__(self):
+        # File ids are only meaningful within this process, pickle the file name instead
+        return (Token, (self.type_id, self.lexeme, self.line, self.file_name, self.value))
+
     def __str__(self) -> str:
         if self.type_id == Tokens.NEWLINE:  return 'NEWLINE'
         if self.type_id == Tokens.EOF:      return 'EOF'
@@ -0,0 +1,172 @@
+import operator
+
+from collections.abc import Callable
+
+from .types import *
+from .lexer.token import Token
+from .lexer.token import Tokens
+from .exception import *
+
+# Operations take the operator token, for errors, followed by their operands
+BinaryOperation = Callable[[Token, NolangType, NolangType], NolangType]
+UnaryOperation = Callable[[Token, NolangType], NolangType]
+
+# Types of the values operators are defined on, operations on anything else (like
+# functions) are never specialized
+VALUE_TYPES = (NolangInt, NolangFloat, NolangBool, NolangString, NolangArray, NolangGrid, NolangMap, NolangColoredText, NolangNol)
+NUMERIC_TYPES = (NolangInt, NolangFloat)
+ORDERED_TYPES = [ (typ1, typ2) for typ1 in NUMERIC_TYPES for typ2 in NUMERIC_TYPES ] + [ (NolangString, NolangString) ]
+
+# Python operators applied to the values of numeric operands, the closure compiler uses
+# them for its own fast paths as well
+ARITHMETIC = {
+    Tokens.PLUS: operator.add,
+    Tokens.MINUS: operator.sub,
+    Tokens.STAR: operator.mul,
+    Tokens.EXP: operator.pow,
+}
+
+COMPARISONS = {
+    Tokens.LESS_THAN: operator.lt,
+    Tokens.GREATER_THAN: operator.gt,
+    Tokens.LESS_THAN_EQ: operator.le,
+    Tokens.GREATER_THAN_EQ: operator.ge,
+}
+
+### Specialized operations ###
+
+def _arithmetic(apply, result) -> BinaryOperation:
+    def arithmetic(_, val1, val2):
+        return result(apply(val1.value, val2.value))
+
+    return arithmetic
+
+def _divide(result) -> BinaryOperation:
+    def divide(op, val1, val2):
+        if val2.value == 0:
+            raise DivideByZeroException(op.line, op.file_name)
+
+        return result(val1.value / val2.value)
+
+    return divide
+
+def _compare(apply) -> BinaryOperation:
+    def compare(_, val1, val2):
+        return TRUE if apply(val1.value, val2.value) else FALSE
+
+    return compare
+
+def _modulo(_, val1, val2):
+    return nolang_int(val1.value % val2.value)
+
+def _concatenate(_, val1, val2):
+    return concatenated(val1, val2)
+
+def _append_colored(_, val1, val2):
+    return val1.append(str(val2))
+
+def _prepend_colored(_, val1, val2):
+    return val2.prepend(str(val1))
+
+def _equal(_, val1, val2):
+    return TRUE if val1.value == val2.value else FALSE
+
+def _not_equal(_, val1, val2):
+    return TRUE if val1.value != val2.value else FALSE
+
+def _equal_containers(_, val1, val2):
+    return TRUE if equal(val1, val2) else FALSE
+
+def _not_equal_containers(_, val1, val2):
+    return FALSE if equal(val1, val2) else TRUE
+
+def _plus(typ1: type, typ2: type) -> BinaryOperation | None:
+    """Picks what + does for the types, colored text comes first, then strings and then numbers"""
+    if typ1 is NolangColoredText:
+        return _append_colored
+
+    if typ2 is NolangColoredText:
+        return _prepend_colored
+
+    if typ1 is NolangString or typ2 is NolangString:
+        return _concatenate
+
+    if typ1 in NUMERIC_TYPES and typ2 in NUMERIC_TYPES:
+        return _arithmetic(operator.add, _promoted(typ1, typ2))
+
+    return None
+
+def _promoted(typ1: type, typ2: type):
+    """Gives back what makes results of operations on numbers, ints are promoted to float if the other operand is a float"""
+    return nolang_int if typ1 is typ2 is NolangInt else nolang_float
+
+def _truncated(value) -> NolangInt:
+    """Makes the int of a result that can come out as a float"""
+    return nolang_int(int(value))
+
+def _negate(result) -> UnaryOperation:
+    def negate(_, value):
+        return result(-value.value)
+
+    return negate
+
+def _identity(result) -> UnaryOperation:
+    def identity(_, value):
+        return result(+value.value)
+
+    return identity
+
+def _square_root(result) -> UnaryOperation:
+    def square_root(_, value):
+        return result(value.value ** (1/2))
+
+    return square_root
+
+def _build_binary_operations() -> dict[Tokens, dict[tuple[type, type], BinaryOperation]]:
+    operations = { op: {} for op in [ *ARITHMETIC, *COMPARISONS, Tokens.SLASH, Tokens.PERCENT, Tokens.EQUAL, Tokens.NEQUAL ] }
+
+    for typ1 in VALUE_TYPES:
+        for typ2 in VALUE_TYPES:
+            # Values of any type can be compared for equality
+            if typ1 in CONTAINER_TYPES:
+                operations[Tokens.EQUAL][typ1, typ2] = _equal_containers
+                operations[Tokens.NEQUAL][typ1, typ2] = _not_equal_containers
+            else:
+                operations[Tokens.EQUAL][typ1, typ2] = _equal
+                operations[Tokens.NEQUAL][typ1, typ2] = _not_equal
+
+            plus = _plus(typ1, typ2)
+            if plus is not None:
+                operations[Tokens.PLUS][typ1, typ2] = plus
+
+    for typ1 in NUMERIC_TYPES:
+        for typ2 in NUMERIC_TYPES:
+            for op in (Tokens.MINUS, Tokens.STAR):
+                operations[op][typ1, typ2] = _arithmetic(ARITHMETIC[op], _promoted(typ1, typ2))
+
+            # Divisions and exponents of ints can come out as floats, exponents of floats as
+            # complex numbers, which the coercing constructor refuses
+            ints = typ1 is typ2 is NolangInt
+            operations[Tokens.EXP][typ1, typ2] = _arithmetic(operator.pow, _truncated if ints else NolangFloat)
+            operations[Tokens.SLASH][typ1, typ2] = _divide(_truncated if ints else nolang_float)
+
+    for op, apply in COMPARISONS.items():
+        for typ1, typ2 in ORDERED_TYPES:
+            operations[op][typ1, typ2] = _compare(apply)
+
+    operations[Tokens.PERCENT][NolangInt, NolangInt] = _modulo
+
+    return operations
+
+# Binary operations by operator and then by the exact types of both operands. Combinations
+# missing from the table are either unsupported or involve other types, both are left to
+# the interpreter which checks the operands and raises the right error
+BINARY_OPERATIONS = _build_binary_operations()
+
+# Unary operations by operator and the exact type of the operand, 'not' works on anything
+# and is left out
+UNARY_OPERATIONS: dict[Tokens, dict[type, UnaryOperation]] = {
+    Tokens.MINUS: { NolangInt: _negate(nolang_int), NolangFloat: _negate(nolang_float) },
+    Tokens.PLUS: { NolangInt: _identity(nolang_int), NolangFloat: _identity(nolang_float) },
+    Tokens.SQUIRT: { NolangInt: _square_root(_truncated), NolangFloat: _square_root(NolangFloat) },
+}
@@ -8,6 +8,9 @@ class ASTVisitor: pass
 # The resulting interpretation of any expression thus results in not just a value but also a new program state.
 
 class Expression:
+    # Programs can hold hundreds of thousands of nodes, so none of them get a __dict__
+    __slots__ = ()
+
     def visit(self, _: ASTVisitor):
         """Pure virtual function that calls respective handler for this type in the visitor"""
         raise NotImplementedError
@@ -15,8 +18,9 @@ class Expression:
 class BinaryExpression(Expression):
     """Infix operator with two operands"""
 
+    __slots__ = ('left', 'right', 'op')
+
     def __init__(self, left: Expression, right: Expression, op: Token) -> None:
-        super().__init__()
         self.left = left
         self.right = right
         self.op = op
@@ -30,8 +34,9 @@ class BinaryExpression(Expression):
 class UnaryExpression(Expression):
     """Postfix/Prefix operator with one operand"""
 
+    __slots__ = ('operand', 'op')
+
     def __init__(self, operand: Expression, op: Token) -> None:
-        super().__init__()
         self.operand = operand
         self.op = op
 
@@ -44,8 +49,9 @@ class UnaryExpression(Expression):
 class IDAccessorExpression(Expression):
     """Accessor for identifiers"""
 
+    __slots__ = ('id',)
+
     def __init__(self, id: Token) -> None:
-        super().__init__()
         self.id = id
 
     def visit(self, visitor: ASTVisitor):
@@ -60,8 +66,9 @@ class IDAccessorExpression(Expression):
 class IDAssignExpression(Expression):
     """Mutator for identifiers"""
 
+    __slots__ = ('id', 'assign')
+
     def __init__(self, id: Token, assign: Expression) -> None:
-        super().__init__()
         self.id = id
         self.assign = assign
 
@@ -74,8 +81,9 @@ class IDAssignExpression(Expression):
 class IndexAccessorExpression(Expression):
     """Accessor for an array index"""
 
+    __slots__ = ('bracket', 'indexable', 'index')
+
     def __init__(self, indexable: Expression, bracket: Token, index: Expression) -> None:
-        super().__init__()
         self.bracket = bracket
         self.indexable = indexable
         self.index = index
@@ -89,8 +97,9 @@ class IndexAccessorExpression(Expression):
 class IndexAssignExpression(Expression):
     """Mutator for an indexed value"""
 
+    __slots__ = ('accessor', 'assign')
+
     def __init__(self, accessor: IndexAccessorExpression, assign: Expression) -> None:
-        super().__init__()
         self.accessor = accessor
         self.assign = assign
 
@@ -101,8 +110,9 @@ class IndexAssignExpression(Expression):
         return f'{self.accessor} = {self.assign}'
 
 class CallExpression(Expression):
+    __slots__ = ('callee', 'args', 'paren')
+
     def __init__(self, callee: Expression, paren: Token, args: list[Expression]) -> None:
-        super().__init__()
         self.callee = callee
         self.args = args
         self.paren = paren
@@ -116,8 +126,9 @@ class CallExpression(Expression):
 class Literal(Expression):
     """Immediate value in the domain of the parser"""
 
+    __slots__ = ('token',)
+
     def __init__(self, token: Token) -> None:
-        super().__init__()
         self.token = token
 
     def visit(self, visitor: ASTVisitor):
@@ -132,8 +143,9 @@ class Literal(Expression):
 class ArrayInitializer(Expression):
     """Inline initialization of an array"""
 
+    __slots__ = ('values',)
+
     def __init__(self, values: list[Expression]) -> None:
-        super().__init__()
         self.values = values
 
     def visit(self, visitor: ASTVisitor):
@@ -142,3 +154,19 @@ class ArrayInitializer(Expression):
     def __repr__(self) -> str:
         return repr(self.values)
 
+class MapInitializer(Expression):
+    """Inline initialization of a map, its keys and values in pairs"""
+
+    __slots__ = ('brace', 'entries')
+
+    def __init__(self, brace: Token, entries: list[tuple[Expression, Expression]]) -> None:
+        self.brace = brace
+        self.entries = entries
+
+    def visit(self, visitor: ASTVisitor):
+        return visitor.visit_map_init(self)
+
+    def __repr__(self) -> str:
+        joined = ', '.join(f'{key}: {value}' for key, value in self.entries)
+        return f'{{{joined}}}'
+
@@ -0,0 +1,169 @@
+from ..lexer.lexer import Lexer
+from ..lexer.token import Token, Tokens
+from .parser import Parser
+from .statements import Statement
+
+class Segment:
+    """
+    A run of source lines holding exactly one top-level statement, plus any blank lines
+    and comments following it. The very first segment also holds anything preceding the
+    first statement, and may hold no statement at all if the source has none.
+    """
+
+    def __init__(self, first: int, stmts: list[Statement], tokens: list[Token]) -> None:
+        # Index of the first source line in this segment, starting at 0
+        self.first = first
+        self.stmts = stmts
+        self.tokens = tokens
+
+    def shift(self, delta: int) -> None:
+        """Moves the segment up or down by delta lines"""
+        self.first += delta
+
+        for token in self.tokens:
+            token.line += delta
+
+class IncrementalParser:
+    """
+    Front end that remembers the result of the previous parse of a file. When handed a
+    new version of the same file it finds which top-level statements the edit touched,
+    re-lexes and re-parses only those (top-level statements always start on a fresh line
+    at indentation level 0, so the lexer can pick up right there) and splices the new
+    statements in between the untouched ones.
+
+    Whenever it cannot be certain the spliced program is exactly what parsing the whole
+    file would produce (the edited region doesn't lex/parse cleanly, the region ends in a
+    line continuation, ...) it simply re-parses the whole file, so errors are always
+    reported the same way a regular parse would.
+    """
+
+    def __init__(self, lexer: Lexer = None, parser: Parser = None) -> None:
+        self.lexer = lexer if lexer is not None else Lexer()
+        self.parser = parser if parser is not None else Parser()
+        self._reset()
+
+    def parse(self, source: str, file_name: str) -> list[Statement]:
+        lines = source.split('\n')
+
+        if self.segments is None or file_name != self.file_name:
+            return self._parse_all(lines, file_name)
+
+        old = self.lines
+
+        # Find the unchanged lines at the start and end of the file
+        prefix = 0
+        limit = min(len(old), len(lines))
+        while prefix < limit and old[prefix] == lines[prefix]:
+            prefix += 1
+
+        if prefix == len(old) == len(lines):
+            return self.statements
+
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and old[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+
+        # Segments touched by the edit, including the segment before and after it since
+        # edits right next to a statement may continue it ('erm', 'hermph', '\')
+        first = max(self._segment_at(prefix) - 1, 0)
+        last = min(self._segment_at(max(len(old) - suffix - 1, prefix)) + 1, len(self.segments) - 1)
+
+        delta = len(lines) - len(old)
+        start = self.segments[first].first
+        end = self.segments[last + 1].first + delta if last + 1 < len(self.segments) else len(lines)
+
+        region = self._parse_region(lines, start, end, file_name)
+
+        if region is None:
+            return self._parse_all(lines, file_name)
+
+        for segment in self.segments[last + 1:]:
+            segment.shift(delta)
+
+        self.segments[first:last + 1] = region
+        self.lines = lines
+        self.statements = [ stmt for segment in self.segments for stmt in segment.stmts ]
+
+        return self.statements
+
+    ### Utilities ###
+
+    def _parse_all(self, lines: list[str], file_name: str) -> list[Statement]:
+        self._reset()
+
+        tokens = self.lexer.scan('\n'.join(lines), file_name)
+        stmts = self.parser.parse(tokens, file_name)
+
+        self.file_name = file_name
+        self.lines = lines
+        self.segments = self._split(0, len(lines), stmts, self.parser.statement_lines, tokens)
+        self.statements = stmts
+
+        return stmts
+
+    def _parse_region(self, lines: list[str], start: int, end: int, file_name: str) -> list[Segment]:
+        """Parses lines [start, end) on their own, returns None if the result can't be trusted"""
+
+        # A trailing line continuation would join the line after the region
+        if end < len(lines) and lines[end - 1].rstrip(' \t').endswith('\\'):
+            return None
+
+        try:
+            tokens = self.lexer.scan('\n'.join(lines[start:end]), file_name, start + 1)
+
+            # The blocks still open at the end of the region are closed there, a full parse closes
+            # them on the line of the statement after it. Lazy bodies keep their closing DEDENT
+            if end < len(lines):
+                for token in reversed(tokens):
+                    if token.type_id == Tokens.DEDENT:
+                        token.line = end + 1
+                    elif token.type_id != Tokens.EOF:
+                        break
+
+            stmts = self.parser.parse(tokens, file_name)
+
+        except ExceptionGroup:
+            return None
+
+        return self._split(start, end, stmts, self.parser.statement_lines, tokens)
+
+    @staticmethod
+    def _split(start: int, end: int, stmts: list[Statement], stmt_lines: list[int], tokens: list[Token]) -> list[Segment]:
+        """Splits the parsed lines [start, end) into one segment per top-level statement"""
+        firsts = [ start ] + [ line - 1 for line in stmt_lines[1:] ]
+        segments = [ Segment(first, [ stmt ], []) for first, stmt in zip(firsts, stmts) ]
+
+        if len(segments) == 0:
+            segments.append(Segment(start, [], []))
+
+        # Hand each token to the segment covering its line. DEDENTs are on the line of the next
+        # statement but close the blocks of the one before, whose lazy bodies hold them
+        index = 0
+        for token in tokens:
+            while token.type_id != Tokens.DEDENT and index + 1 < len(segments) and token.line - 1 >= segments[index + 1].first:
+                index += 1
+
+            segments[index].tokens.append(token)
+
+        return segments
+
+    def _segment_at(self, line: int) -> int:
+        """Returns the index of the segment containing the given line"""
+        low, high = 0, len(self.segments) - 1
+
+        while low < high:
+            middle = (low + high + 1) // 2
+
+            if self.segments[middle].first <= line:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    def _reset(self) -> None:
+        self.file_name: str = None
+        self.lines: list[str] = None
+        self.segments: list[Segment] = None
+        self.statements: list[Statement] = None
@@ -1,4 +1,6 @@
 
+from collections.abc import Iterable
+
 from ..lexer.token import Token
 from ..lexer.token import Tokens
 from .expressions import *
@@ -8,17 +10,54 @@ from ..exception import *
 
 MAX_PARAMETERS = 255
 
-class Parser:
-    def parse(self, tokens: list[Token], filename: str) -> list[Statement]:
-        self.tokens = tokens
-        self.filename = filename
-        self.exceptions = []
+# Precedence levels of the operators between <or_expr> and <sign_expr>, higher binds tighter
+OR_PRECEDENCE   = 1
+AND_PRECEDENCE  = 2
+NOT_PRECEDENCE  = 3
+EQ_PRECEDENCE   = 4
+REL_PRECEDENCE  = 5
+ADD_PRECEDENCE  = 6
+MUL_PRECEDENCE  = 7
+SIGN_PRECEDENCE = 8
+
+# Binary operators mapped to their precedence and the precedence their right operand is parsed at.
+# Left associative operators parse their right operand one level tighter. Equalities are special
+# in the grammar, their right operand is a <not_expr> which makes them right associative.
+BINARY_OPERATORS: dict[Tokens, tuple[int, int]] = {
+    Tokens.OR:              (OR_PRECEDENCE, AND_PRECEDENCE),
+    Tokens.AND:             (AND_PRECEDENCE, NOT_PRECEDENCE),
+    Tokens.EQUAL:           (EQ_PRECEDENCE, NOT_PRECEDENCE),
+    Tokens.NEQUAL:          (EQ_PRECEDENCE, NOT_PRECEDENCE),
+    Tokens.LESS_THAN:       (REL_PRECEDENCE, ADD_PRECEDENCE),
+    Tokens.GREATER_THAN:    (REL_PRECEDENCE, ADD_PRECEDENCE),
+    Tokens.LESS_THAN_EQ:    (REL_PRECEDENCE, ADD_PRECEDENCE),
+    Tokens.GREATER_THAN_EQ: (REL_PRECEDENCE, ADD_PRECEDENCE),
+    Tokens.PLUS:            (ADD_PRECEDENCE, MUL_PRECEDENCE),
+    Tokens.MINUS:           (ADD_PRECEDENCE, MUL_PRECEDENCE),
+    Tokens.STAR:            (MUL_PRECEDENCE, SIGN_PRECEDENCE),
+    Tokens.SLASH:           (MUL_PRECEDENCE, SIGN_PRECEDENCE),
+    Tokens.PERCENT:         (MUL_PRECEDENCE, SIGN_PRECEDENCE),
+}
 
-        """Current token to be examined in the current production rule"""
-        self.current: int = 0
+class Parser:
+    def __init__(self, lazy: bool = False) -> None:
+        # In lazy mode function bodies are only pre-parsed into a LazyBody
+        self.lazy = lazy
+
+    def parse(self, tokens: Iterable[Token], filename: str) -> list[Statement]:
+        """
+        Parses a program from any iterable of tokens. Tokens are pulled one at a time
+        into a single token lookahead buffer, so a lazy token stream from the lexer is
+        never held in memory all at once.
+        """
+        self._start(tokens, filename)
         statements: list[Statement] = []
 
+        """Line on which each of the top-level statements starts"""
+        self.statement_lines: list[int] = []
+
         while not self._next_is(Tokens.EOF) and not self._at_end():
+            self.statement_lines.append(self._first_line(self._peek()))
             statements.append(self.statement())
 
         if len(self.exceptions) > 0:
@@ -26,6 +65,16 @@ class Parser:
 
         return statements
 
+    def parse_body(self, body: LazyBody) -> Body:
+        """Fully parses the tokens of a pre-parsed function body"""
+        self._start(body.tokens, body.file_name)
+        parsed = self._body()
+
+        if len(self.exceptions) > 0:
+            raise ExceptionGroup('Parser exceptions', self.exceptions)
+
+        return parsed
+
     def statement(self) -> Statement:
         try:
             if self._next_is(Tokens.NO): return self.var_decl()
@@ -66,7 +115,7 @@ class Parser:
 
         self._consume(Tokens.R_PARENTHESIS)
         self._consume(Tokens.NEWLINE)
-        return FunDeclaration(id, params, self._body())
+        return FunDeclaration(id, params, self._lazy_body() if self.lazy else self._body())
 
     def cmpd_stmt(self) -> Statement:
         if self._next_is(Tokens.IF): return self.if_stmt()
@@ -139,7 +188,7 @@ class Parser:
         return self.assign_expr()
 
     def assign_expr(self) -> Expression:
-        lhs = self.or_expr()
+        lhs = self.binary_expr(OR_PRECEDENCE)
 
         if self._next_is(Tokens.ASSIGN):
 
@@ -159,70 +208,33 @@ class Parser:
 
         return lhs
 
-    def or_expr(self) -> Expression:
-        expr: Expression = self.and_expr()
-
-        while self._next_is(Tokens.OR):
-            op: Token = self._previous()
-            right: Expression = self.and_expr()
-            expr = BinaryExpression(expr, right, op)
-
-        return expr
-
-    def and_expr(self) -> Expression:
-        expr: Expression = self.not_expr()
-
-        while self._next_is(Tokens.AND):
-            op: Token = self._previous()
-            right: Expression = self.not_expr()
-            expr = BinaryExpression(expr, right, op)
-
-        return expr
-
-    def not_expr(self) -> Expression:
-        if self._next_is(Tokens.NOT):
-            op: Token = self._previous()
-            right: Expression = self.not_expr()
-            return UnaryExpression(right, op)
-
-        return self.eq_expr()
+    def binary_expr(self, precedence: int) -> Expression:
+        """
+        Precedence climbing parser for everything from <or_expr> down to <sign_expr>. Only
+        binary operators binding at least as tightly as 'precedence' are consumed, the right
+        operand of each is parsed with the precedence given in BINARY_OPERATORS.
+        """
+        type_id = self.current.type_id if not self._at_end() else None
 
-    def eq_expr(self) -> Expression:
-        expr: Expression = self.rel_expr()
+        # 'not' only appears at the <not_expr> level and above, its operand is a <not_expr>
+        if type_id == Tokens.NOT and precedence <= NOT_PRECEDENCE:
+            op: Token = self._advance()
+            expr: Expression = UnaryExpression(self.binary_expr(NOT_PRECEDENCE), op)
 
-        while self._next_is(Tokens.EQUAL, Tokens.NEQUAL):
-            op: Token = self._previous()
-            right: Expression = self.not_expr()
-            expr = BinaryExpression(expr, right, op)
+        elif type_id == Tokens.PLUS or type_id == Tokens.MINUS:
+            expr: Expression = self.sign_expr()
 
-        return expr
-
-    def rel_expr(self) -> Expression:
-        expr: Expression = self.add_expr()
-
-        while self._next_is(Tokens.LESS_THAN, Tokens.GREATER_THAN, Tokens.LESS_THAN_EQ, Tokens.GREATER_THAN_EQ):
-            op: Token = self._previous()
-            right: Expression = self.add_expr()
-            expr = BinaryExpression(expr, right, op)
-
-        return expr
-
-    def add_expr(self) -> Expression:
-        expr: Expression = self.mul_expr()
-
-        while self._next_is(Tokens.PLUS, Tokens.MINUS):
-            op: Token = self._previous()
-            right: Expression = self.mul_expr()
-            expr = BinaryExpression(expr, right, op)
+        else:
+            expr: Expression = self.squirt_expr()
 
-        return expr
+        while not self._at_end():
+            operator = BINARY_OPERATORS.get(self.current.type_id)
 
-    def mul_expr(self) -> Expression:
-        expr: Expression = self.sign_expr()
+            if operator is None or operator[0] < precedence:
+                break
 
-        while self._next_is(Tokens.STAR, Tokens.SLASH, Tokens.PERCENT):
-            op: Token = self._previous()
-            right: Expression = self.sign_expr()
+            op: Token = self._advance()
+            right: Expression = self.binary_expr(operator[1])
             expr = BinaryExpression(expr, right, op)
 
         return expr
@@ -234,24 +246,20 @@ class Parser:
             return UnaryExpression(right, op)
 
         return self.squirt_expr()
-    
-    def squirt_expr(self) -> Expression:
-        expr: Expression = self.exp_expr()
-
-        if self._next_is(Tokens.SQUIRT):
-            op: Token = self._previous()
-            return UnaryExpression(expr, op)
 
-        return expr
-
-    def exp_expr(self) -> Expression:
+    def squirt_expr(self) -> Expression:
         expr: Expression = self.primary()
 
+        # <exp_expr> is folded in here
         if self._next_is(Tokens.EXP):
             op: Token = self._previous()
             right: Expression = self.sign_expr()
             expr = BinaryExpression(expr, right, op)
 
+        if self._next_is(Tokens.SQUIRT):
+            op: Token = self._previous()
+            return UnaryExpression(expr, op)
+
         return expr
 
     def primary(self) -> Expression:
@@ -286,6 +294,9 @@ class Parser:
         if self._next_is(Tokens.L_BRACKET):
             return self._finish_array()
 
+        if self._next_is(Tokens.L_BRACE):
+            return self._finish_map()
+
         self._consume(Tokens.L_PARENTHESIS)
         expr: Expression = self.expression()
         self._consume(Tokens.R_PARENTHESIS)
@@ -307,6 +318,23 @@ class Parser:
 
         return Body(stmts)
 
+    def _lazy_body(self) -> LazyBody:
+        """Pre-parses a body, only checking that its indentation is balanced"""
+        tokens: list[Token] = [ self._consume(Tokens.INDENT) ]
+        depth = 1
+
+        while depth > 0:
+            if self._at_end() or self._peek().type_id == Tokens.EOF:
+                raise EOFUnexpectedException(self.filename)
+
+            token = self._advance()
+            tokens.append(token)
+
+            if token.type_id == Tokens.INDENT: depth += 1
+            elif token.type_id == Tokens.DEDENT: depth -= 1
+
+        return LazyBody(tokens, self.filename)
+
     def _finish_array(self) -> list[Expression]:
         values: list[Expression] = []
 
@@ -320,6 +348,24 @@ class Parser:
         self._consume(Tokens.R_BRACKET)
         return ArrayInitializer(values)
 
+    def _finish_map(self) -> MapInitializer:
+        brace = self._previous()
+        entries: list[tuple[Expression, Expression]] = []
+
+        if self._peek().type_id != Tokens.R_BRACE:
+            entries.append(self._map_entry())
+
+            while self._next_is(Tokens.COMMA):
+                entries.append(self._map_entry())
+
+        self._consume(Tokens.R_BRACE)
+        return MapInitializer(brace, entries)
+
+    def _map_entry(self) -> tuple[Expression, Expression]:
+        key = self.expression()
+        self._consume(Tokens.COLON)
+        return (key, self.expression())
+
     def _finish_call(self, callee: Expression) -> CallExpression:
         args: list[Expression] = []
 
@@ -341,21 +387,27 @@ class Parser:
 
     ### Utilities ###
 
+    def _start(self, tokens: Iterable[Token], filename: str) -> None:
+        self.tokens = iter(tokens)
+        self.filename = filename
+        self.exceptions = []
+
+        """Most recently examined token and the current token to be examined in the current production rule"""
+        self.previous: Token = None
+        self.current: Token = next(self.tokens, None)
+
     def _next_is(self, *args: Tokens) -> bool:
         """Checks and consumes the next token if it is any of 'args', otherwise the token stream is unaffected"""
-        for type_id in args:
-            if self._current_is(type_id):
-                self._advance()
-                return True
+        if self._at_end() or self.current.type_id not in args:
+            return False
 
-        return False
+        self._advance()
+        return True
 
     def _consume(self, *types: Tokens) -> Token:
         """Consume the next token if it is any of types, raise an exception otherwise"""
-
-        for type_id in types:
-            if self._current_is(type_id):
-                return self._advance()
+        if not self._at_end() and self.current.type_id in types:
+            return self._advance()
 
         if self._at_end() or self._peek().type_id == Tokens.EOF:
             raise EOFUnexpectedException(self.filename)
@@ -372,7 +424,8 @@ class Parser:
     def _advance(self) -> Token:
         """Consumes and returns the current token to be examined. Always returns the last token if at end"""
         if not self._at_end():
-            self.current += 1
+            self.previous = self.current
+            self.current = next(self.tokens, None)
 
         # Advance will incrememnt if we have reached the end otherwise it will just
         # always return whatever the last value was.
@@ -387,11 +440,19 @@ class Parser:
 
     def _previous(self) -> Token:
         """Returns most recently examined token in the stream"""
-        return self.tokens[self.current - 1]
+        return self.previous
 
     def _peek(self) -> Token:
         """Returns current token to be examined"""
-        return self.tokens[self.current]
+        return self.current
 
     def _at_end(self) -> bool:
-        return self.current == len(self.tokens)
+        return self.current is None
+
+    @staticmethod
+    def _first_line(token: Token) -> int:
+        """Returns the line a token starts on, multiline string literals carry the line they end on"""
+        if token.type_id == Tokens.STR_LITERAL:
+            return token.line - token.lexeme.count('\n')
+
+        return token.line
@@ -6,6 +6,9 @@ from ..lexer.lexer import Token
 class ASTVisitor: pass
 
 class Statement:
+    # Programs can hold hundreds of thousands of nodes, so none of them get a __dict__
+    __slots__ = ()
+
     def visit(self, _: ASTVisitor):
         """Pure virtual function that calls respective handler for this type in the visitor"""
         raise NotImplementedError
@@ -16,12 +19,35 @@ class Body:
     statements such as 'if', 'while', 'for' etc. It is still useful to separately
     parse them, as they show up frequently (maybe even more than once) in different rules.
     """
+
+    __slots__ = ('stmts', 'size')
+
     def __init__(self, stmts: list[Statement]) -> None:
         self.stmts = stmts
 
+        # Number of local variable slots in the scope of the body, set by the resolver
+        self.size = 0
+
+class LazyBody:
+    """
+    Function body that has only been pre-parsed, it keeps the tokens of the body (from
+    its INDENT up to the matching DEDENT) so it can be fully parsed and resolved right
+    before the function is called for the first time.
+    """
+
+    __slots__ = ('tokens', 'file_name', 'scopes')
+
+    def __init__(self, tokens: list[Token], file_name: str) -> None:
+        self.tokens = tokens
+        self.file_name = file_name
+
+        # Copy of the resolver scopes the function was declared in
+        self.scopes: list[dict[str, bool]] = None
+
 class VarDeclaration(Statement):
+    __slots__ = ('id', 'init')
+
     def __init__(self, id: Token, init: Expression = None) -> None:
-        super().__init__()
         self.id = id
         self.init = init
 
@@ -35,8 +61,9 @@ class VarDeclaration(Statement):
         return f'no {self.id.value}{f" = {self.init}" if self.has_initializer() else ""}'
 
 class FunDeclaration(Statement):
-    def __init__(self, id: Token, params: list[Token], body: Body) -> None:
-        super().__init__()
+    __slots__ = ('id', 'params', 'body')
+
+    def __init__(self, id: Token, params: list[Token], body: Body | LazyBody) -> None:
         self.id = id
         self.params = params
         self.body = body
@@ -44,12 +71,16 @@ class FunDeclaration(Statement):
     def visit(self, visitor: ASTVisitor):
         return visitor.visit_fundecl(self)
 
+    def is_lazy(self) -> bool:
+        return isinstance(self.body, LazyBody)
+
     def __repr__(self) -> str:
         return f'greg {self.id.value}({self.params})'
 
 class IfStatement(Statement):
+    __slots__ = ('cond', 'if_body', 'erm_bodies', 'hermph_body')
+
     def __init__(self, cond: Expression, if_body: Body, erm_bodies: list[tuple[Expression, Body]], hermph_body: Body) -> None:
-        super().__init__()
         self.cond = cond
         self.if_body = if_body
         self.erm_bodies = erm_bodies
@@ -62,8 +93,9 @@ class IfStatement(Statement):
         return self.hermph_body is not None
 
 class WhileStatement(Statement):
+    __slots__ = ('cond', 'while_body', 'hermph_body')
+
     def __init__(self, cond: Expression, while_body: Body, hermph_body: Body) -> None:
-        super().__init__()
         self.cond = cond
         self.while_body = while_body
         self.hermph_body = hermph_body
@@ -75,8 +107,9 @@ class WhileStatement(Statement):
         return self.hermph_body is not None
 
 class BounceStatement(Statement):
+    __slots__ = ('cond', 'bounce_body')
+
     def __init__(self, bounce_body: Body, cond: Expression) -> None:
-        super().__init__()
         self.cond = cond
         self.bounce_body = bounce_body
 
@@ -86,8 +119,9 @@ class BounceStatement(Statement):
 class ExprStatement(Statement):
     """Statement that may cause a side-effect and evaluate"""
 
+    __slots__ = ('expr',)
+
     def __init__(self, expr: Expression) -> None:
-        super().__init__()
         self.expr = expr
 
     def visit(self, visitor: ASTVisitor):
@@ -97,8 +131,9 @@ class ExprStatement(Statement):
         return repr(self.expr)
 
 class ReturnStatement(Statement):
+    __slots__ = ('token', 'value')
+
     def __init__(self, token: Token, value: Expression) -> None:
-        super().__init__()
         self.token = token
         self.value = value
 
@@ -110,3 +145,24 @@ class ReturnStatement(Statement):
 
     def __repr__(self) -> str:
         return f'pay {f"{self.value}" if self.has_value() else ""}'
+
+def contains(stmts: list[Statement], kind: type) -> bool:
+    """Checks if any of the statements, or the bodies of any of them, is of the kind, function bodies aside"""
+    for stmt in stmts:
+        if isinstance(stmt, kind):
+            return True
+
+        match stmt:
+            case IfStatement():
+                bodies = [ stmt.if_body ] + [ body for _, body in stmt.erm_bodies ] + [ stmt.hermph_body ]
+            case WhileStatement():
+                bodies = [ stmt.while_body, stmt.hermph_body ]
+            case BounceStatement():
+                bodies = [ stmt.bounce_body ]
+            case _:
+                bodies = []
+
+        if any(body is not None and contains(body.stmts, kind) for body in bodies):
+            return True
+
+    return False
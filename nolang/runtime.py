@@ -7,6 +7,8 @@ from .exception import *
 import time
 import random
 import math
+import operator
+import itertools
 from bruhcolor import bruhcolored as colored
 
 # Implementations of runtime library objects
@@ -24,21 +26,21 @@ class Nolin(NolangCallable):
         return 1
 
     def __call__(self, _, args: list[NolangType], *__):
-        return NolangString(input(args[0]))
+        return nolang_string(input(args[0]))
 
 class Time(NolangCallable):
     def arity(self) -> int:
         return 0
 
     def __call__(self, *_):
-        return NolangInt(round(time.time() * 1000))
+        return nolang_int(round(time.time() * 1000))
 
 class Random(NolangCallable):
     def arity(self) -> int:
         return 0
 
     def __call__(self, *_):
-        return NolangFloat(random.random())
+        return nolang_float(random.random())
 
 class Int(NolangCallable):
     def arity(self) -> int:
@@ -46,7 +48,7 @@ class Int(NolangCallable):
 
     def __call__(self, _, args: list[NolangType], line: int, file_name: str):
         try:
-            return NolangInt(args[0].value)
+            return nolang_int(int(args[0].value))
 
         except ValueError:
             raise RuntimeException(line, file_name, message=f'Cannot convert {args[0]} to int')
@@ -72,7 +74,7 @@ class Sleep(NolangCallable):
             return NOL
 
         except TypeError:
-            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name()}')
+            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name}')
 
 class Float(NolangCallable):
     def arity(self) -> int:
@@ -102,10 +104,10 @@ class RoundDown(NolangCallable):
 
     def __call__(self, _, args: list[NolangType], line: int, file_name: str):
         try:
-            return NolangInt(math.floor(args[0].value))
+            return nolang_int(math.floor(args[0].value))
 
         except TypeError:
-            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name()}')
+            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name}')
 
 class RoundUp(NolangCallable):
     def arity(self) -> int:
@@ -113,10 +115,10 @@ class RoundUp(NolangCallable):
 
     def __call__(self, _, args: list[NolangType], line: int, file_name: str):
         try:
-            return NolangInt(math.ceil(args[0].value))
+            return nolang_int(math.ceil(args[0].value))
 
         except TypeError:
-            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name()}')
+            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name}')
 
 class Type(NolangCallable):
     def arity(self) -> int:
@@ -124,11 +126,393 @@ class Type(NolangCallable):
 
     def __call__(self, _, args: list[NolangType], line: int, file_name: str):
         try:
-            return NolangString(args[0].type_name())
+            return nolang_string(args[0].type_name)
 
         except TypeError:
             raise RuntimeException(line, file_name, message=f'Could not get type for {args[0].value}')
 
+# Array builtins, they work on the whole array in one pass, packed arrays are worked on
+# without boxing their values
+
+class Len(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        if not is_type(args[0], NolangArray, NolangString, NolangMap):
+            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name}')
+
+        return nolang_int(len(args[0].value))
+
+class Fill(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        array, value = _array_argument(args[0], line, file_name), args[1]
+
+        # Grids keep their packed rows, every cell of every row is replaced
+        if array.__class__ is NolangGrid:
+            _grid_rows(array, line, file_name)
+
+            if not is_type(value, NolangInt, NolangFloat):
+                raise RuntimeException(line, file_name, message=f'Invalid type {value.type_name}, grids are filled with numbers')
+
+            try:
+                filled = [ packed_array(TYPE_CODES[value.__class__], [ value.value ] * len(row.value)) for row in array.value ]
+
+            except OverflowError:
+                raise RuntimeException(line, file_name, message=f'Cannot fill a grid with {value}')
+
+            for row, values in zip(array.value, filled):
+                row.value = values.value
+
+            return array
+
+        # Every value is replaced, so the array is packed for the new value if it can be
+        filled = nolang_array([ value ] * len(array.value))
+        array.value = filled.value
+
+        return array
+
+class Range(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        if not is_type(args[0], NolangInt):
+            raise RuntimeException(line, file_name, message=f'Invalid type {args[0].type_name}')
+
+        try:
+            return packed_array(INT64, range(args[0].value))
+
+        except OverflowError:
+            raise RuntimeException(line, file_name, message=f'Cannot make a range of {args[0]} values')
+
+class Sum(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        values, typecode = _numbers(args[0], line, file_name)
+        return _box(sum(values, 0.0 if typecode == FLOAT64 else 0))
+
+class Min(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        values, _ = _numbers(args[0], line, file_name)
+
+        if not values:
+            raise RuntimeException(line, file_name, message='Cannot take the min of an empty array')
+
+        return _box(min(values))
+
+class Max(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        values, _ = _numbers(args[0], line, file_name)
+
+        if not values:
+            raise RuntimeException(line, file_name, message='Cannot take the max of an empty array')
+
+        return _box(max(values))
+
+class Copy(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        if args[0].__class__ is NolangMap:
+            return args[0].copy()
+
+        return _array_argument(args[0], line, file_name).copy()
+
+class Dot(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        (values1, typecode1), (values2, typecode2) = _operands(args, line, file_name, broadcast=False)
+        return _box(sum(map(operator.mul, values1, values2), 0 if typecode1 == typecode2 == INT64 else 0.0))
+
+class Add(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        return _elementwise(operator.add, args, line, file_name)
+
+class Mul(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        return _elementwise(operator.mul, args, line, file_name)
+
+class Where(NolangCallable):
+    def arity(self) -> int:
+        return 3
+
+    def __call__(self, interpreter: Interpreter, args: list[NolangType], line: int, file_name: str):
+        cond = _array_argument(args[0], line, file_name)
+        size = len(cond.value)
+
+        # Packed conditions hold numbers, which are true unless they are 0
+        if cond.is_packed():
+            truths = map(bool, cond.value)
+        else:
+            truths = map(interpreter._to_truthy, cond.value)
+
+        # Values to pick from are arrays as long as the condition or single values used for every element
+        choices = []
+        for choice in args[1:]:
+            if not is_type(choice, NolangArray):
+                choices.append(itertools.repeat(choice, size))
+            elif len(choice.value) == size:
+                choices.append(choice.elements())
+            else:
+                raise RuntimeException(line, file_name, message=f'Cannot pick from arrays of {size} and {len(choice.value)} values')
+
+        return nolang_array([ picked if truth else other for truth, picked, other in zip(truths, *choices) ])
+
+# Grid builtins, they work a row at a time on the packed rows of the grid
+
+class Grid(NolangCallable):
+    def arity(self) -> int:
+        return 3
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        rows, cols, value = args
+
+        if not is_type(rows, NolangInt) or not is_type(cols, NolangInt) or not is_type(value, NolangInt, NolangFloat):
+            raise RuntimeException(line, file_name, message=f'Invalid types {rows.type_name}, {cols.type_name} and {value.type_name}, expected two ints and a number')
+
+        try:
+            return packed_grid(TYPE_CODES[value.__class__], ([ value.value ] * cols.value for _ in range(rows.value)))
+
+        except OverflowError:
+            raise RuntimeException(line, file_name, message=f'Cannot make a grid of {value}')
+
+class Neighbours(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        rows, _ = _grid_rows(args[0], line, file_name)
+        return packed_grid(INT64, _neighbour_counts(rows))
+
+class Convolve(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        rows, typecode = _grid_rows(args[0], line, file_name)
+        kernel, kernel_typecode = _grid_rows(args[1], line, file_name)
+
+        if len(kernel) % 2 == 0 or len(kernel[0]) % 2 == 0:
+            raise RuntimeException(line, file_name, message=f'Invalid kernel {args[1]}, its sides must be odd')
+
+        typecode = INT64 if typecode == kernel_typecode == INT64 else FLOAT64
+        return packed_grid(typecode, _convolution(rows, kernel))
+
+class Life(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        rows, _ = _grid_rows(args[0], line, file_name)
+        alive = [ list(map(bool, row)) for row in rows ]
+
+        # Cells are looked up by 9 times their state plus their neighbour count
+        nines = itertools.repeat(9)
+        return packed_grid(INT64, (map(LIFE_RULES.__getitem__, map(operator.add, map(operator.mul, row, nines), counts)) for row, counts in zip(alive, _neighbour_counts(rows))))
+
+class Swap(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        first, second = args
+
+        if not is_type(first, NolangArray) or first.__class__ is not second.__class__:
+            raise RuntimeException(line, file_name, message=f'Invalid types {first.type_name} and {second.type_name}, expected two arrays or two grids')
+
+        first.value, second.value = second.value, first.value
+        return NOL
+
+# Next state of a cell, by 9 times its state plus the number of its live neighbours. Dead
+# cells with 3 live neighbours come alive, live cells with 2 or 3 stay alive
+LIFE_RULES = (0, 0, 0, 1, 0, 0, 0, 0, 0) + (0, 0, 1, 1, 0, 0, 0, 0, 0)
+
+# Kernel counting the neighbours of a cell, the cell itself doesn't count
+NEIGHBOURHOOD = [ [ 1, 1, 1 ], [ 1, 0, 1 ], [ 1, 1, 1 ] ]
+
+# Map builtins, keys are looked up like map[key] does
+
+class Has(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        values = _map_argument(args[0], line, file_name).value
+        return TRUE if _map_key(args[1], line, file_name) in values else FALSE
+
+class Keys(NolangCallable):
+    def arity(self) -> int:
+        return 1
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        return nolang_array(_map_argument(args[0], line, file_name).keys())
+
+class Remove(NolangCallable):
+    def arity(self) -> int:
+        return 2
+
+    def __call__(self, _, args: list[NolangType], line: int, file_name: str):
+        values = _map_argument(args[0], line, file_name).value
+        key = _map_key(args[1], line, file_name)
+
+        if key not in values:
+            raise RuntimeException(line, file_name, message=f'Key {key!r} not found')
+
+        # Gives back the value the key had
+        return values.pop(key)
+
+### Utilities ###
+
+def _grid_rows(value: NolangType, line: int, file_name: str) -> tuple[list, str]:
+    """
+    Gives back the raw rows of a grid, or of an array of packed rows of the same length,
+    and the type code of the values they hold together
+    """
+    rows = _array_argument(value, line, file_name).value
+
+    if rows.__class__ is not list or not rows:
+        raise RuntimeException(line, file_name, message=f'Invalid grid {value}, expected rows of numbers')
+
+    for row in rows:
+        if not is_type(row, NolangArray) or not row.is_packed() or len(row.value) != len(rows[0].value):
+            raise RuntimeException(line, file_name, message=f'Invalid grid {value}, expected rows of numbers of the same length')
+
+    typecodes = { row.value.typecode for row in rows }
+    return [ row.value for row in rows ], typecodes.pop() if len(typecodes) == 1 else FLOAT64
+
+def _neighbour_counts(rows: list) -> list:
+    """Counts the live (not 0) neighbours of every cell, a row at a time"""
+    return _convolution([ list(map(bool, row)) for row in rows ], NEIGHBOURHOOD)
+
+def _convolution(rows: list, kernel: list) -> list[list]:
+    """
+    Sums up the cells around every cell weighed by the kernel, which is centred on the
+    cell. Cells outside of the grid count as 0
+    """
+    height, width = len(rows), len(rows[0])
+    reach_y, reach_x = len(kernel) // 2, len(kernel[0]) // 2
+
+    # Rows padded on both sides, so every weight applies to a slice of the same width
+    padding = [ 0 ] * reach_x
+    padded = [ padding + list(row) + padding for row in rows ]
+
+    results = []
+    for i in range(height):
+        sums = [ 0 ] * width
+
+        for dy, weights in enumerate(kernel):
+            y = i + dy - reach_y
+
+            if y < 0 or y >= height:
+                continue
+
+            for dx, weight in enumerate(weights):
+                if weight == 0:
+                    continue
+
+                cells = itertools.islice(padded[y], dx, dx + width)
+                sums = list(map(operator.add, sums, cells if weight == 1 else map(operator.mul, cells, itertools.repeat(weight))))
+
+        results.append(sums)
+
+    return results
+
+def _array_argument(value: NolangType, line: int, file_name: str) -> NolangArray:
+    if not is_type(value, NolangArray):
+        raise RuntimeException(line, file_name, message=f'Invalid type {value.type_name}, expected an array')
+
+    return value
+
+def _map_argument(value: NolangType, line: int, file_name: str) -> NolangMap:
+    if value.__class__ is not NolangMap:
+        raise RuntimeException(line, file_name, message=f'Invalid type {value.type_name}, expected a map')
+
+    return value
+
+def _map_key(value: NolangType, line: int, file_name: str):
+    """Gives back the python value a key is stored under in maps"""
+    key = value.value
+
+    if key.__class__ not in KEY_TYPES:
+        raise RuntimeException(line, file_name, message=f'Invalid type {value.type_name}, expected an int, float, string or bool key')
+
+    return key
+
+def _numbers(value: NolangType, line: int, file_name: str) -> tuple[list, str | None]:
+    """
+    Gives back the raw values of an array of numbers and the type code they would be
+    packed with, None when it mixes ints and floats
+    """
+    array = _array_argument(value, line, file_name)
+    values = array.value
+
+    if array.is_packed():
+        return values, values.typecode
+
+    typecodes = { TYPE_CODES.get(element.__class__) for element in values }
+
+    if None in typecodes:
+        raise RuntimeException(line, file_name, message=f'Invalid array {array}, expected numbers')
+
+    return [ element.value for element in values ], typecodes.pop() if len(typecodes) == 1 else None
+
+def _operands(args: list[NolangType], line: int, file_name: str, broadcast: bool = True) -> list[tuple]:
+    """
+    Gives back the raw values of the operands of an elementwise operation with their type
+    codes, single numbers are repeated for every element of the array when broadcast
+    """
+    numbers = [ None if broadcast and is_type(arg, NolangInt, NolangFloat) else _numbers(arg, line, file_name) for arg in args ]
+    sizes = [ len(values) for values, _ in filter(None, numbers) ]
+
+    if not sizes:
+        raise RuntimeException(line, file_name, message=f'Invalid types {args[0].type_name} and {args[1].type_name}, expected an array')
+
+    if min(sizes) != max(sizes):
+        raise RuntimeException(line, file_name, message=f'Cannot combine arrays of {min(sizes)} and {max(sizes)} values')
+
+    return [ (itertools.repeat(arg.value, sizes[0]), TYPE_CODES[arg.__class__]) if number is None else number for arg, number in zip(args, numbers) ]
+
+def _elementwise(apply, args: list[NolangType], line: int, file_name: str) -> NolangArray:
+    (values1, typecode1), (values2, typecode2) = _operands(args, line, file_name)
+    results = list(map(apply, values1, values2))
+
+    # Ints stay ints unless they get too big for a packed array, anything involving floats becomes a float
+    if typecode1 == typecode2 == INT64:
+        try:
+            return packed_array(INT64, results)
+
+        except OverflowError:
+            pass
+
+    elif typecode1 is not None and typecode2 is not None:
+        return packed_array(FLOAT64, results)
+
+    return nolang_array([ _box(result) for result in results ])
+
+def _box(value: int | float) -> NolangType:
+    return nolang_int(value) if value.__class__ is int else nolang_float(value)
+
 # Global runtime, this should be immutable!
 
 RUNTIME_GLOBALS: dict[str, NolangType] = \
@@ -145,4 +529,23 @@ RUNTIME_GLOBALS: dict[str, NolangType] = \
     'color':      Color(),
     'sleep':      Sleep(),
     'type':       Type(),
+    'len':        Len(),
+    'fill':       Fill(),
+    'range':      Range(),
+    'sum':        Sum(),
+    'min':        Min(),
+    'max':        Max(),
+    'copy':       Copy(),
+    'dot':        Dot(),
+    'add':        Add(),
+    'mul':        Mul(),
+    'where':      Where(),
+    'grid':       Grid(),
+    'neighbours': Neighbours(),
+    'convolve':   Convolve(),
+    'life':       Life(),
+    'swap':       Swap(),
+    'has':        Has(),
+    'keys':       Keys(),
+    'remove':     Remove(),
 }
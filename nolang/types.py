@@ -1,14 +1,21 @@
 
+from array import array as _array
 from bruhcolor import bruhcolorwrapper
 
+from .parser.expressions import CallExpression
 from .parser.statements import FunDeclaration
 from .exception import *
 from .util import *
 
 class NolangType:
+    # Programs create millions of values, so none of them get a __dict__
+    __slots__ = ('value',)
+
     def __init__(self) -> None:
+        # Types holding a python value set it themselves instead
         self.value = self
 
+    @property
     def type_name(self) -> str:
         return str(self)
 
@@ -18,14 +25,28 @@ class NolangType:
     def __repr__(self) -> str:
         return str(self)
 
+# Allocates values for the trusted constructors below, tools counting allocations hook it
+_allocate = object.__new__
+
+def _trusted(cls: type):
+    """
+    Makes a constructor of values of the type for internal use, it trusts the value to
+    already be of the right python type and skips the coercion the type does
+    """
+    def construct(value):
+        instance = _allocate(cls)
+        instance.value = value
+        return instance
+
+    return construct
+
 class NolangInt(NolangType):
+    __slots__ = ()
+    type_name = 'int'
+
     def __init__(self, value: int) -> None:
-        super().__init__()
         self.value = int(value) # Force to int
 
-    def type_name(self) -> str:
-        return 'int'
-
     def __str__(self) -> str:
         try:
             return str(self.value)
@@ -33,35 +54,96 @@ class NolangInt(NolangType):
         except ValueError:
             return 'Too big to be stringified!'
 
+    def __reduce__(self):
+        # Unpickled ints are shared like any other ints
+        return nolang_int, (self.value,)
+
+# Values are never mutated, so the ints that come up the most (loop counters, indices) are
+# allocated once and shared
+SMALL_INT_MIN = -128
+SMALL_INT_MAX = 1024
+SMALL_INTS = { value: NolangInt(value) for value in range(SMALL_INT_MIN, SMALL_INT_MAX + 1) }
+
+def nolang_int(value: int) -> NolangInt:
+    """Gives back the shared NolangInt for small values, or a new one, the value must be an int"""
+    instance = SMALL_INTS.get(value)
+
+    # Trusted like the constructors made by _trusted, without the extra call
+    if instance is None:
+        instance = _allocate(NolangInt)
+        instance.value = value
+
+    return instance
+
 class NolangFloat(NolangType):
+    __slots__ = ()
+    type_name = 'float'
+
     def __init__(self, value: float) -> None:
-        super().__init__()
         self.value = float(value) # Force to float
 
-    def type_name(self) -> str:
-        return 'float'
-
     def __str__(self) -> str:
         return str(self.value)
 
+nolang_float = _trusted(NolangFloat)
+
 class NolangBool(NolangType):
+    __slots__ = ()
+    type_name = 'bool'
+
     def __init__(self, value: bool) -> None:
-        super().__init__()
         self.value = bool(value) # Force to bool
 
-    def type_name(self) -> str:
-        return 'bool'
-
     def __str__(self) -> str:
         return 'True' if self.value else 'False'
 
+    def __reduce__(self):
+        # Unpickling must give back TRUE or FALSE below
+        return 'TRUE' if self.value else 'FALSE'
+
+# There are only two bools, every True and False in a program is one of these
+TRUE = NolangBool(True)
+FALSE = NolangBool(False)
+
+def nolang_bool(value) -> NolangBool:
+    """Gives back TRUE or FALSE depending on the truthiness of the python value"""
+    return TRUE if value else FALSE
+
+# Slot holding the python value of every value, strings put a property in front of it
+_value_slot = NolangType.value
+
+# Strings shorter than this are concatenated right away, longer ones defer the join
+DEFERRED_JOIN_MIN = 256
+
 class NolangString(NolangType):
+    """
+    String, which can be built up by concatenation without being copied every time.
+    Long strings made by concatenation keep their pieces in a buffer instead, which
+    the strings concatenated to them append to as well, and only join them once their
+    value is needed: when they are printed, compared, converted or indexed.
+    """
+
+    __slots__ = ('_pieces', '_count')
+    type_name = 'string'
+
     def __init__(self, value: str) -> None:
-        super().__init__()
         self.value = str(value) # Force to string
 
-    def type_name(self) -> str:
-        return 'string'
+    @property
+    def value(self) -> str:
+        pieces = self._pieces
+
+        # Strings built on this one can have appended more to the buffer, only the first pieces are this string
+        if pieces is not None:
+            _value_slot.__set__(self, ''.join(pieces if self._count == len(pieces) else pieces[:self._count]))
+            self._pieces = None
+
+        return _value_slot.__get__(self)
+
+    @value.setter
+    def value(self, value: str) -> None:
+        _value_slot.__set__(self, value)
+        self._pieces = None
 
     def __str__(self) -> str:
         return self.value
@@ -69,37 +151,222 @@ class NolangString(NolangType):
     def __repr__(self) -> str:
         return f'\'{self}\''
 
+    def __reduce__(self):
+        # Pickled joined, the buffer is shared with other strings
+        return NolangString, (self.value,)
+
+nolang_string = _trusted(NolangString)
+
+def concatenated(val1: NolangType, val2: NolangType) -> NolangString:
+    """Concatenates the strings of the values, long strings are only joined when their value is needed"""
+    pieces = val1._pieces if val1.__class__ is NolangString else None
+
+    # Only the last string built on a buffer can append to it, any other is joined and starts a new one
+    if pieces is not None and val1._count == len(pieces):
+        pieces.append(str(val2))
+
+    else:
+        start, end = str(val1), str(val2)
+
+        if len(start) + len(end) < DEFERRED_JOIN_MIN:
+            return nolang_string(start + end)
+
+        pieces = [ start, end ]
+
+    instance = _allocate(NolangString)
+    instance._pieces = pieces
+    instance._count = len(pieces)
+
+    return instance
+
+class NolangArray: pass
 class NolangArray(NolangType):
+    """
+    Array of any values, in a list. Arrays holding only ints or only floats are packed
+    instead, their value is a python array of the raw int64 or float64 values. Values
+    read from a packed array are boxed again, storing a value that doesn't fit unpacks
+    the array into a list for good.
+
+    Fast paths index the list of unpacked arrays themselves and go through the methods
+    below for anything else.
+    """
+
+    __slots__ = ()
+    type_name = 'array'
+
     def __init__(self, value: list) -> None:
-        super().__init__()
         self.value = list(value) # Force to list
 
-    def type_name(self) -> str:
-        return 'array'
-
     def __str__(self) -> str:
-        joined = ', '.join([ repr(element) for element in self.value ])
+        joined = ', '.join([ repr(element) for element in self.elements() ])
         return f'[{joined}]'
 
     def __len__(self) -> int:
         return len(self.value)
 
-    def __getitem__(self, i):
-        return self.value[i]
+    def __getitem__(self, i: int) -> NolangType:
+        values = self.value
+
+        if values.__class__ is list:
+            return values[i]
+
+        return nolang_int(values[i]) if values.typecode == INT64 else nolang_float(values[i])
+
+    def __setitem__(self, i: int, value: NolangType):
+        values = self.value
+
+        if values.__class__ is not list:
+            if value.__class__ is PACKED_TYPES[values.typecode]:
+                try:
+                    values[i] = value.value
+                    return
+
+                # Ints that don't fit in 64 bits
+                except OverflowError:
+                    pass
+
+            values = self.unpack()
+
+        values[i] = value
 
     def append(self, v):
-        self.value.append(v)
+        values = self.value
+
+        if values.__class__ is not list:
+            if v.__class__ is PACKED_TYPES[values.typecode]:
+                try:
+                    values.append(v.value)
+                    return
+
+                except OverflowError:
+                    pass
+
+            values = self.unpack()
+
+        values.append(v)
+
+    def is_packed(self) -> bool:
+        return self.value.__class__ is not list
+
+    def elements(self) -> list[NolangType]:
+        """Gives back the values in the array, boxed"""
+        if self.value.__class__ is list:
+            return self.value
+
+        return [ self[i] for i in range(len(self.value)) ]
+
+    def unpack(self) -> list[NolangType]:
+        """Turns a packed array into a regular one, giving back its list"""
+        self.value = self.elements()
+        return self.value
+
+    def copy(self) -> NolangArray:
+        """Gives back a new array with the same values, packed the same way"""
+        return _new_array(self.value[:])
+
+# Type codes of the python arrays packed arrays are stored in
+INT64 = 'q'
+FLOAT64 = 'd'
+
+# Types of the values packed arrays hold, by type code and the other way around
+PACKED_TYPES = { INT64: NolangInt, FLOAT64: NolangFloat }
+TYPE_CODES = { NolangInt: INT64, NolangFloat: FLOAT64 }
+
+_new_array = _trusted(NolangArray)
+
+def nolang_array(elements: list[NolangType]) -> NolangArray:
+    """
+    Makes an array of the values, taking the list over instead of copying it. Values that
+    are all ints or all floats are packed
+    """
+    if elements:
+        typ = elements[0].__class__
+        typecode = TYPE_CODES.get(typ)
+
+        if typecode is not None and all(element.__class__ is typ for element in elements):
+            try:
+                return _new_array(_array(typecode, [ element.value for element in elements ]))
+
+            except OverflowError:
+                pass
+
+    return _new_array(elements)
+
+def packed_array(typecode: str, values) -> NolangArray:
+    """
+    Makes a packed array of raw values, ints for INT64 and floats for FLOAT64. Raises an
+    OverflowError for ints that don't fit in 64 bits
+    """
+    return _new_array(_array(typecode, values))
+
+class NolangGrid: pass
+class NolangGrid(NolangArray):
+    """
+    Two dimensional array, an array of packed rows of the same length. Rows are indexed
+    like the rows of any array of arrays, grid[i][j] reads and writes the cell in place.
+
+    Grid builtins check the rows are still packed and of the same length, since assigning
+    a row of a grid is allowed like in any other array.
+    """
+
+    __slots__ = ()
+    type_name = 'grid'
+
+    def copy(self) -> NolangGrid:
+        """Gives back a new grid with copies of the rows"""
+        return _new_grid([ row.copy() for row in self.value ])
+
+_new_grid = _trusted(NolangGrid)
+
+def packed_grid(typecode: str, rows) -> NolangGrid:
+    """Makes a grid of rows of raw values, see packed_array"""
+    return _new_grid([ packed_array(typecode, row) for row in rows ])
+
+class NolangMap: pass
+class NolangMap(NolangType):
+    """
+    Map of keys to any values, in a dict. Keys are ints, floats, strings or bools and the
+    dict holds them as their python value, so looking a key up allocates nothing. Keys
+    that are == are the same key, like 1 and 1.0, the first one stored is kept.
+
+    Fast paths use the dict themselves, keys are boxed again on the way out.
+    """
+
+    __slots__ = ()
+    type_name = 'map'
+
+    def __init__(self, value: dict) -> None:
+        self.value = dict(value) # Force to dict
+
+    def __str__(self) -> str:
+        joined = ', '.join([ f'{key!r}: {value!r}' for key, value in zip(self.keys(), self.value.values()) ])
+        return f'{{{joined}}}'
+
+    def __getitem__(self, key) -> NolangType:
+        return self.value[key]
+
+    def __setitem__(self, key, value: NolangType):
+        self.value[key] = value
+
+    def keys(self) -> list[NolangType]:
+        """Gives back the keys in the map, boxed"""
+        return [ KEY_TYPES[key.__class__](key) for key in self.value ]
+
+    def copy(self) -> NolangMap:
+        """Gives back a new map with the same keys and values"""
+        return nolang_map(self.value.copy())
+
+nolang_map = _trusted(NolangMap)
 
 class NolangColoredText: pass
 class NolangColoredText(NolangType):
+    __slots__ = ()
+    type_name = 'ColoredText'
+
     def __init__(self, value: bruhcolorwrapper):
-        super().__init__()
         assert is_type(value, bruhcolorwrapper), "NolangColoredText requires a bruhcolorwrapper"
         self.value = value
 
-    def type_name(self) -> str:
-        return 'ColoredText'
-
     def __str__(self) -> str:
         return self.value.colored
 
@@ -116,15 +383,65 @@ class NolangColoredText(NolangType):
         return NolangColoredText(new_color)
 
 class NolangNol(NolangType):
+    __slots__ = ()
+    type_name = 'nol'
+
     def __str__(self) -> str:
         return 'nol'
 
+    def __reduce__(self):
+        # Unpickling must give back the one and only NOL below
+        return 'NOL'
+
 # nol type can be treated as immutable
 NOL = NolangNol()
 
+# Types of the values that can be keys of maps, by the type of their python value
+KEY_TYPES = { int: nolang_int, float: nolang_float, str: nolang_string, bool: nolang_bool }
+
+# Types of the values == compares by the values they hold instead of by their python value
+CONTAINER_TYPES = frozenset({ NolangArray, NolangGrid, NolangMap })
+
+def equal(val1: NolangType, val2: NolangType) -> bool:
+    """
+    Whether the values are ==. Containers are when they hold values of the same types that
+    are ==, so [1] == [1.0] isn't true even though 1 == 1.0 is
+    """
+    if val1.__class__ in CONTAINER_TYPES:
+        return _same(val1, val2)
+
+    return val1.value == val2.value
+
+def _same(val1: NolangType, val2: NolangType) -> bool:
+    if val1.__class__ is not val2.__class__:
+        return False
+
+    if val1.__class__ not in CONTAINER_TYPES:
+        return val1.value == val2.value
+
+    if val1 is val2:
+        return True
+
+    values1, values2 = val1.value, val2.value
+
+    if len(values1) != len(values2):
+        return False
+
+    # Maps hold the same keys in any order, keys that are == being the same key
+    if values1.__class__ is dict:
+        return all(key in values2 and _same(value, values2[key]) for key, value in values1.items())
+
+    # Packed arrays of the same type compare their raw values without boxing them
+    if values1.__class__ is values2.__class__ is _array and values1.typecode == values2.typecode:
+        return values1 == values2
+
+    return all(map(_same, val1.elements(), val2.elements()))
+
 class Interpreter: pass
 
 class NolangCallable(NolangType):
+    __slots__ = ()
+
     def arity(self) -> int:
         raise NotImplementedError()
 
@@ -135,6 +452,8 @@ class NolangCallable(NolangType):
         return f'<function built-in {self.__class__.__name__} {self.arity()}-ary>'
 
 class NolangFunction(NolangCallable):
+    __slots__ = ('fun', 'env')
+
     def __init__(self, fun: FunDeclaration, env) -> None:
         super().__init__()
         self.fun = fun
@@ -145,17 +464,58 @@ class NolangFunction(NolangCallable):
 
     def __call__(self, interpreter: Interpreter, args: list[NolangType], *_):
         from .astvisitors.interpreter import Environment
-        env = Environment(self.env)
 
-        # Binding arguments to parameters
-        for param, arg in zip(self.fun.params, args):
-            env.define(param, arg)
+        function = self
 
-        try:
-            interpreter._execute_body(self.fun.body, env)
+        # Calls paid in tail position are made by this loop, after the body paying them returned
+        while True:
+            fun = function.fun
+
+            # The body of a lazily parsed function is only parsed on its first call
+            if fun.is_lazy():
+                interpreter._materialize(fun)
+
+            # Parameters take up the first slots of the environment, in order
+            env = Environment(function.env, args + [ None ] * (fun.body.size - len(args)))
+
+            # Gives back what the body pays, or None when it doesn't
+            paid = interpreter._execute_function(fun, env)
+
+            if paid.__class__ is not TailCall:
+                return paid
+
+            function, args = paid.checked(), paid.args
 
-        except Return as ret:
-            return ret.value
+            # Anything but a plain function is called the regular way
+            if function.__class__ is not NolangFunction:
+                return function(interpreter, args, paid.expr.paren.line, paid.expr.paren.file_name)
 
     def __str__(self) -> str:
         return f'<function {self.fun.id.value} {self.arity()}-ary>'
+
+class TailCall:
+    """
+    Call paid by a function, with its callee and arguments evaluated but not made yet. The
+    function call it is paid to makes it once the body that paid it is done, so recursion
+    in tail position doesn't grow the stack.
+    """
+
+    __slots__ = ('expr', 'callee', 'args')
+
+    def __init__(self, expr: CallExpression, callee: NolangType, args: list[NolangType]) -> None:
+        self.expr = expr
+        self.callee = callee
+        self.args = args
+
+    def checked(self) -> NolangCallable:
+        """Gives back the callee once it is checked the same way any other call is"""
+        expr = self.expr
+
+        if not isinstance(self.callee, NolangCallable):
+            raise NotCallableException(expr.callee, expr.paren.line, expr.paren.file_name)
+
+        arity = self.callee.arity()
+        if arity != len(self.args):
+            raise InvalidArgumentsException(expr.callee, arity, len(self.args), expr.paren.line, expr.paren.file_name)
+
+        return self.callee
@@ -0,0 +1,86 @@
+# Counts how many nolang values the interpreter allocates running loop heavy programs.
+#
+# Usage: python supplemental/benchmarks/allocation_benchmark.py [GENERATIONS]
+#
+# Runs the programs of interpreter_benchmark.py (game_of_life.nl for GENERATIONS,
+# default 10, generations) once on every backend, counting the values created by
+# type and the young generation collections the garbage collector went through.
+# Allocations are counted by hooking the creation of every nolang value, so the
+# programs run slower than they normally would, time them with interpreter_benchmark.py.
+
+import io
+import gc
+import os
+import sys
+import random
+import contextlib
+
+from collections import Counter
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang import types
+
+from interpreter_benchmark import BACKENDS, programs
+
+# Types whose allocations are shown in their own column, the rest are summed up
+COLUMNS = [ 'NolangInt', 'NolangFloat', 'NolangBool' ]
+
+# Counter of the values created by type name, None while nothing is being counted
+allocations: Counter | None = None
+
+def new(cls, *args, **kwargs):
+    if allocations is not None:
+        allocations[cls.__name__] += 1
+
+    return object.__new__(cls)
+
+# Values are created by calling their type or by the trusted constructors, which allocate
+# them directly. The hooks stay in place, python doesn't go back to its own checks once
+# __new__ is removed
+types.NolangType.__new__ = staticmethod(new)
+types._allocate = new
+
+@contextlib.contextmanager
+def counting():
+    """Counts every nolang value created in the block by its type name"""
+    global allocations
+    allocations = Counter()
+
+    try:
+        yield allocations
+    finally:
+        allocations = None
+
+def measure(name: str, source: str, backend: type) -> tuple[Counter, int]:
+    # Literals are created while scanning, only the values created at runtime are counted
+    stmts = Parser().parse(Lexer().scan(source, f'{name}.nl'), f'{name}.nl')
+    random.seed(0)
+
+    gc.collect()
+    collections = gc.get_stats()[0]['collections']
+
+    with contextlib.redirect_stdout(io.StringIO()), counting() as allocations:
+        backend().explore(stmts)
+
+    return allocations, gc.get_stats()[0]['collections'] - collections
+
+def main():
+    generations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    print(f'{"":>24}  ' + ''.join(f'{column:>12}' for column in COLUMNS) + f'{"other":>12}{"total":>12}{"gen0 gcs":>10}')
+
+    for name, source in programs(generations).items():
+        for backend_name, backend in BACKENDS.items():
+            allocations, collections = measure(name, source, backend)
+
+            columns = [ allocations[column] for column in COLUMNS ]
+            other = allocations.total() - sum(columns)
+
+            print(f'{f"{name} ({backend_name})":>24}: ' + ''.join(f'{count:>12}' for count in columns) + f'{other:>12}{allocations.total():>12}{collections:>10}')
+
+if __name__ == '__main__':
+    main()
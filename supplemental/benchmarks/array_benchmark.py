@@ -0,0 +1,107 @@
+# Measures the memory taken up by packed and unpacked arrays and the cost of sweeping them.
+#
+# Usage: python supplemental/benchmarks/array_benchmark.py [SIZE] [ROUNDS]
+#
+# Grids are SIZE x SIZE (default 300) arrays of arrays. Their memory is measured for
+# cells holding 0 or 1 (like game_of_life.nl), larger ints and floats, with rows packed
+# the way array literals are and unpacked like arrays holding other values.
+# The sweep reads and writes every cell of an int grid, like game_of_life.nl does every
+# generation, taking the best of ROUNDS (default 3) runs on every backend. The grid is
+# built by a literal before the sweep starts and only the sweep itself is timed.
+
+import io
+import os
+import sys
+import random
+import tracemalloc
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.types import *
+
+from interpreter_benchmark import BACKENDS
+
+# Values of the cells of the grids measured for memory
+CELLS = {
+    'bits': lambda: nolang_int(random.randint(0, 1)),
+    'ints': lambda: nolang_int(random.randint(0, 1 << 40)),
+    'floats': lambda: nolang_float(random.random()),
+}
+
+# Unpacking a row takes storing a value of another type in it, the sweep restores the cell
+SWEEP = '''
+greg unpack(grid, size)
+    no i = 0
+    while i < size
+        grid[i][0] = "unpacked"
+        grid[i][0] = 0
+        i = i + 1
+
+greg sweep(grid, size)
+    no i = 0
+    while i < size
+        no j = 0
+        while j < size
+            grid[i][j] = grid[i][j] + 1
+            j = j + 1
+        i = i + 1
+
+no size = {size}
+no grid = {grid}
+
+if {unpack}
+    unpack(grid, size)
+
+no start = time()
+sweep(grid, size)
+nolout(time() - start)
+'''
+
+def memory(size: int, cell, array) -> int:
+    random.seed(0)
+    tracemalloc.start()
+    grid = NolangArray([ array([ cell() for _ in range(size) ]) for _ in range(size) ])
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return current
+
+def sweep(size: int, unpack: bool, rounds: int, backend: type) -> float:
+    row = '[' + ', '.join('0' for _ in range(size)) + ']'
+    source = SWEEP.format(size=size, grid='[' + ', '.join(row for _ in range(size)) + ']', unpack='True' if unpack else 'False')
+    best = float('inf')
+
+    for _ in range(rounds):
+        stmts = Parser().parse(Lexer().scan(source, 'sweep.nl'), 'sweep.nl')
+
+        # The program prints how many milliseconds the sweep took
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            backend().explore(stmts)
+
+        best = min(best, int(out.getvalue()) / 1000)
+
+    return best
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f'Memory of a {size}x{size} grid')
+
+    for name, cell in CELLS.items():
+        packed, unpacked = memory(size, cell, nolang_array), memory(size, cell, NolangArray)
+        print(f'{name:>8}: {packed / (1024 * 1024):>7.2f} MiB packed, {unpacked / (1024 * 1024):>7.2f} MiB unpacked')
+
+    print(f'\nSweep of a {size}x{size} grid')
+    print(f'{"":>8}  ' + ''.join(f'{backend:>10}' for backend in BACKENDS))
+
+    for name, unpack in (('packed', False), ('unpacked', True)):
+        times = [ sweep(size, unpack, rounds, backend) for backend in BACKENDS.values() ]
+        print(f'{name:>8}: ' + ''.join(f'{elapsed:>9.3f}s' for elapsed in times))
+
+if __name__ == '__main__':
+    main()
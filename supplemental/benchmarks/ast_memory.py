@@ -0,0 +1,70 @@
+# Measures how much memory the AST of a large generated program takes up.
+#
+# Usage: python supplemental/benchmarks/ast_memory.py [LINES]
+#
+# The generated program has LINES (default 100000) lines of functions, loops,
+# conditionals and expression statements. Tokens are scanned upfront, only the
+# memory retained by the parsed AST and the time taken to parse it are measured.
+
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+
+# Every chunk is 10 lines long
+CHUNK = '''greg f{i}(a, b)
+    no c = a * {i} + b
+    while c < 100
+        if c % 2 == 0
+            c = c + values[c % 3]
+        hermph
+            c = c * 2 - 1
+    pay [c, "s{i}", 2.5]
+no values = [1, 2, 3]
+nolout(f{i}(1, -2)[0])
+'''
+
+def build_source(lines: int) -> str:
+    return ''.join(CHUNK.format(i=i) for i in range(lines // 10))
+
+def count_nodes(node) -> int:
+    """Counts every expression, statement and body reachable from node"""
+    if isinstance(node, list | tuple):
+        return sum(count_nodes(child) for child in node)
+
+    if not type(node).__module__.startswith('nolang.parser'):
+        return 0
+
+    return 1 + sum(count_nodes(getattr(node, name)) for name in fields(node))
+
+def fields(node) -> list[str]:
+    names = [ name for cls in type(node).__mro__ for name in getattr(cls, '__slots__', ()) ]
+    return names + list(getattr(node, '__dict__', {}))
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tokens = Lexer().scan(build_source(lines), 'benchmark.nl')
+
+    # Tracing memory slows parsing down a lot, so it is timed separately
+    start = time.perf_counter()
+    Parser().parse(tokens, 'benchmark.nl')
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    stmts = Parser().parse(tokens, 'benchmark.nl')
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(stmts)
+    print(f'Program: {lines} lines, {len(tokens)} tokens, {nodes} nodes')
+    print(f'    AST: {current / (1024 * 1024):.2f} MiB retained ({current / nodes:.1f} B/node) {peak / (1024 * 1024):.2f} MiB peak')
+    print(f'  Parse: {elapsed:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Compares game of life generations computed by game_of_life.nl with the life() builtin.
+#
+# Usage: python supplemental/benchmarks/grid_benchmark.py [GENERATIONS] [ROUNDS]
+#
+# Runs GENERATIONS (default 10) generations on grids of a few sizes, once with the
+# generate_run function of game_of_life.nl and once with one life() call per
+# generation, taking the best of ROUNDS (default 3) runs on every backend. Both start
+# from the same random grid, made by random_fill of the sample. Only the generations
+# are timed, by the program itself to the millisecond, nothing else is printed.
+
+import io
+import os
+import sys
+import random
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+
+from interpreter_benchmark import BACKENDS, SAMPLES
+
+SIZES = [ 20, 40 ]
+
+SAMPLE_RUN = '''
+no directions = [[0, 1], [1, 0], [0, -1], [-1, 0], [1, 1], [-1, -1], [1, -1], [-1, 1]]
+no next_gen = grid(size, size, 0)
+
+no start = time()
+while iteration < iterations
+    generate_run(current, next_gen, size, directions, 8)
+    iteration = iteration + 1
+nolout(time() - start)
+'''
+
+LIFE_RUN = '''
+no start = time()
+while iteration < iterations
+    current = life(current)
+    iteration = iteration + 1
+nolout(time() - start)
+'''
+
+def programs(size: int, generations: int) -> dict[str, str]:
+    # Functions of the sample, everything before the one printing the grid
+    with open(os.path.join(SAMPLES, 'game_of_life.nl'), 'r') as f:
+        functions = f.read().split('# white background')[0]
+
+    setup = f'no size = {size}\nno iterations = {generations}\nno iteration = 0\nno current = grid(size, size, 0)\nrandom_fill(current, size)\n'
+
+    return { 'sample': functions + setup + SAMPLE_RUN, 'life': functions + setup + LIFE_RUN }
+
+def measure(name: str, source: str, rounds: int, backend: type) -> float:
+    best = float('inf')
+
+    for _ in range(rounds):
+        stmts = Parser().parse(Lexer().scan(source, f'{name}.nl'), f'{name}.nl')
+        random.seed(0)
+
+        # The program prints how many milliseconds the generations took
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            backend().explore(stmts)
+
+        best = min(best, int(out.getvalue()) / 1000)
+
+    return best
+
+def main():
+    generations = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f'{"":>12}  ' + ''.join(f'{backend:>10}' for backend in BACKENDS))
+
+    for size in SIZES:
+        for name, source in programs(size, generations).items():
+            times = [ measure(name, source, rounds, backend) for backend in BACKENDS.values() ]
+            print(f'{f"{name} {size}":>12}: ' + ''.join(f'{elapsed:>9.3f}s' for elapsed in times))
+
+if __name__ == '__main__':
+    main()
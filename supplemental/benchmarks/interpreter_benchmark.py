@@ -0,0 +1,104 @@
+# Measures how fast the interpreter runs loop heavy programs.
+#
+# Usage: python supplemental/benchmarks/interpreter_benchmark.py [ROUNDS] [GENERATIONS]
+#
+# Runs game_of_life.nl for GENERATIONS (default 10) generations, a few programs
+# dominated by local variable accesses and a call heavy recursive fibonacci, taking
+# the best of ROUNDS (default 3) runs on every backend.
+# Scripts are parsed upfront, output is discarded and random() is seeded so every
+# run does the same work.
+
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.astvisitors.interpreter import Interpreter
+from nolang.astvisitors.closurecompiler import ClosureInterpreter
+from nolang.astvisitors.pythontranspiler import PythonInterpreter
+from nolang.astvisitors.tieredinterpreter import TieredInterpreter
+from nolang.bytecode.vm import VirtualMachine
+
+BACKENDS = { 'tree': Interpreter, 'closure': ClosureInterpreter, 'vm': VirtualMachine, 'py': PythonInterpreter, 'tiered': TieredInterpreter }
+
+SAMPLES = os.path.join(ROOT, 'supplemental', 'samples')
+
+NESTED_LOOPS = '''
+greg count(n)
+    no total = 0
+    no i = 0
+    while i < n
+        no j = 0
+        while j < n
+            total = total + i * j
+            j = j + 1
+        i = i + 1
+    pay total
+
+nolout(count(300))
+'''
+
+CLOSURES = '''
+greg counter()
+    no count = 0
+    greg increment(by)
+        count = count + by
+        pay count
+    pay increment
+
+no next = counter()
+no i = 0
+while i < 50000
+    next(i % 3)
+    i = i + 1
+nolout(next(0))
+'''
+
+FIBONACCI = '''
+greg fib(n)
+    if n < 2
+        pay n
+    pay fib(n - 1) + fib(n - 2)
+
+nolout(fib(20))
+'''
+
+def programs(generations: int) -> dict[str, str]:
+    with open(os.path.join(SAMPLES, 'game_of_life.nl'), 'r') as f:
+        game_of_life = f.read().replace('no iterations = 100', f'no iterations = {generations}')
+
+    return { 'game_of_life': game_of_life, 'nested_loops': NESTED_LOOPS, 'closures': CLOSURES, 'fibonacci': FIBONACCI }
+
+def measure(name: str, source: str, rounds: int, backend: type[Interpreter]) -> float:
+    best = float('inf')
+
+    for _ in range(rounds):
+        stmts = Parser().parse(Lexer().scan(source, f'{name}.nl'), f'{name}.nl')
+        random.seed(0)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            backend().explore(stmts)
+            best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    generations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f'{"":>14}  ' + ''.join(f'{backend:>10}' for backend in BACKENDS))
+
+    for name, source in programs(generations).items():
+        times = [ measure(name, source, rounds, backend) for backend in BACKENDS.values() ]
+        print(f'{name:>14}: ' + ''.join(f'{elapsed:>9.3f}s' for elapsed in times))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# Compares the throughput of the character based lexer with the regex driven lexer.
+#
+# Usage: python supplemental/benchmarks/lexer_benchmark.py [REPEATS]
+#
+# The corpus is every sample script concatenated and repeated REPEATS times (default 200)
+# which gives a multi-thousand line script similar to the ones we generate.
+
+import os
+import sys
+import glob
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.lexer.regexlexer import RegexLexer
+
+SAMPLES = os.path.join(ROOT, 'supplemental', 'samples')
+
+# These samples contain deliberate errors
+EXCLUDED = { 'lex_errors.nl', 'parse_errors.nl' }
+
+def build_corpus(repeats: int) -> str:
+    sources = []
+    for path in sorted(glob.glob(os.path.join(SAMPLES, '**', '*.nl'), recursive=True)):
+        if os.path.basename(path) in EXCLUDED:
+            continue
+
+        with open(path, 'r') as f:
+            sources.append(f.read().rstrip('\n') + '\n')
+
+    return '\n'.join(sources) * repeats
+
+def measure(lexer, source: str, rounds: int = 5):
+    best = float('inf')
+    tokens = None
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        tokens = lexer.scan(source, 'benchmark.nl')
+        best = min(best, time.perf_counter() - start)
+
+    return best, tokens
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    source = build_corpus(repeats)
+    lines = source.count('\n')
+    size = len(source) / (1024 * 1024)
+
+    print(f'Corpus: {lines} lines, {size:.2f} MiB')
+
+    results = {}
+    for name, lexer in (('character', Lexer()), ('regex', RegexLexer())):
+        elapsed, tokens = measure(lexer, source)
+        results[name] = (elapsed, tokens)
+        print(f'{name:>10}: {elapsed:.3f}s {len(tokens) / elapsed:,.0f} tokens/s {size / elapsed:.2f} MiB/s')
+
+    # Both engines must agree on every single token
+    expected = results['character'][1]
+    actual = results['regex'][1]
+    assert len(expected) == len(actual), 'Token streams differ in length'
+    for a, b in zip(expected, actual):
+        assert (a.type_id, a.lexeme, a.line, repr(a.value)) == (b.type_id, b.lexeme, b.line, repr(b.value)), f'{a!r} != {b!r}'
+
+    print(f'   speedup: {results["character"][0] / results["regex"][0]:.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# Compares joining two tables by scanning parallel arrays with joining them through a map.
+#
+# Usage: python supplemental/benchmarks/map_benchmark.py [ROWS] [ROUNDS]
+#
+# Every order of a table of orders looks up the name of its customer in a table of
+# customers, ROWS (default 1000) of each, once by scanning the arrays of ids and names
+# for the id like our scripts did and once by a map of names by id. Takes the best of
+# ROUNDS (default 3) runs on every backend, for a quarter, half and all of the rows.
+# Only the join is timed, by the program itself to the millisecond.
+
+import io
+import os
+import sys
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+
+from interpreter_benchmark import BACKENDS
+
+TABLES = '''
+no rows = {rows}
+no ids = range(rows)
+no names = range(rows)
+no orders = range(rows)
+no i = 0
+while i < rows
+    ids[i] = rows - i
+    names[i] = "customer " + (rows - i)
+    orders[i] = i * 7 % rows + 1
+    i = i + 1
+'''
+
+SCAN = '''
+greg join(ids, names, orders)
+    no joined = range(len(orders))
+    no i = 0
+    while i < len(orders)
+        no j = 0
+        while ids[j] != orders[i]
+            j = j + 1
+        joined[i] = names[j]
+        i = i + 1
+    pay joined
+
+no start = time()
+join(ids, names, orders)
+nolout(time() - start)
+'''
+
+MAP = '''
+greg join(ids, names, orders)
+    no by_id = {}
+    no i = 0
+    while i < len(ids)
+        by_id[ids[i]] = names[i]
+        i = i + 1
+    no joined = range(len(orders))
+    i = 0
+    while i < len(orders)
+        joined[i] = by_id[orders[i]]
+        i = i + 1
+    pay joined
+
+no start = time()
+join(ids, names, orders)
+nolout(time() - start)
+'''
+
+def measure(name: str, source: str, rounds: int, backend: type) -> float:
+    stmts = Parser().parse(Lexer().scan(source, f'{name}.nl'), f'{name}.nl')
+    best = float('inf')
+
+    for _ in range(rounds):
+        # The program prints how many milliseconds the join took
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            backend().explore(stmts)
+
+        best = min(best, int(out.getvalue()) / 1000)
+
+    return best
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f'{"":>10}  ' + ''.join(f'{backend:>10}' for backend in BACKENDS))
+
+    for count in (rows // 4, rows // 2, rows):
+        for name, join in (('scan', SCAN), ('map', MAP)):
+            source = TABLES.format(rows=count) + join
+            times = [ measure(name, source, rounds, backend) for backend in BACKENDS.values() ]
+            print(f'{f"{name} {count}":>10}: ' + ''.join(f'{elapsed:>9.3f}s' for elapsed in times))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Measures how fast the parser turns tokens into an AST.
+#
+# Usage: python supplemental/benchmarks/parser_benchmark.py [REPEATS] [EXPRESSIONS]
+#
+# Two corpora are parsed: every sample script repeated REPEATS times (default 100),
+# and EXPRESSIONS (default 20000) randomly generated expression statements mixing
+# every operator and precedence level. Tokens are scanned upfront, only parsing is timed.
+
+import os
+import sys
+import glob
+import time
+import random
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+
+SAMPLES = os.path.join(ROOT, 'supplemental', 'samples')
+
+# These samples contain deliberate errors
+EXCLUDED = { 'lex_errors.nl', 'parse_errors.nl' }
+
+ATOMS = [ 'a', 'b', 'count', '1', '42', '2.5', '"s"', 'True', 'nol', '[1, a]', 'f(a, b)', 'x[i]', 'g()' ]
+BINARY = [ '+', '-', '*', '/', '%', '**', '==', '!=', '<', '>', '<=', '>=', 'and', 'or' ]
+PREFIX = [ '-', '+' ]
+
+def build_samples(repeats: int) -> str:
+    sources = []
+    for path in sorted(glob.glob(os.path.join(SAMPLES, '**', '*.nl'), recursive=True)):
+        if os.path.basename(path) in EXCLUDED:
+            continue
+
+        with open(path, 'r') as f:
+            sources.append(f.read().rstrip('\n') + '\n')
+
+    return '\n'.join(sources) * repeats
+
+def generate_expression(rng: random.Random, depth: int = 0) -> str:
+    roll = rng.random()
+
+    if depth > 5 or roll < 0.25:
+        return rng.choice(ATOMS)
+
+    if roll < 0.35:
+        return rng.choice(PREFIX) + generate_expression(rng, depth + 1)
+
+    # 'not' binds looser than most binary operators, so it goes in parenthesis
+    if roll < 0.4:
+        return f'(not {generate_expression(rng, depth + 1)})'
+
+    return f'{generate_expression(rng, depth + 1)} {rng.choice(BINARY)} {generate_expression(rng, depth + 1)}'
+
+def build_expressions(count: int) -> str:
+    rng = random.Random(1234)
+    return ''.join(f'x = {generate_expression(rng)}\n' for _ in range(count))
+
+def measure(tokens, rounds: int = 5) -> float:
+    best = float('inf')
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        Parser().parse(tokens, 'benchmark.nl')
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    expressions = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    for name, source in (('samples', build_samples(repeats)), ('expressions', build_expressions(expressions))):
+        tokens = Lexer().scan(source, 'benchmark.nl')
+        elapsed = measure(tokens)
+        print(f'{name:>12}: {len(tokens)} tokens in {elapsed:.3f}s {len(tokens) / elapsed:,.0f} tokens/s')
+
+if __name__ == '__main__':
+    main()
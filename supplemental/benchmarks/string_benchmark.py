@@ -0,0 +1,72 @@
+# Measures how long building a report string piece by piece takes.
+#
+# Usage: python supplemental/benchmarks/string_benchmark.py [MEGABYTES] [ROUNDS]
+#
+# Appends lines of about 32 characters to a string with report = report + line until
+# it is MEGABYTES (default 10) long, and does the same for a quarter and half of that,
+# taking the best of ROUNDS (default 3) runs on every backend. Building the string
+# takes linear time when the times grow with the size of the report. Only building is
+# timed, by the program itself to the millisecond, the report is printed once at the end.
+
+import io
+import os
+import sys
+import contextlib
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+
+from interpreter_benchmark import BACKENDS
+
+LINE_LENGTH = 32
+
+REPORT = '''
+greg report(lines)
+    no report = ""
+    no i = 0
+    while i < lines
+        report = report + "line " + (1000000 + i) + " of the report.....\\n"
+        i = i + 1
+    pay report
+
+no start = time()
+no built = report({lines})
+no elapsed = time() - start
+nolout(built)
+nolout(elapsed)
+'''
+
+def measure(lines: int, rounds: int, backend: type) -> float:
+    stmts = Parser().parse(Lexer().scan(REPORT.format(lines=lines), 'report.nl'), 'report.nl')
+    best = float('inf')
+
+    for _ in range(rounds):
+        # The program prints the report and then how many milliseconds building it took
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            backend().explore(stmts)
+
+        report, elapsed = out.getvalue().rstrip('\n').rsplit('\n', 1)
+        assert len(report) == lines * LINE_LENGTH, 'the report came out wrong'
+
+        best = min(best, int(elapsed) / 1000)
+
+    return best
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f'{"":>9}  ' + ''.join(f'{backend:>10}' for backend in BACKENDS))
+
+    for fraction in (0.25, 0.5, 1):
+        size = megabytes * fraction
+        lines = int(size * 1024 * 1024) // LINE_LENGTH
+
+        times = [ measure(lines, rounds, backend) for backend in BACKENDS.values() ]
+        print(f'{f"{size:g} MB":>9}: ' + ''.join(f'{elapsed:>9.3f}s' for elapsed in times))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# Measures how much memory the token list of a large generated script takes up.
+#
+# Usage: python supplemental/benchmarks/token_memory.py [LINES]
+#
+# The generated script has LINES (default 20000) lines with a small pool of
+# identifiers repeated throughout, like our batch generated scripts.
+
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+from nolang.lexer.lexer import Lexer
+from nolang.lexer.regexlexer import RegexLexer
+
+def build_source(lines: int) -> str:
+    return ''.join(f'no value_{i % 50} = counter * (3 + {i}) - foo(bar, "s")\n' for i in range(lines))
+
+def measure(lexer, source: str):
+    tracemalloc.start()
+    tokens = lexer.scan(source, 'benchmark.nl')
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(tokens), current, peak
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    source = build_source(lines)
+
+    print(f'Source: {lines} lines, {len(source) / (1024 * 1024):.2f} MiB')
+
+    for name, lexer in (('character', Lexer()), ('regex', RegexLexer())):
+        count, current, peak = measure(lexer, source)
+        print(f'{name:>10}: {count} tokens {current / (1024 * 1024):.2f} MiB retained ({current / count:.1f} B/token) {peak / (1024 * 1024):.2f} MiB peak')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Measures how much memory nolang values take up and how fast they are created.
+#
+# Usage: python supplemental/benchmarks/value_memory.py [COUNT]
+#
+# Builds an array of COUNT (default 1000000) values of every type, like a program
+# filling a large array would, and reports the memory it retains per value. The
+# time to create the values, best of 5 rounds, is measured separately for the
+# regular constructors which coerce their value and the trusted ones the
+# interpreter uses.
+
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, ROOT)
+
+# The lexer comes first, importing the types on their own runs into a circular import
+from nolang.lexer.lexer import Lexer
+from nolang.types import *
+
+# Python values of every type, ints are kept out of the range of shared small ints
+VALUES = {
+    'int': (NolangInt, nolang_int, lambda i: SMALL_INT_MAX + 1 + i),
+    'float': (NolangFloat, nolang_float, lambda i: i + 0.5),
+    'string': (NolangString, nolang_string, lambda i: 'abcdefgh'),
+    'array': (NolangArray, nolang_array, lambda i: []),
+}
+
+def memory(construct, values: list) -> int:
+    tracemalloc.start()
+    array = NolangArray([ construct(value) for value in values ])
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return current
+
+def construction(construct, values: list, rounds: int = 5) -> float:
+    """Best time of the rounds to create the values"""
+    best = float('inf')
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+
+        for value in values:
+            construct(value)
+
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f'{count} values of every type')
+
+    for name, (typ, trusted, value) in VALUES.items():
+        # The python values themselves are created upfront, only the nolang values are measured
+        values = [ value(i) for i in range(count) ]
+
+        retained = memory(typ, values)
+        regular, fast = construction(typ, values), construction(trusted, values)
+
+        print(f'{name:>8}: {retained / (1024 * 1024):>7.2f} MiB retained ({retained / count:.1f} B/value), created in {regular:.3f}s, {fast:.3f}s trusted')
+
+if __name__ == '__main__':
+    main()
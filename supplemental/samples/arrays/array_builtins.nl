@@ -0,0 +1,23 @@
+# Arrays can be worked on as a whole with the array builtins
+nolout('\n===== Arrays can be worked on as a whole =====')
+
+no numbers = range(5)
+nolout('range(5) = ' + numbers)
+nolout('len(numbers) = ' + len(numbers))
+nolout('sum(numbers) = ' + sum(numbers))
+nolout('min(numbers) = ' + min(numbers) + ', max(numbers) = ' + max(numbers))
+
+# Elementwise operations give back a new array, numbers are used for every element
+nolout('\n===== Elementwise operations =====')
+
+nolout('add(numbers, numbers) = ' + add(numbers, numbers))
+nolout('mul(numbers, 0.5) = ' + mul(numbers, 0.5))
+nolout('dot(numbers, numbers) = ' + dot(numbers, numbers))
+nolout('where([1, 0, 1, 0, 1], numbers, -1) = ' + where([1, 0, 1, 0, 1], numbers, -1))
+
+# Copies are independent of the array they were made from, fill changes the array itself
+nolout('\n===== Copying and filling =====')
+
+no copied = copy(numbers)
+fill(copied, 7)
+nolout('numbers = ' + numbers + ', copied = ' + copied)
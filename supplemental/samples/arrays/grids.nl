@@ -0,0 +1,33 @@
+# Grids are two dimensional arrays of numbers, made by the grid builtin
+nolout('\n===== Grids are made by the grid builtin =====')
+
+no board = grid(5, 5, 0)
+board[1][2] = 1
+board[2][2] = 1
+board[3][2] = 1
+
+nolout('board = ' + board)
+nolout('board[2][2] = ' + board[2][2])
+
+# Cells can be counted and combined with their neighbours in one call
+nolout('\n===== Neighbours and convolutions =====')
+
+nolout('neighbours(board) = ' + neighbours(board))
+nolout('convolve(board, [[0, 1, 0], [1, 1, 1], [0, 1, 0]]) = ' + convolve(board, [[0, 1, 0], [1, 1, 1], [0, 1, 0]]))
+
+# A game of life generation is a single call, the blinker flips every generation
+nolout('\n===== Game of life =====')
+
+no generation = 0
+while generation < 3
+    board = life(board)
+    nolout('generation ' + generation + ': ' + board)
+    generation = generation + 1
+
+# Copies don't share rows with the grid they were made from, swap exchanges two grids
+nolout('\n===== Copying and swapping =====')
+
+no other = copy(board)
+other[0][0] = 1
+swap(board, other)
+nolout('board[0] = ' + board[0] + ', other[0] = ' + other[0])
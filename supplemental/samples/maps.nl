@@ -0,0 +1,54 @@
+# Maps hold values under int, float, string or bool keys
+no ages = {"ada": 36, "alan": 41, "grace": 85}
+nolout(ages)
+nolout(ages["alan"])
+
+ages["linus"] = 54
+ages["ada"] = ages["ada"] + 1
+nolout(len(ages))
+nolout(ages)
+
+# Keys that are == are the same key
+no mixed = {1: "one", 2.5: "two and a half", True: "true?", "1": "string one"}
+nolout(mixed)
+nolout(mixed[1.0])
+
+nolout(has(ages, "grace"))
+nolout(has(ages, "bob"))
+nolout(keys(ages))
+nolout(remove(ages, "linus"))
+nolout(ages)
+
+no empty = {}
+nolout(empty)
+empty[0] = [1, 2]
+empty[0][1] = 5
+nolout(empty)
+
+no snapshot = copy(ages)
+snapshot["ada"] = 0
+nolout([ages["ada"], snapshot["ada"]])
+
+# Joining two tables in one pass instead of a nested loop
+no names = [[1, "north"], [2, "south"], [3, "east"]]
+no sales = [[2, 10], [1, 5], [2, 7], [3, 1], [1, 1]]
+
+no region = {}
+no i = 0
+while i < len(names)
+    region[names[i][0]] = names[i][1]
+    i = i + 1
+
+no totals = {}
+i = 0
+while i < len(sales)
+    no name = region[sales[i][0]]
+    if has(totals, name)
+        totals[name] = totals[name] + sales[i][1]
+    hermph
+        totals[name] = sales[i][1]
+    i = i + 1
+
+nolout(totals)
+nolout(type(totals))
+nolout({"nested": {"map": [1, {2: 3}]}})
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import nolang from the checkout they are in
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,47 @@
+import io
+import os
+import sys
+import contextlib
+import subprocess
+
+# The lexer comes first, importing the types on their own runs into a circular import
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.astvisitors.interpreter import Interpreter
+from nolang.astvisitors.closurecompiler import ClosureInterpreter
+from nolang.astvisitors.pythontranspiler import PythonInterpreter
+from nolang.astvisitors.tieredinterpreter import TieredInterpreter
+from nolang.bytecode.vm import VirtualMachine
+from nolang.exception import NolangException
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+BACKENDS = { 'tree': Interpreter, 'closure': ClosureInterpreter, 'vm': VirtualMachine, 'py': PythonInterpreter, 'tiered': TieredInterpreter }
+
+def run(source: str, backend: type, file_name: str = 'test.nl') -> str:
+    """Runs the program on the backend, giving back what it printed and its errors like nolang.py prints them"""
+    out = io.StringIO()
+
+    with contextlib.redirect_stdout(out):
+        try:
+            stmts = Parser().parse(Lexer().stream(source, file_name), file_name)
+            backend().explore(stmts)
+
+        except* NolangException as eg:
+            for e in eg.exceptions:
+                print(e)
+
+    return out.getvalue()
+
+def run_everywhere(source: str) -> str:
+    """Runs the program on every backend, which must all print the same, and gives back the output"""
+    outputs = { name: run(source, backend) for name, backend in BACKENDS.items() }
+
+    for name, output in outputs.items():
+        assert output == outputs['tree'], f'{name} printed {output!r} instead of {outputs["tree"]!r}'
+
+    return outputs['tree']
+
+def nolang(*args: str) -> subprocess.CompletedProcess:
+    """Runs nolang.py with the arguments, like from the command line"""
+    return subprocess.run([ sys.executable, os.path.join(ROOT, 'nolang.py'), *args ], capture_output=True, text=True)
@@ -0,0 +1,22 @@
+from runner import nolang
+
+BROKEN = 'greg broken()\n    x = = 1\n\nnolout("ran")\n'
+
+def test_lazy_runs_do_not_cache_programs_with_syntax_errors(tmp_path):
+    script = tmp_path / 'broken.nl'
+    script.write_text(BROKEN)
+
+    # The body of broken() is never parsed, so the lazy run doesn't see its syntax error
+    assert nolang(str(script), '--lazy').stdout == 'ran\n'
+
+    eager = nolang(str(script))
+    assert eager.stdout == ''
+    assert eager.stderr == nolang(str(script), '--no-cache').stderr != ''
+
+def test_eager_runs_are_cached(tmp_path):
+    script = tmp_path / 'fine.nl'
+    script.write_text('nolout("ran")\n')
+
+    assert nolang(str(script)).stdout == 'ran\n'
+    assert (tmp_path / '__nolcache__' / 'fine.nl.nlc').exists()
+    assert nolang(str(script)).stdout == 'ran\n'
@@ -0,0 +1,52 @@
+from runner import run_everywhere
+
+def equalities(*comparisons: str) -> list[str]:
+    """Runs every comparison on every backend, both as a value and as the condition of an if"""
+    source = ''.join(f'nolout({comparison})\nif {comparison}\n    nolout("if")\nhermph\n    nolout("else")\n' for comparison in comparisons)
+    lines = run_everywhere(source).splitlines()
+
+    for value, branch in zip(lines[::2], lines[1::2]):
+        assert branch == ('if' if value == 'True' else 'else')
+
+    return lines[::2]
+
+def test_arrays_compare_their_elements():
+    assert equalities('[5] == [5]', '[5000] == [5000]', '[5000] != [5000]', '["a", nol] == ["a", nol]', '[] == []') == [ 'True', 'True', 'False', 'True', 'True' ]
+
+def test_arrays_of_other_elements_differ():
+    assert equalities('[5000] == [5001]', '[1, 2] == [1, 2, 3]', '[1] == [True]', '["1"] == [1]', '[1] != [2]') == [ 'False', 'False', 'False', 'False', 'True' ]
+
+def test_nested_arrays_compare_their_elements():
+    assert equalities('[[1, "a"], [2.5]] == [[1, "a"], [2.5]]', '[[1, "a"], [2.5]] == [[1, "a"], [3.5]]', 'grid(2, 3, 7) == grid(2, 3, 7)', 'grid(2, 3, 7) == grid(3, 2, 7)') == [ 'True', 'False', 'True', 'False' ]
+
+def test_arrays_differ_from_other_types():
+    assert equalities('[1] == 1', '1 == [1]', '[] == nol', '[] != ""') == [ 'False', 'False', 'False', 'True' ]
+
+def test_scalars_compare_like_before():
+    assert equalities('1 == 1.0', '5000 == 5000', '"a" + "b" == "ab"', 'True != False') == [ 'True', 'True', 'True', 'True' ]
+
+# Assigning a string unpacks an array for good, putting the numbers back leaves it unpacked
+UNPACKED = '''
+no ints = [1, 2]
+ints[0] = "unpacks"
+ints[0] = 1
+no floats = [1.5, 2.5]
+floats[0] = "unpacks"
+floats[0] = 1.5
+'''
+
+def test_packing_is_invisible():
+    source = UNPACKED + ''.join(f'nolout({comparison})\n' for comparison in (
+        'ints == [1, 2]', '[1, 2] == ints', 'ints != [1, 2]', 'ints == [1, 3]', 'floats == [1.5, 2.5]', '[1.5, 2.5] == floats', 'ints == copy(ints)', '[ints] == [[1, 2]]'
+    ))
+    assert run_everywhere(source).splitlines() == [ 'True', 'True', 'False', 'False', 'True', 'True', 'True', 'True' ]
+
+def test_packed_arrays_of_other_types_differ():
+    assert equalities('[1] == [1.0]', '[1, 2] == [1.0, 2.0]', '[1.5] == [1.5]', '[1, 100000000000000000000] == [1, 100000000000000000000]') == [ 'False', 'False', 'True', 'True' ]
+    assert run_everywhere(UNPACKED + 'nolout(ints == [1.0, 2.0])\nnolout([1.0, 2.0] == ints)\n') == 'False\nFalse\n'
+
+def test_maps_compare_their_entries():
+    assert equalities('{1: 5000} == {1: 5000}', '{"a": [1, 2], "b": nol} == {"b": nol, "a": [1, 2]}', '{} == {}', '{1: 5000} != {1: 5000}', '{1: 1} == {1.0: 1}') == [ 'True', 'True', 'True', 'False', 'True' ]
+
+def test_maps_of_other_entries_differ():
+    assert equalities('{1: 5000} == {1: 5001}', '{1: 2} == {2: 2}', '{1: 2} == {1: 2, 3: 4}', '{1: 1} == {1: 1.0}', '{} == []', '[] == {}') == [ 'False', 'False', 'False', 'False', 'False', 'False' ]
@@ -0,0 +1,71 @@
+import os
+import random
+
+from runner import ROOT
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.parser.incremental import IncrementalParser
+from nolang.lexer.token import Token
+from nolang.types import NolangType
+
+SAMPLES = os.path.join(ROOT, 'supplemental', 'samples')
+
+def described(node) -> object:
+    """The statements as nested tuples of the values of their slots, with the lines of their tokens"""
+    if isinstance(node, list):
+        return [ described(element) for element in node ]
+
+    if isinstance(node, tuple):
+        return tuple(described(element) for element in node)
+
+    if isinstance(node, Token):
+        return (node.type_id, node.lexeme, node.line)
+
+    if isinstance(node, NolangType) or not hasattr(node, '__slots__'):
+        return repr(node)
+
+    slots = [ slot for cls in node.__class__.__mro__ for slot in getattr(cls, '__slots__', ()) ]
+    return (node.__class__.__name__, tuple(described(getattr(node, slot, None)) for slot in slots))
+
+def full_parse(source: str, lazy: bool) -> list | None:
+    try:
+        return described(Parser(lazy=lazy).parse(Lexer().scan(source, 'test.nl'), 'test.nl'))
+
+    except ExceptionGroup:
+        return None
+
+def edited(lines: list[str], rng: random.Random) -> list[str]:
+    lines = lines[:]
+    line = rng.randrange(len(lines))
+
+    match rng.randrange(3):
+        case 0: lines.insert(line, '')
+        case 1: lines.insert(line, lines[line])
+        case 2: del lines[line]
+
+    return lines
+
+def test_edits_parse_like_the_whole_file():
+    rng = random.Random(4)
+
+    for lazy in (False, True):
+        for sample in sorted(os.listdir(SAMPLES)):
+            if not sample.endswith('.nl'):
+                continue
+
+            with open(os.path.join(SAMPLES, sample)) as f:
+                lines = f.read().split('\n')
+
+            front_end = IncrementalParser(Lexer(), Parser(lazy=lazy))
+
+            for _ in range(12):
+                lines = edited(lines, rng)
+                source = '\n'.join(lines)
+
+                try:
+                    stmts = described(front_end.parse(source, 'test.nl'))
+
+                except ExceptionGroup:
+                    stmts = None
+
+                assert stmts == full_parse(source, lazy), f'{sample} parsed differently, lazy={lazy}'
@@ -0,0 +1,29 @@
+import io
+import contextlib
+
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.astvisitors.interpreter import Interpreter
+
+PROGRAM = '''
+greg twice(n)
+    pay n * 2
+
+no i = 0
+while i < 3
+    i = twice(i) + 1
+nolout(i)
+'''
+
+def test_call_caches_are_kept_per_interpreter():
+    # Watch mode runs the statements it didn't parse again with a new interpreter
+    stmts = Parser().parse(Lexer().stream(PROGRAM, 'test.nl'), 'test.nl')
+
+    for _ in range(2):
+        interpreter = Interpreter()
+
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            interpreter.explore(stmts)
+
+        assert out.getvalue() == '3\n'
+        assert (interpreter.call_hits, interpreter.call_misses) == (1, 2)
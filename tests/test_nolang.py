@@ -0,0 +1,18 @@
+from runner import nolang
+
+def test_tier_thresholds_are_validated(tmp_path):
+    script = tmp_path / 'script.nl'
+    script.write_text('nolout("ran")\n')
+
+    for threshold in ('abc', '-1', '1.5', ''):
+        run = nolang(str(script), '--backend=tiered', f'--tier-threshold={threshold}')
+        assert (run.stdout, run.stderr) == ('', f'Invalid tier threshold \'{threshold}\', expected a number of calls and loop iterations of 0 or more\n')
+
+    for threshold in ('0', '20'):
+        assert nolang(str(script), '--backend=tiered', f'--tier-threshold={threshold}', '--no-cache').stdout == 'ran\n'
+
+def test_unknown_backends_are_reported(tmp_path):
+    script = tmp_path / 'script.nl'
+    script.write_text('nolout("ran")\n')
+
+    assert nolang(str(script), '--backend=fast').stderr == 'Unknown backend \'fast\', expected one of: tree, closure, vm, py, tiered\n'
@@ -0,0 +1,43 @@
+from runner import run_everywhere
+
+def chain(operands: int) -> str:
+    return 'no x = 2\nno y = ' + ' + '.join([ 'x' ] * operands) + '\nnolout(y)\n'
+
+def test_long_operator_chains_run():
+    # Too deeply nested for CPython to compile as a single python expression
+    assert run_everywhere(chain(150)) == '300\n'
+    assert run_everywhere(chain(250)) == '500\n'
+
+def test_functions_in_programs_too_nested_to_compile():
+    source = 'greg double(n)\n    pay n + n\n' + chain(300) + 'nolout(double(y))\n'
+    assert run_everywhere(source) == '600\n1200\n'
+
+def test_tail_calls_dont_grow_the_stack():
+    source = '''
+greg count(n, acc)
+    if n == 0
+        pay acc
+    pay count(n - 1, acc + 1)
+
+greg even(n)
+    if n == 0
+        pay True
+    pay odd(n - 1)
+
+greg odd(n)
+    if n == 0
+        pay False
+    pay even(n - 1)
+
+greg size(n)
+    pay len(range(n))
+
+nolout(count(150000, 0))
+nolout(even(100001))
+nolout(size(3))
+'''
+    assert run_everywhere(source) == '150000\nFalse\n3\n'
+
+def test_tail_calls_are_checked():
+    assert run_everywhere('greg pair(a, b)\n    pay a\n\ngreg wrong()\n    pay pair(1)\n\nnolout(wrong())\n') == "pair requires 2 arguments but 1 were provided 'test.nl':5\n"
+    assert run_everywhere('greg uncallable()\n    pay 5(1)\n\nnolout(uncallable())\n') == "5 is not a callable object 'test.nl':2\n"
@@ -0,0 +1,46 @@
+from runner import run_everywhere
+
+def test_builtins_give_back_empty_containers():
+    source = '''
+nolout(type(range(0)) + " " + len(range(0)))
+nolout(type(copy([])) + " " + len(copy([])))
+nolout(type(add([], 1)) + " " + len(add([], 1)))
+nolout(type(grid(0, 0, 0)))
+nolout(type(keys({})) + " " + len(keys({})))
+nolout(type(copy({})) + " " + len(copy({})))
+'''
+    assert run_everywhere(source) == 'array 0\narray 0\narray 0\ngrid\narray 0\nmap 0\n'
+
+def test_functions_pay_empty_containers():
+    source = '''
+greg empty()
+    pay []
+
+greg nothing()
+    no x = 1
+
+nolout(type(empty()) + " " + len(empty()) + " " + type(nothing()))
+'''
+    assert run_everywhere(source) == 'array 0 nol\n'
+
+def test_fill_fills_the_cells_of_grids():
+    source = '''
+no g = grid(2, 3, 0)
+nolout(fill(g, 1))
+nolout(type(g) + " " + g[0][1])
+nolout(life(g))
+fill(g, 2.5)
+nolout(g)
+fill(g, "x")
+'''
+    assert run_everywhere(source).splitlines() == [
+        '[[1, 1, 1], [1, 1, 1]]',
+        'grid 1',
+        '[[1, 0, 1], [1, 0, 1]]',
+        '[[2.5, 2.5, 2.5], [2.5, 2.5, 2.5]]',
+        "Invalid type string, grids are filled with numbers 'test.nl':8",
+    ]
+
+def test_fill_checks_grids():
+    assert run_everywhere('no g = grid(2, 2, 0)\ng[1] = 5\nfill(g, 1)\n') == "Invalid grid [[0, 0], 5], expected rows of numbers of the same length 'test.nl':3\n"
+    assert run_everywhere('no g = grid(2, 2, 0)\nfill(g, 100000000000000000000)\nnolout(g)\n') == "Cannot fill a grid with 100000000000000000000 'test.nl':2\n"
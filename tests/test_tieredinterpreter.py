@@ -0,0 +1,43 @@
+import io
+import contextlib
+
+from runner import run_everywhere
+from nolang.lexer.lexer import Lexer
+from nolang.parser.parser import Parser
+from nolang.astvisitors.tieredinterpreter import TieredInterpreter
+
+# Every call finishes the calls it makes before its own loops, the outer calls still walk the
+# tree when they get to the loops the innermost call compiled
+NESTED = '''
+greg walk(n)
+    no total = 0
+    if n > 0
+        total = walk(n - 1)
+    no i = 0
+    while i < 10
+        total = total + i
+        i = i + 1
+    bounce
+        total = total + 1
+        i = i - 1
+    while i > 0
+    pay total
+
+nolout(walk(8))
+'''
+
+def tier(source: str, threshold: int) -> tuple[str, list[str]]:
+    report = io.StringIO()
+
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        TieredInterpreter(threshold=threshold, report=report).explore(Parser().parse(Lexer().stream(source, 'test.nl'), 'test.nl'))
+
+    return out.getvalue(), report.getvalue().splitlines()
+
+def test_loops_are_compiled_once():
+    expected = run_everywhere(NESTED)
+    output, report = tier(NESTED, 5)
+
+    assert output == expected == '495\n'
+    # The function and both of its loops, each once
+    assert [ line.split(',')[0] for line in report ] == [ '[tier] compiled greg walk' ] + [ '[tier] compiled loop in greg walk' ] * 2